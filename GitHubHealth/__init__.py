@@ -5,10 +5,37 @@ GitHubHealth module.
 
 __all__ = ["TIMEOUT", "main", "app"]
 
+import importlib
+import sys
+import types
+
 from .main import (  # noqa
     GitHubHealth,  # noqa
     ACCESS_TOKEN_VAR_NAME,  # noqa
 )  # noqa
-from .app.main import app  # noqa
 
 TIMEOUT = 2
+
+
+class GitHubHealthModule(types.ModuleType):
+    """
+    Module whose app attribute is the flask app, loaded on first use so library users
+    never import flask.
+    Importing any GitHubHealth.app submodule binds the app package to the same name,
+    that binding is ignored so app is always the flask app as with an eager import.
+    """
+
+    @property
+    def app(self):
+        """
+        Flask app of GitHubHealth.app.main.
+        """
+        return importlib.import_module(".app.main", __name__).app
+
+    @app.setter
+    def app(self, value):
+        if not isinstance(value, types.ModuleType):
+            raise AttributeError(f"{__name__}.app cannot be set")
+
+
+sys.modules[__name__].__class__ = GitHubHealthModule
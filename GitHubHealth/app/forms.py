@@ -34,6 +34,12 @@ class LoginForm(FlaskForm):
             self.login_user.errors.append(msg)
             self.gat.errors.append(msg)
             return False
+        if "://" in self.hostname.data and not self.hostname.data.startswith(
+            ("http://", "https://")
+        ):
+            msg = "hostname must be a host like github.com or an http(s):// url"
+            self.hostname.errors.append(msg)
+            return False
         if self.timeout.data < 1 or self.timeout.data > 10:
             msg = "timeout must be a value between 1 and 10"
             self.timeout.errors.append(msg)
@@ -0,0 +1,191 @@
+"""
+Background jobs for long running app views.
+Request threads submit a job and return its id, the page then polls for progress.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+import time
+import uuid
+
+from github.GithubException import RateLimitExceededException
+import pandas as pd
+
+from GitHubHealth.cache import TTLCache
+from GitHubHealth.scheduler import get_retry_after
+
+JOB_WORKERS = 4
+JOB_CACHE_SIZE = 256
+JOB_TTL = 3600
+JOB_END_STATUSES = ["done", "error", "rate_limited"]
+
+logger = logging.getLogger(__name__)
+logger.setLevel("INFO")
+
+
+def get_json_record(record):
+    """
+    Record with numpy scalars as python values and missing values as None.
+    """
+    return {
+        key: (
+            None
+            if pd.isna(value)
+            else value.item() if hasattr(value, "item") else value
+        )
+        for key, value in record.items()
+    }
+
+
+# pylint: disable=too-many-instance-attributes
+class Job:
+    """
+    State of one background job, updated by the job function through set_step.
+    Rows added by the job function can be read while it runs through wait_rows, and
+    are kept if the job stops on a rate limit.
+    Args:
+        owner (str)         : key of the user that submitted the job
+        name (str)          : what the job is for, jobs of one owner and name are shared
+        steps (list)        : names of the steps the job goes through
+    """
+
+    def __init__(self, owner, name, steps):
+        self.job_id = uuid.uuid4().hex
+        self.owner = owner
+        self.name = name
+        self.steps = steps
+        self.step = 0
+        self.status = "pending"
+        self.message = "waiting"
+        self.result = None
+        self.error = None
+        self.retry_after = None
+        self.rows = []
+        self.condition = threading.Condition()
+        self.started = time.time()
+        self.finished = None
+
+    @property
+    def done(self):
+        """
+        Check if job has finished either way.
+        """
+        return self.status in JOB_END_STATUSES
+
+    def set_step(self, step, message=None):
+        """
+        Mark step as running.
+        """
+        with self.condition:
+            self.step = self.steps.index(step)
+            self.message = step if message is None else message
+            self.condition.notify_all()
+
+    def add_row(self, record):
+        """
+        Add a partial result row.
+        """
+        with self.condition:
+            self.rows.append(get_json_record(record))
+            self.condition.notify_all()
+
+    def finish(self, status, result=None, error=None, retry_after=None):
+        """
+        Record outcome and wake readers.
+        """
+        with self.condition:
+            self.result = result
+            self.error = error
+            self.retry_after = retry_after
+            self.status = status
+            self.message = status
+            self.finished = time.time()
+            self.condition.notify_all()
+
+    def wait_rows(self, start, timeout=None):
+        """
+        Rows from index start, waiting up to timeout seconds for any if there are none.
+        Returns (rows, done).
+        """
+        with self.condition:
+            if len(self.rows) <= start and not self.done:
+                self.condition.wait(timeout=timeout)
+            return self.rows[start:], self.done
+
+    def get_progress(self):
+        """
+        Progress as a json serializable dict.
+        """
+        return {
+            "job_id": self.job_id,
+            "name": self.name,
+            "status": self.status,
+            "step": self.step,
+            "steps": len(self.steps),
+            "message": self.message,
+            "error": None if self.error is None else str(self.error),
+            "retry_after": self.retry_after,
+            "elapsed": round((self.finished or time.time()) - self.started, 3),
+        }
+
+
+class JobRunner:
+    """
+    Run jobs on a thread pool.
+    Args:
+        max_workers (int)   : default JOB_WORKERS, jobs run concurrently
+        maxsize (int)       : default JOB_CACHE_SIZE, finished jobs kept for polling
+        ttl (float)         : default JOB_TTL, seconds jobs are kept
+    """
+
+    def __init__(self, max_workers=JOB_WORKERS, maxsize=JOB_CACHE_SIZE, ttl=JOB_TTL):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="ghh-job"
+        )
+        self.jobs = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.active = {}
+        self.lock = threading.Lock()
+
+    def submit(self, owner, name, steps, func, *args):
+        """
+        Start func(job, *args) in the background, returning the job.
+        An unfinished job of the same owner and name is returned instead of a new one.
+        """
+        with self.lock:
+            job = self.active.get((owner, name))
+            if job is not None and not job.done:
+                return job
+            job = Job(owner, name, steps)
+            self.active[(owner, name)] = job
+        self.jobs.set(job.job_id, job)
+        self.executor.submit(self.run, job, func, *args)
+        return job
+
+    def run(self, job, func, *args):
+        """
+        Run func and record its result or error on job.
+        """
+        job.status = "running"
+        try:
+            job.finish("done", result=func(job, *args))
+        except RateLimitExceededException as limit_error:
+            retry_after = get_retry_after(limit_error.headers)
+            logger.info("job %s rate limited, retry in %ss", job.job_id, retry_after)
+            job.finish("rate_limited", error=limit_error, retry_after=retry_after)
+        # pylint: disable=broad-except
+        except Exception as job_error:
+            logger.info("job %s failed: %s", job.job_id, job_error)
+            job.finish("error", error=job_error)
+        with self.lock:
+            if self.active.get((job.owner, job.name)) is job:
+                del self.active[(job.owner, job.name)]
+
+    def get(self, job_id, owner):
+        """
+        Get job if it belongs to owner.
+        """
+        job = self.jobs.get(job_id)
+        if job is None or job.owner != owner:
+            return None
+        return job
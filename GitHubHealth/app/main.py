@@ -2,18 +2,24 @@
 Module for flask app.
 """
 
+import hashlib
+import json
 import logging
 from logging.config import dictConfig
 from logging.handlers import SMTPHandler
 import os
+import tempfile
 
 from flask import (
     Flask,
+    Response,
     flash,
+    jsonify,
     redirect,
     render_template,
     request,
     session,
+    stream_with_context,
     url_for,
 )
 from flask.logging import create_logger
@@ -34,6 +40,25 @@ from github.GithubException import (
 )
 
 from GitHubHealth import GitHubHealth
+from GitHubHealth.cache import TTLCache
+from GitHubHealth.http_cache import DiskResponseCache
+from GitHubHealth.render import TABLE_PAGE_SIZE
+from GitHubHealth.requested_object import (
+    Metadata,
+    SearchResults,
+)
+from GitHubHealth.scheduler import (
+    RateLimitScheduler,
+    get_retry_after,
+)
+from GitHubHealth.snapshot import SnapshotStore
+from GitHubHealth.utils import (
+    PLOT_MAX_ROWS,
+    REPOS_DF_COLUMNS,
+    SEARCH_CACHE_TTL,
+    get_repo_table,
+)
+from GitHubHealth.app.jobs import JobRunner
 from GitHubHealth.app.forms import (
     LoginForm,
     MoreForm,
@@ -50,6 +75,38 @@ version_requirements = [
     if "GitHubHealth" in x
 ][0]
 VERSION = version_requirements
+CACHE_DIR_VAR_NAME = "GHH_CACHE_DIR"
+CACHE_DIR = os.environ.get(
+    CACHE_DIR_VAR_NAME, os.path.join(tempfile.gettempdir(), "GitHubHealth")
+)
+# shared by every session, entries are keyed by token so users never see each other's data
+RESPONSE_CACHE = DiskResponseCache(CACHE_DIR)
+SNAPSHOT_DIR = os.path.join(CACHE_DIR, "snapshots")
+# snapshots kept per resource of each login, older ones are dropped
+SNAPSHOT_MAX_VAR_NAME = "GHH_SNAPSHOT_MAX"
+SNAPSHOT_MAX = int(os.environ.get(SNAPSHOT_MAX_VAR_NAME, 100))
+GHH_CACHE_TTL = 600
+SEARCH_TTL_VAR_NAME = "GHH_SEARCH_TTL"
+SEARCH_TTL = float(os.environ.get(SEARCH_TTL_VAR_NAME, SEARCH_CACHE_TTL))
+# plots of tables longer than this are aggregated
+PLOT_ROWS_VAR_NAME = "GHH_PLOT_MAX_ROWS"
+PLOT_ROWS = int(os.environ.get(PLOT_ROWS_VAR_NAME, PLOT_MAX_ROWS))
+GHH_CACHE_SIZE = 128
+# app requests fail rather than hold a worker for a long rate limit pause
+SCHEDULER_MAX_WAIT = 60
+JOB_RUNNER = JobRunner()
+STATUS_STEPS = ["object", "repos", "details", "table", "plots", "snapshot"]
+# columns of rows streamed while the status job runs, repo links to repo_url
+STREAM_COLUMNS = [x for x in REPOS_DF_COLUMNS if x != "repo_url"]
+# seconds between keepalive comments on idle event streams
+STREAM_HEARTBEAT = 15
+# logged in GitHubHealth objects so a page view doesn't repeat the login round trip
+GHH_CACHE = TTLCache(maxsize=GHH_CACHE_SIZE, ttl=GHH_CACHE_TTL)
+# branch tables of viewed repos, pages are served from here by repo_table
+REPO_TABLES = TTLCache(maxsize=GHH_CACHE_SIZE, ttl=GHH_CACHE_TTL)
+SNAPSHOT_STORES = TTLCache(
+    maxsize=GHH_CACHE_SIZE, on_evict=lambda key, store: store.close()
+)
 
 dictConfig(
     {
@@ -116,20 +173,103 @@ def try_ghh(this_session):
     return None, error_msg
 
 
+def get_ghh_key(login_user, gat, hostname):
+    """
+    Hash credentials so tokens are not held as cache keys.
+    """
+    key = "\n".join([str(hostname), str(login_user), str(gat)])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def get_repo_table_key(repo_owner, repo_name):
+    """
+    Key of a repo branch table of the logged in user.
+    """
+    return (
+        get_ghh_key(session["login_user"], session["gat"], session["hostname"]),
+        repo_owner,
+        repo_name,
+    )
+
+
+def get_snapshot_store(login_user, hostname):
+    """
+    Get snapshot store of this login.
+    Each login has its own store so private repo history is never shared.
+    """
+    key = hashlib.sha256(f"{hostname}\n{login_user}".encode("utf-8")).hexdigest()
+    store = SNAPSHOT_STORES.get(key)
+    if store is None:
+        store = SnapshotStore(
+            os.path.join(SNAPSHOT_DIR, f"{key}.sqlite"), max_snapshots=SNAPSHOT_MAX
+        )
+        SNAPSHOT_STORES.set(key, store)
+    return store
+
+
 def get_ghh(login_user, gat, hostname, timeout):
     """
-    Get ghh object.
+    Get ghh object, reusing a cached one for the same credentials.
     Useful for quickly verifying if credentials can be used to login.
     """
-    ghh = GitHubHealth(
-        login=login_user,
-        gat=gat,
-        hostname=hostname,
-        timeout=timeout,
-    )
+    key = get_ghh_key(login_user, gat, hostname)
+    ghh = GHH_CACHE.get(key)
+    if ghh is None:
+        ghh = GitHubHealth(
+            login=login_user,
+            gat=gat,
+            hostname=hostname,
+            timeout=timeout,
+            cache=RESPONSE_CACHE,
+            scheduler=RateLimitScheduler(max_wait=SCHEDULER_MAX_WAIT),
+            search_ttl=SEARCH_TTL,
+        )
+        GHH_CACHE.set(key, ghh)
     return ghh
 
 
+def get_user_metadata(ghh, input_from=1, input_to=10):
+    """
+    Metadata table of the logged in user for this request.
+    The cached ghh is shared by every request of the login so pages are not kept on it.
+    """
+    metadata = Metadata(ghh.user)
+    metadata.set_input_limits(input_from=input_from, input_to=input_to)
+    metadata.get_metadata()
+    metadata.get_metadata_html()
+    return metadata
+
+
+def run_status_job(job, ghh, resource_name, store):
+    """
+    Scan resource_name for the status page, run in the background by JOB_RUNNER.
+    The scan uses its own RequestedObject so jobs of one login can run side by side.
+    """
+    job.set_step("object", f"getting {resource_name}")
+    requested_object = ghh.get_object(resource_name)
+    result = {
+        "requested_object": requested_object,
+        "table": None,
+        "plots": [],
+        "plot_data": "[]",
+    }
+    if requested_object.obj is None:
+        return result
+    job.set_step("repos", "listing repos")
+    requested_object.get_repos()
+    job.set_step("details", f"getting details of {len(requested_object.repos)} repos")
+    requested_object.get_repo_df(callback=job.add_row)
+    job.set_step("table", "formatting table")
+    result["table"] = get_repo_table(requested_object.repo_df)
+    job.set_step("plots", "rendering plots")
+    requested_object.get_plots(max_rows=PLOT_ROWS)
+    job.set_step("snapshot", "saving snapshot")
+    store.append_repo_df(resource_name, requested_object.repo_df)
+    result["plots"] = requested_object.plots
+    result["plot_data"] = requested_object.plot_data
+    return result
+
+
 app = Flask(__name__)
 app.config["SECRET_KEY"] = os.urandom(32)
 csrf = CSRFProtect()
@@ -138,20 +278,35 @@ LOG = create_logger(app)
 Bootstrap(app)
 
 
+def get_rate_limit_message(retry_after, done=None):
+    """
+    Message shown when GitHub rate limits outlast SCHEDULER_MAX_WAIT.
+    """
+    message = f"GitHub rate limit reached, please retry in about {retry_after}s"
+    if done is not None:
+        message += f", the {done} repos fetched so far are shown"
+    return message
+
+
 @app.errorhandler(RateLimitExceededException)
-def handle_rate_limit_error(error_message):
+def handle_rate_limit_error(limit_error):
     """
-    Handle a CSRF error.
+    Handle a rate limit the scheduler gave up waiting for.
+    The session is kept and the page can be reloaded once the limit resets.
     """
-    LOG.debug("debugCSRF: %s", error_message)
-    login_form = LoginForm()
+    retry_after = get_retry_after(limit_error.headers)
+    LOG.info("rate limited on %s, retry in %ss", request.path, retry_after)
+    ghh, _ = try_ghh(session)
+    page_args = {} if ghh is None else {"ghh": ghh}
     return (
         render_template(
-            "index.html",
-            login_form=login_form,
-            error=error_message,
+            "rate_limited.html",
+            retry_url=request.url,
+            error=get_rate_limit_message(retry_after),
+            **page_args,
         ),
-        400,
+        429,
+        {"Retry-After": str(retry_after)},
     )
 
 
@@ -286,6 +441,10 @@ def logout():
     """
     Logout and return to login.
     """
+    if all(x in session for x in ["login_user", "gat", "hostname"]):
+        GHH_CACHE.pop(
+            get_ghh_key(session["login_user"], session["gat"], session["hostname"])
+        )
     if "login_user" in session:
         del session["login_user"]
     if "gat" in session:
@@ -305,8 +464,6 @@ def user(username):
     if ghh is not None:
         search_form = SearchForm()
         more_form = MoreForm()
-        ghh.user.get_metadata()
-        ghh.user.get_metadata_html()
         # this is needed. how else whould I do it?
         # pylint: disable=no-else-return
         if request.method == "POST":
@@ -322,22 +479,19 @@ def user(username):
                     )
                 )
             elif more_form.validate():
-                ghh.user.metadata.set_input_limits(
-                    input_from=more_form.input_from.data,
-                    input_to=more_form.input_to.data,
-                )
-                ghh.user.metadata.get_metadata()
-                ghh.user.metadata.get_metadata_html()
-                setattr(ghh.user, "metadata_html", ghh.user.metadata.metadata_html)
                 return render_template(
                     "user.html",
                     ghh=ghh,
+                    metadata=get_user_metadata(
+                        ghh, more_form.input_from.data, more_form.input_to.data
+                    ),
                     search_form=search_form,
                     more_form=more_form,
                 )
         return render_template(
             "user.html",
             ghh=ghh,
+            metadata=get_user_metadata(ghh),
             search_form=search_form,
             more_form=more_form,
         )
@@ -356,27 +510,31 @@ def search_results(search_request):
     ignore = session["ignore"]
     if ghh is not None:
         more_form = MoreForm()
-        try:
-            ghh.search(
-                search_request=search_request,
-                users=search_users,
-                orgs=search_orgs,
-                repos=search_repos,
-                ignore=ignore,
+        # results of this request only, the cached ghh keeps just the search cache
+        results = SearchResults(
+            ghh,
+            search_request,
+            users=search_users,
+            orgs=search_orgs,
+            repos=search_repos,
+            ignore=ignore,
+        )
+        if request.method == "POST" and more_form.validate():
+            results.set_input_limits(
+                input_from=more_form.input_from.data,
+                input_to=more_form.input_to.data,
             )
+        try:
+            results.search()
+            results.get_output_results()
         except UnknownObjectException:
             return redirect(url_for("user", username=session["login_user"]))
         except ReadTimeout:
             return redirect(url_for("user", username=session["login_user"]))
-        if request.method == "POST" and more_form.validate():
-            ghh.search_results.set_input_limits(
-                input_from=more_form.input_from.data,
-                input_to=more_form.input_to.data,
-            )
-            ghh.search_results.get_output_results()
         return render_template(
             "search_results.html",
             ghh=ghh,
+            search_results=results,
             more_form=more_form,
         )
     return redirect(url_for("user", username=session["login_user"]))
@@ -385,37 +543,193 @@ def search_results(search_request):
 @app.route("/status/<string:resource_name>")
 def status(resource_name):
     """
-    Return status of search.
+    Start scan of resource_name in the background and return loading page.
     """
-    search_form = SearchForm()
-    more_form = MoreForm()
     ghh, _ = try_ghh(session)
     if ghh is not None:
-        try:
-            ghh.get_requested_object(resource_name)
-            ghh.get_requested_repos()
-            ghh.get_requested_df()
-            ghh.render_requested_html_table()
-            ghh.get_plots()
-        except UnknownObjectException as uoe_error:
-            return render_template(
-                "user.html",
-                ghh=ghh,
-                more_form=more_form,
-                search_form=search_form,
-                error=uoe_error,
-            )
-        except ReadTimeout as timeout_error:
-            return render_template(
-                "user.html",
-                ghh=ghh,
-                more_form=more_form,
-                search_form=search_form,
-                error=timeout_error,
-            )
+        job = JOB_RUNNER.submit(
+            get_ghh_key(session["login_user"], session["gat"], session["hostname"]),
+            resource_name,
+            STATUS_STEPS,
+            run_status_job,
+            ghh,
+            resource_name,
+            get_snapshot_store(session["login_user"], session["hostname"]),
+        )
         return render_template(
             "status.html",
             ghh=ghh,
+            job=job,
+            result=None,
+            columns=STREAM_COLUMNS,
+        )
+    return redirect(url_for("home"))
+
+
+def get_session_job(job_id):
+    """
+    Get job of the logged in user.
+    """
+    if not all(x in session for x in ["login_user", "gat", "hostname"]):
+        return None
+    return JOB_RUNNER.get(
+        job_id,
+        get_ghh_key(session["login_user"], session["gat"], session["hostname"]),
+    )
+
+
+@app.route("/job/<string:job_id>")
+def job_progress(job_id):
+    """
+    Return progress of background job as json.
+    """
+    job = get_session_job(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+    progress = job.get_progress()
+    progress["result_url"] = url_for("job_result", job_id=job_id)
+    return jsonify(progress)
+
+
+def get_event(event, data):
+    """
+    Format server sent event.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def iter_job_events(job, result_url):
+    """
+    Yield progress and each row of job as server sent events until it finishes.
+    """
+    sent = 0
+    message = None
+    while True:
+        rows, done = job.wait_rows(sent, timeout=STREAM_HEARTBEAT)
+        for row in rows:
+            yield get_event("row", row)
+        sent += len(rows)
+        progress = job.get_progress()
+        if done:
+            progress["result_url"] = result_url
+            yield get_event("done", progress)
+            return
+        if progress["message"] != message:
+            message = progress["message"]
+            yield get_event("progress", progress)
+        elif len(rows) == 0:
+            yield ": keepalive\n\n"
+
+
+@app.route("/job/<string:job_id>/stream")
+def job_stream(job_id):
+    """
+    Stream rows of background job as server sent events.
+    """
+    job = get_session_job(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+    return Response(
+        stream_with_context(iter_job_events(job, url_for("job_result", job_id=job_id))),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/job/<string:job_id>/result")
+def job_result(job_id):
+    """
+    Return status page of finished background job.
+    """
+    ghh, _ = try_ghh(session)
+    job = get_session_job(job_id)
+    if ghh is None or job is None:
+        return redirect(url_for("home"))
+    if not job.done:
+        return render_template(
+            "status.html",
+            ghh=ghh,
+            job=job,
+            result=None,
+            columns=STREAM_COLUMNS,
+        )
+    if job.status == "rate_limited":
+        return render_template(
+            "status.html",
+            ghh=ghh,
+            job=job,
+            result=None,
+            columns=STREAM_COLUMNS,
+            error=get_rate_limit_message(job.retry_after, len(job.rows)),
+        )
+    if job.error is not None:
+        return render_template(
+            "user.html",
+            ghh=ghh,
+            metadata=get_user_metadata(ghh),
+            more_form=MoreForm(),
+            search_form=SearchForm(),
+            error=job.error,
+        )
+    return render_template(
+        "status.html",
+        ghh=ghh,
+        job=job,
+        result=job.result,
+    )
+
+
+def get_table_page(table):
+    """
+    Page of table selected by the start, count, sort, order and search args as json.
+    """
+    try:
+        page = table.get_page(
+            start=request.args.get("start", 0, type=int),
+            count=request.args.get("count", TABLE_PAGE_SIZE, type=int),
+            sort=request.args.get("sort") or None,
+            ascending=request.args.get("order", "asc") != "desc",
+            search=request.args.get("search") or None,
+        )
+    except ValueError as table_error:
+        return jsonify({"error": str(table_error)}), 400
+    return jsonify(page)
+
+
+@app.route("/job/<string:job_id>/table")
+def job_table(job_id):
+    """
+    Return page of the repo table of finished background job as json.
+    """
+    job = get_session_job(job_id)
+    if job is None or not job.done or job.result is None:
+        return jsonify({"error": "unknown job"}), 404
+    if job.result["table"] is None:
+        return jsonify({"error": "no table"}), 404
+    return get_table_page(job.result["table"])
+
+
+@app.route("/history/<string:resource_name>")
+def history(resource_name):
+    """
+    Return trend and last known results of previous status views as json.
+    """
+    ghh, _ = try_ghh(session)
+    if ghh is not None:
+        store = get_snapshot_store(session["login_user"], session["hostname"])
+        latest_df = store.get_latest_repo_df(resource_name)
+        return jsonify(
+            {
+                "trend": store.get_trend(resource_name).to_dict(orient="records"),
+                "snapshot_time": store.get_latest_snapshot_time(resource_name),
+                "latest": (
+                    []
+                    if latest_df is None
+                    else latest_df.astype(object)
+                    .where(latest_df.notna(), None)
+                    .to_dict(orient="records")
+                ),
+            }
         )
     return redirect(url_for("home"))
 
@@ -429,16 +743,37 @@ def repo_status(repo_owner, repo_name):
     if ghh is not None:
         repo = ghh.get_repo(repo_owner, repo_name)
         repo.get_repo_df()
-        repo.get_html_table()
-        repo.get_plots()
+        repo.get_table()
+        repo.get_plots(max_rows=PLOT_ROWS)
+        REPO_TABLES.set(get_repo_table_key(repo_owner, repo_name), repo.table)
         return render_template(
             "repo_status.html",
             ghh=ghh,
             repo=repo,
+            repo_owner=repo_owner,
+            repo_name=repo_name,
         )
     return redirect(url_for("home"))
 
 
+@app.route("/repo_status/<string:repo_owner>/<string:repo_name>/table")
+def repo_table(repo_owner, repo_name):
+    """
+    Return page of the branch table of repo as json.
+    """
+    ghh, _ = try_ghh(session)
+    if ghh is None:
+        return jsonify({"error": "not logged in"}), 404
+    key = get_repo_table_key(repo_owner, repo_name)
+    table = REPO_TABLES.get(key)
+    if table is None:
+        repo = ghh.get_repo(repo_owner, repo_name)
+        repo.get_table()
+        table = repo.table
+        REPO_TABLES.set(key, table)
+    return get_table_page(table)
+
+
 if __name__ == "__main__":
     if not app.debug:
         app.logger.addHandler(mail_handler)
@@ -28,6 +28,233 @@ function loading_more(){
     $("#loading").show();
 }
 
+function pollJob(progressUrl, messageId, interval = 1000){
+    // poll background job until it finishes, then load its result page
+    $("body").addClass("cursor-wait");
+    $.getJSON(progressUrl, function(progress) {
+        if (["done", "error", "rate_limited"].includes(progress.status)) {
+            window.location.replace(progress.result_url);
+            return;
+        }
+        let message = progress.message + " (" + (progress.step + 1) + "/" + progress.steps + ")";
+        document.getElementById(messageId).textContent = message;
+        setTimeout(function() { pollJob(progressUrl, messageId, interval); }, interval);
+    }).fail(function() {
+        $("body").removeClass("cursor-wait");
+        document.getElementById(messageId).textContent = "lost track of job, please reload";
+    });
+}
+
+function fillStreamTable(tableId, columns, rows){
+    // add the rows a stopped job streamed before it stopped
+    for (const row of rows) {
+        appendStreamRow(tableId, columns, row);
+    }
+}
+
+function appendStreamRow(tableId, columns, row){
+    // add one streamed repo row to the table, repo name links to its url
+    let tr = document.createElement("tr");
+    for (const column of columns) {
+        let td = document.createElement("td");
+        let value = row[column];
+        if (column == "repo") {
+            let a = document.createElement("a");
+            a.href = row["repo_url"];
+            a.target = "_blank";
+            a.textContent = value;
+            td.appendChild(a);
+        } else if (typeof value == "number" && !Number.isInteger(value)) {
+            td.textContent = value.toFixed(2);
+        } else {
+            td.textContent = value == null ? "" : value;
+        }
+        tr.appendChild(td);
+    }
+    document.getElementById(tableId).tBodies[0].appendChild(tr);
+    return tr;
+}
+
+function showLastKnown(historyUrl, tableId, columns){
+    // show the last snapshot of a previous scan until the job streams fresh rows
+    $.getJSON(historyUrl, function(history) {
+        let table = document.getElementById(tableId);
+        if (history.latest.length == 0 || table.tBodies[0].rows.length > 0) {
+            return;
+        }
+        for (const row of history.latest) {
+            appendStreamRow(tableId, columns, row).classList.add("last-known");
+        }
+        table.createCaption().textContent = (
+            "last known results of " + history.snapshot_time + " UTC ("
+            + history.trend.length + " snapshots), refreshing"
+        );
+    });
+}
+
+function clearLastKnown(tableId){
+    // drop last known rows once fresh rows arrive
+    let table = document.getElementById(tableId);
+    table.querySelectorAll("tr.last-known").forEach(function(row) { row.remove(); });
+    table.deleteCaption();
+}
+
+function streamJob(streamUrl, progressUrl, tableId, messageId, columns){
+    // fill table with rows as the background job fetches them, then load its result page
+    if (typeof EventSource == "undefined") {
+        pollJob(progressUrl, messageId);
+        return;
+    }
+    $("body").addClass("cursor-wait");
+    let source = new EventSource(streamUrl);
+    source.addEventListener("row", function(event) {
+        clearLastKnown(tableId);
+        appendStreamRow(tableId, columns, JSON.parse(event.data));
+    });
+    source.addEventListener("progress", function(event) {
+        let progress = JSON.parse(event.data);
+        let message = progress.message + " (" + (progress.step + 1) + "/" + progress.steps + ")";
+        document.getElementById(messageId).textContent = message;
+    });
+    source.addEventListener("done", function(event) {
+        source.close();
+        window.location.replace(JSON.parse(event.data).result_url);
+    });
+    source.onerror = function() {
+        // stream dropped, fall back to polling
+        source.close();
+        pollJob(progressUrl, messageId);
+    };
+}
+
+function virtualTable(pageUrl, containerId, tableId, rowHeight = 32, pageSize = 100){
+    // table of any length that only keeps the visible rows in the page
+    // rows are fetched a page at a time, sorted by clicking a heading and filtered by search
+    let container = document.getElementById(containerId);
+    let search = document.createElement("input");
+    search.type = "search";
+    search.placeholder = "filter rows";
+    search.className = "virtual-table-search";
+    let viewport = document.createElement("div");
+    viewport.className = "virtual-table-viewport";
+    let table = document.createElement("table");
+    table.id = "T_" + tableId;
+    table.createTHead().insertRow();
+    let tbody = table.createTBody();
+    viewport.appendChild(table);
+    container.appendChild(search);
+    container.appendChild(viewport);
+    let state = {sort: null, order: "asc", search: "", filtered: 0, pages: {}, columns: null, version: 0};
+
+    function getPage(pageIndex) {
+        if (pageIndex in state.pages) {
+            return;
+        }
+        state.pages[pageIndex] = null;
+        let version = state.version;
+        let args = {start: pageIndex * pageSize, count: pageSize, order: state.order, search: state.search};
+        if (state.sort != null) {
+            args.sort = state.sort;
+        }
+        $.getJSON(pageUrl, args, function(page) {
+            if (version != state.version) {
+                return;
+            }
+            state.pages[pageIndex] = page.rows;
+            state.filtered = page.filtered;
+            if (state.columns == null) {
+                state.columns = page.columns;
+                drawHeader();
+            }
+            draw();
+        }).fail(function() {
+            delete state.pages[pageIndex];
+        });
+    }
+
+    function drawHeader() {
+        let tr = table.tHead.rows[0];
+        tr.innerHTML = "";
+        state.columns.forEach(function(column, col) {
+            let th = document.createElement("th");
+            th.id = "T_" + tableId + "_level0_col" + col;
+            th.className = "col_heading level0 col" + col;
+            if (column == state.sort) {
+                th.classList.add("sorted-" + state.order);
+            }
+            th.textContent = column;
+            th.onclick = function() {
+                if (state.sort == column) {
+                    state.order = state.order == "asc" ? "desc" : "asc";
+                } else {
+                    state.sort = column;
+                    state.order = "asc";
+                }
+                drawHeader();
+                reload();
+            };
+            tr.appendChild(th);
+        });
+    }
+
+    function getSpacer(height) {
+        let tr = document.createElement("tr");
+        tr.className = "virtual-table-spacer";
+        tr.style.height = height + "px";
+        return tr;
+    }
+
+    function draw() {
+        let first = Math.floor(viewport.scrollTop / rowHeight);
+        // viewport has no height until its rows are drawn, fill the window instead
+        let height = Math.max(viewport.clientHeight, window.innerHeight);
+        let last = Math.min(state.filtered, first + Math.ceil(height / rowHeight) + 1);
+        let rows = document.createDocumentFragment();
+        rows.appendChild(getSpacer(first * rowHeight));
+        for (let row = first; row < last; row++) {
+            let page = state.pages[Math.floor(row / pageSize)];
+            let tr = document.createElement("tr");
+            tr.style.height = rowHeight + "px";
+            if (page != null) {
+                page[row % pageSize].forEach(function(cell, col) {
+                    let td = document.createElement("td");
+                    td.className = ("data row" + row + " col" + col + " " + cell[1]).trim();
+                    td.innerHTML = cell[0];
+                    tr.appendChild(td);
+                });
+            }
+            rows.appendChild(tr);
+        }
+        rows.appendChild(getSpacer((state.filtered - last) * rowHeight));
+        tbody.innerHTML = "";
+        tbody.appendChild(rows);
+        getPage(Math.floor(first / pageSize));
+        if (last > 0) {
+            getPage(Math.floor((last - 1) / pageSize));
+        }
+    }
+
+    function reload() {
+        state.version += 1;
+        state.pages = {};
+        viewport.scrollTop = 0;
+        getPage(0);
+    }
+
+    let searchTimer = null;
+    search.oninput = function() {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(function() {
+            state.search = search.value;
+            reload();
+        }, 300);
+    };
+    viewport.onscroll = function() {
+        window.requestAnimationFrame(draw);
+    };
+    getPage(0);
+}
+
 function settings() {
     document.getElementById("settingsDropdown").classList.toggle("show");
 }
@@ -9,11 +9,26 @@ function showError(el, error){
     throw error;
 }
 
-function vegaEmbedPlot(plots, index, div_id, plot_index) {
-    // make plot index global for left/right fill functions
+var plot_data_g = null;
+
+function getPlotSpec(plot_index) {
+    // specs share one dataset, attach it under the name the spec references
+    let spec = JSON.parse(plots_g[plot_index]);
+    if (spec.datasets == null) {
+        spec.datasets = {};
+        spec.datasets[spec.data.name] = plot_data_g;
+    }
+    return spec;
+}
+
+function vegaEmbedPlot(plots, index, div_id, plot_index, plot_data) {
+    // make plot index and data global for left/right fill functions
     plot_index_g = plot_index;
     plots_g = plots;
-    var spec = JSON.parse(plots_g[plot_index]);
+    if (plot_data !== undefined) {
+        plot_data_g = plot_data;
+    }
+    var spec = getPlotSpec(plot_index);
     var embedOpt = {"mode": "vega-lite"};
     const el = document.getElementById(index);
     vegaEmbed(div_id, spec, embedOpt).catch(error => showError(el, error));
@@ -41,15 +56,16 @@ function prefillSelectY() {
     dropdown.empty();
     dropdown.append('<option disabled>Choose Y Variable</option>');
     dropdown.prop('selectedIndex', 0);
+    // plots are chosen by index, aggregated plots can share a y field
     $.each(plots_g, function (plot) {
-        plot_parsed = JSON.parse(plots[plot]);
-        dropdown.append($('<option></option>').attr('value', plot_parsed.encoding.y.field).text(plot_parsed.encoding.y.field));
+        plot_parsed = JSON.parse(plots_g[plot]);
+        dropdown.append($('<option></option>').attr('value', plot).text(plot_parsed.title));
     })
 }
 
 function prefillSelectX(checked=null) {
     let dropdown = $("#select-x");
-    let selected_plot = JSON.parse(plots_g[plot_index_g]);
+    let selected_plot = getPlotSpec(plot_index_g);
     dropdown.empty();
     this_x = selected_plot.encoding.x.field;
     dataset = selected_plot.data.name;
@@ -79,7 +95,7 @@ function filterX(check_id) {
     } else if (this_check.checked == 'false') {
         this_check.checked = 'true';
     }
-    let selected_plot = JSON.parse(plots_g[plot_index_g]);
+    let selected_plot = getPlotSpec(plot_index_g);
     let select_x = [];
     $('#select-x input[type="checkbox"]:checked').each(function(index, elem) {
         select_x.push($(elem).val());
@@ -102,15 +118,11 @@ function filterX(check_id) {
 }
 
 function selectY(aval) {
-    var new_index = 0;
-    $.each(plots_g, function (plot) {
-        plot_parsed = JSON.parse(plots_g[plot]);
-        if (aval == plot_parsed.encoding.y.field) {
-            vegaEmbedPlot(plots, "vis", "#vis_repo", new_index);
-            prefillSelectY();
-        }
-        new_index += 1;
-    });
+    if (aval === "" || isNaN(Number(aval))) {
+        return;
+    }
+    vegaEmbedPlot(plots_g, "vis", "#vis_repo", Number(aval));
+    prefillSelectY();
 }
 
 function selectX(aval) {
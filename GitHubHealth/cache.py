@@ -0,0 +1,108 @@
+"""
+In process caches shared between threads.
+"""
+
+from collections import OrderedDict
+import threading
+import time
+
+
+class TTLCache:
+    """
+    Thread safe LRU cache whose entries expire after ttl seconds.
+    Args:
+        maxsize (int)       : maximum number of entries, least recently used evicted first
+        ttl (float)         : default None, seconds an entry lives, None never expires
+        on_evict (callable) : default None, called with key and value of each entry
+                              dropped by expiry, size, replacement or clear
+    """
+
+    def __init__(self, maxsize, ttl=None, on_evict=None):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        with self.lock:
+            evicted = self.expire()
+            size = len(self.entries)
+        self.evict(evicted)
+        return size
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def expire(self):
+        """
+        Drop expired entries, caller must hold lock.
+        Returns the dropped (key, value) pairs to pass to evict once lock is released.
+        """
+        if self.ttl is None:
+            return []
+        now = time.monotonic()
+        expired = [key for key, (expires, _) in self.entries.items() if expires < now]
+        return [(key, self.entries.pop(key)[1]) for key in expired]
+
+    def evict(self, evicted):
+        """
+        Call on_evict for dropped (key, value) pairs.
+        """
+        if self.on_evict is not None:
+            for key, value in evicted:
+                self.on_evict(key, value)
+
+    def get(self, key, default=None):
+        """
+        Get value and mark it as most recently used.
+        """
+        evicted = []
+        with self.lock:
+            if key not in self.entries:
+                return default
+            expires, value = self.entries[key]
+            if expires < time.monotonic():
+                evicted.append((key, self.entries.pop(key)[1]))
+                value = default
+            else:
+                self.entries.move_to_end(key)
+        self.evict(evicted)
+        return value
+
+    def set(self, key, value):
+        """
+        Add value, evicting the least recently used entry above maxsize.
+        """
+        expires = float("inf") if self.ttl is None else time.monotonic() + self.ttl
+        evicted = []
+        with self.lock:
+            if key in self.entries and self.entries[key][1] is not value:
+                evicted.append((key, self.entries[key][1]))
+            self.entries[key] = (expires, value)
+            self.entries.move_to_end(key)
+            evicted += self.expire()
+            while len(self.entries) > self.maxsize:
+                evicted_key, (_, evicted_value) = self.entries.popitem(last=False)
+                evicted.append((evicted_key, evicted_value))
+        self.evict(evicted)
+
+    def pop(self, key, default=None):
+        """
+        Remove and return value.
+        """
+        with self.lock:
+            if key not in self.entries:
+                return default
+            return self.entries.pop(key)[1]
+
+    def clear(self):
+        """
+        Remove all entries.
+        """
+        with self.lock:
+            evicted = [(key, value) for key, (_, value) in self.entries.items()]
+            self.entries.clear()
+        self.evict(evicted)
@@ -0,0 +1,422 @@
+"""
+Command line batch scan of owners.
+Each owner (user or org) is scanned through GitHubHealth.get_object and its repo and
+branch frames written to their own files, a manifest records finished owners so an
+interrupted run can be resumed. Combined files of all owners are written at the end.
+"""
+
+import argparse
+from concurrent.futures import (
+    ThreadPoolExecutor,
+    as_completed,
+)
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+
+import pandas as pd
+
+from .main import (
+    ACCESS_TOKEN_VAR_NAME,
+    GitHubHealth,
+)
+from .utils import (
+    BRANCH_DF_DTYPES,
+    MAX_WORKERS,
+    REPOS_DF_DTYPES,
+    TIMEOUT,
+    get_branch_builder,
+)
+
+OUTPUT_FORMATS = ["parquet", "csv", "jsonl"]
+MANIFEST_NAME = "manifest.json"
+OWNERS_DIR_NAME = "owners"
+SCAN_WORKERS = 4
+PROGRESS_EVERY = 50
+FRAME_DTYPES = {"repos": REPOS_DF_DTYPES, "branches": BRANCH_DF_DTYPES}
+UNSAFE_PATH_CHARS = re.compile(r"[^A-Za-z0-9_-]")
+
+logger = logging.getLogger(__name__)
+logger.setLevel("INFO")
+
+
+def get_parser():
+    """
+    Argument parser of the scan command.
+    """
+    parser = argparse.ArgumentParser(
+        prog="ghh-scan",
+        description="Scan the repos of GitHub owners and write their health to files.",
+    )
+    parser.add_argument("owners", nargs="*", help="users or orgs to scan")
+    parser.add_argument(
+        "-f",
+        "--owners-file",
+        help='yaml file with a list of owners, or a mapping with "owners" and '
+        'optionally "hostname"',
+    )
+    parser.add_argument("--hostname", help="GitHub host, default github.com")
+    parser.add_argument(
+        "-t",
+        "--token",
+        action="append",
+        dest="tokens",
+        help=f"access token, repeat to pool tokens, default ${ACCESS_TOKEN_VAR_NAME}",
+    )
+    parser.add_argument("-o", "--output-dir", default=".", help="default current dir")
+    parser.add_argument(
+        "--format", choices=OUTPUT_FORMATS, default="parquet", dest="output_format"
+    )
+    parser.add_argument(
+        "--branches", action="store_true", help="also write the branches of each repo"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="skip owners finished by a previous run into the same output dir",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=SCAN_WORKERS,
+        help=f"owners scanned concurrently, default {SCAN_WORKERS}",
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=MAX_WORKERS,
+        help=f"repos fetched concurrently per owner, default {MAX_WORKERS}",
+    )
+    parser.add_argument("--backend", choices=["rest", "graphql"], default="rest")
+    parser.add_argument("--timeout", type=int, default=TIMEOUT)
+    return parser
+
+
+def read_owners_file(path):
+    """
+    Owners and hostname (None if not given) listed in yaml file path.
+    """
+    try:
+        # pylint: disable=import-outside-toplevel
+        import yaml
+    except ImportError as import_error:
+        raise ValueError("reading --owners-file requires pyyaml") from import_error
+    with open(path, "r", encoding="utf-8") as owners_file:
+        config = yaml.safe_load(owners_file)
+    if isinstance(config, list):
+        return [str(x) for x in config], None
+    if isinstance(config, dict) and isinstance(config.get("owners"), list):
+        return [str(x) for x in config["owners"]], config.get("hostname")
+    raise ValueError(f"Expected a list of owners or a mapping with owners in {path}.")
+
+
+def check_output_format(output_format):
+    """
+    Raise ValueError if output_format cannot be written here.
+    """
+    if output_format == "parquet":
+        try:
+            pd.io.parquet.get_engine("auto")
+        except ImportError as import_error:
+            raise ValueError(
+                "parquet output requires pyarrow or fastparquet, or use --format csv"
+            ) from import_error
+
+
+def write_df(output_df, path, output_format):
+    """
+    Write output_df to path.
+    """
+    if output_format == "parquet":
+        output_df.to_parquet(path, index=False)
+    elif output_format == "csv":
+        output_df.to_csv(path, index=False)
+    else:
+        output_df.to_json(path, orient="records", lines=True, date_format="iso")
+
+
+def read_df(path, output_format, dtypes=None):
+    """
+    Read a DataFrame written by write_df.
+    Columns in dtypes are cast back, csv and json lines do not keep them.
+    """
+    if output_format == "parquet":
+        output_df = pd.read_parquet(path)
+    elif output_format == "csv":
+        output_df = pd.read_csv(path)
+    else:
+        output_df = pd.read_json(path, orient="records", lines=True)
+    if dtypes:
+        output_df = output_df.astype(
+            {key: value for key, value in dtypes.items() if key in output_df.columns}
+        )
+    return output_df
+
+
+class Manifest:
+    """
+    Record of the owners a scan has finished, saved after each owner.
+    Args:
+        path (str)          : json file
+        settings (dict)     : output settings, a resumed scan must use the same
+    """
+
+    def __init__(self, path, settings):
+        self.path = path
+        self.settings = settings
+        self.owners = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path, settings):
+        """
+        Load manifest of a previous scan, empty if there is none.
+        """
+        manifest = cls(path, settings)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as manifest_file:
+                saved = json.load(manifest_file)
+            if saved["settings"] != settings:
+                raise ValueError(
+                    f"Cannot resume scan with {saved['settings']} as {settings}."
+                )
+            manifest.owners = saved["owners"]
+        return manifest
+
+    def is_done(self, owner):
+        """
+        Check if owner was scanned.
+        """
+        with self.lock:
+            return self.owners.get(owner, {}).get("status") == "done"
+
+    def set_owner(self, owner, entry):
+        """
+        Record owner and save.
+        """
+        with self.lock:
+            self.owners[owner] = entry
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as manifest_file:
+                json.dump(
+                    {"settings": self.settings, "owners": self.owners},
+                    manifest_file,
+                    indent=2,
+                )
+            os.replace(tmp_path, self.path)
+
+
+def get_owner_slug(owner):
+    """
+    File name safe version of owner, a hash is added if any character was replaced.
+    """
+    slug = UNSAFE_PATH_CHARS.sub("_", owner)
+    if slug != owner or slug == "":
+        slug = f"{slug}-{hashlib.sha256(owner.encode()).hexdigest()[:8]}"
+    return slug
+
+
+def get_owner_path(output_dir, owner, frame, output_format):
+    """
+    File of frame ("repos" or "branches") of owner.
+    """
+    return os.path.join(
+        output_dir,
+        OWNERS_DIR_NAME,
+        f"{get_owner_slug(owner)}.{frame}.{output_format}",
+    )
+
+
+def scan_owner(ghh, owner, branches=False):
+    """
+    Repo df and branch df (None unless branches) of owner, with owner columns added.
+    Branches are collected from the requests made for the repo details.
+    """
+    requested_object = ghh.get_object(owner)
+    if requested_object.obj is None:
+        raise ValueError(f"{owner} not found")
+    fetched = []
+    branch_dfs = []
+
+    def log_progress(_):
+        fetched.append(1)
+        if len(fetched) % PROGRESS_EVERY == 0:
+            logger.info("%s: %s repos", owner, len(fetched))
+
+    def add_branches(repo_name, branch_records):
+        branch_dfs.append(
+            get_branch_builder(branch_records)
+            .to_df()
+            .assign(owner=owner, repo=repo_name)
+        )
+
+    requested_object.get_repos()
+    requested_object.get_repo_df(
+        callback=log_progress, branch_callback=add_branches if branches else None
+    )
+    repo_df = requested_object.repo_df.assign(owner=owner)
+    branch_df = None
+    if branch_dfs:
+        branch_df = pd.concat(branch_dfs, ignore_index=True)
+    return repo_df, branch_df
+
+
+# pylint: disable=too-many-arguments
+def run_owner(ghh, owner, output_dir, output_format, branches, manifest):
+    """
+    Scan owner, write its files and record it in manifest.
+    """
+    start = time.time()
+    try:
+        repo_df, branch_df = scan_owner(ghh, owner, branches)
+    # pylint: disable=broad-except
+    except Exception as scan_error:
+        manifest.set_owner(owner, {"status": "error", "error": str(scan_error)})
+        raise
+    entry = {"status": "done", "repos": len(repo_df), "branches": 0}
+    write_df(
+        repo_df,
+        get_owner_path(output_dir, owner, "repos", output_format),
+        output_format,
+    )
+    if branch_df is not None:
+        entry["branches"] = len(branch_df)
+        write_df(
+            branch_df,
+            get_owner_path(output_dir, owner, "branches", output_format),
+            output_format,
+        )
+    entry["seconds"] = round(time.time() - start, 3)
+    manifest.set_owner(owner, entry)
+    return entry
+
+
+def combine_owners(owners, output_dir, output_format, manifest, frame):
+    """
+    Write frame of all finished owners to one file, returning its path.
+    """
+    frame_dfs = [
+        read_df(
+            get_owner_path(output_dir, owner, frame, output_format),
+            output_format,
+            FRAME_DTYPES[frame],
+        )
+        for owner in owners
+        if manifest.is_done(owner) and manifest.owners[owner][frame] > 0
+    ]
+    if len(frame_dfs) == 0:
+        return None
+    path = os.path.join(output_dir, f"{frame}.{output_format}")
+    write_df(pd.concat(frame_dfs, ignore_index=True), path, output_format)
+    return path
+
+
+def get_ghh(args, hostname):
+    """
+    GitHubHealth object shared by all owners of the scan.
+    """
+    tokens = args.tokens or [os.environ.get(ACCESS_TOKEN_VAR_NAME)]
+    tokens = [x for x in tokens if x]
+    return GitHubHealth(
+        hostname=hostname,
+        gat=tokens[0] if tokens else None,
+        timeout=args.timeout,
+        max_workers=args.max_workers,
+        backend=args.backend,
+        tokens=tokens if len(tokens) > 1 else None,
+    )
+
+
+def main(argv=None):
+    """
+    Run the scan command, returning 0 if every owner was scanned.
+    """
+    parser = get_parser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(format="[%(asctime)s] %(message)s", level="INFO")
+    owners = list(args.owners)
+    hostname = args.hostname
+    try:
+        if args.owners_file is not None:
+            file_owners, file_hostname = read_owners_file(args.owners_file)
+            owners += [x for x in file_owners if x not in owners]
+            hostname = hostname or file_hostname
+        check_output_format(args.output_format)
+    except ValueError as arg_error:
+        parser.error(str(arg_error))
+    if len(owners) == 0:
+        parser.error("give owners as arguments or in --owners-file")
+    os.makedirs(os.path.join(args.output_dir, OWNERS_DIR_NAME), exist_ok=True)
+    settings = {
+        "hostname": hostname,
+        "format": args.output_format,
+        "branches": args.branches,
+    }
+    manifest_path = os.path.join(args.output_dir, MANIFEST_NAME)
+    if args.resume:
+        try:
+            manifest = Manifest.load(manifest_path, settings)
+        except ValueError as resume_error:
+            parser.error(str(resume_error))
+    else:
+        manifest = Manifest(manifest_path, settings)
+    todo = [x for x in owners if not manifest.is_done(x)]
+    logger.info(
+        "%s owners to scan, %s already done", len(todo), len(owners) - len(todo)
+    )
+    failed = []
+    if len(todo) > 0:
+        ghh = get_ghh(args, hostname)
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            futures = {
+                executor.submit(
+                    run_owner,
+                    ghh,
+                    owner,
+                    args.output_dir,
+                    args.output_format,
+                    args.branches,
+                    manifest,
+                ): owner
+                for owner in todo
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                owner = futures[future]
+                try:
+                    entry = future.result()
+                    logger.info(
+                        "[%s/%s] %s: %s repos, %s branches in %ss",
+                        done,
+                        len(todo),
+                        owner,
+                        entry["repos"],
+                        entry["branches"],
+                        entry["seconds"],
+                    )
+                # pylint: disable=broad-except
+                except Exception as scan_error:
+                    failed.append(owner)
+                    logger.info(
+                        "[%s/%s] %s failed: %s", done, len(todo), owner, scan_error
+                    )
+    frames = ["repos", "branches"] if args.branches else ["repos"]
+    for frame in frames:
+        path = combine_owners(
+            owners, args.output_dir, args.output_format, manifest, frame
+        )
+        if path is not None:
+            logger.info("wrote %s", path)
+    if failed:
+        logger.info("%s owners failed, rerun with --resume to retry", len(failed))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,749 @@
+"""
+Local stand in for the GitHub REST API, for load testing without a token or quota.
+Serves the endpoints GitHubHealth uses (user, repos, branches, commits, issues, pulls,
+languages and search) under /api/v3 from owner data of the synthetic module, with
+GitHub style pagination, rate limit headers and ETags. Latency and errors (timeouts,
+secondary rate limits, server errors) can be injected per endpoint.
+Point GitHubHealth or the app login at it with hostname http://host:port.
+usage: python -m GitHubHealth.fake_api --owner me --owner my-org:org --repos 200
+"""
+
+import argparse
+import hashlib
+import logging
+import math
+import random
+import threading
+import time
+from urllib.parse import urlencode
+
+from flask import (
+    Flask,
+    g,
+    jsonify,
+    make_response,
+    request,
+)
+from werkzeug.serving import make_server
+
+from .synthetic import (
+    get_synthetic_data,
+    load_owner_data,
+)
+
+FAKE_API_PREFIX = "/api/v3"
+FAKE_ENDPOINTS = [
+    "user",
+    "repos",
+    "orgs",
+    "teams",
+    "repo",
+    "branches",
+    "commits",
+    "issues",
+    "pulls",
+    "languages",
+    "search",
+    "rate_limit",
+]
+FAKE_ERROR_KINDS = ["timeout", "secondary", "server"]
+FAKE_PER_PAGE = 30
+FAKE_MAX_PER_PAGE = 100
+FAKE_RATE_LIMITS = {"core": 5000, "search": 30}
+FAKE_RATE_WINDOWS = {"core": 3600, "search": 60}
+FAKE_TIMEOUT_DELAY = 30
+FAKE_RETRY_AFTER = 1
+FAKE_PORT = 5001
+FAKE_DOCS_URL = "https://docs.github.com/rest"
+
+logger = logging.getLogger(__name__)
+logger.setLevel("INFO")
+
+
+def check_endpoints(mapping, name):
+    """
+    Raise ValueError if mapping has keys other than FAKE_ENDPOINTS and "*".
+    """
+    unknown = [x for x in mapping if x not in FAKE_ENDPOINTS + ["*"]]
+    if unknown:
+        raise ValueError(
+            f"Expected {name} keys in {FAKE_ENDPOINTS} or *, got {unknown}."
+        )
+
+
+# pylint: disable=too-few-public-methods
+# pylint: disable=too-many-instance-attributes
+class FakeApiConfig:
+    """
+    Behaviour of a FakeGitHubApi.
+    Args:
+        latency (dict)          : default None, endpoint (see FAKE_ENDPOINTS) or "*" to
+                                  seconds slept before responding
+        errors (dict)           : default None, endpoint or "*" to {kind: rate} with kind
+                                  in FAKE_ERROR_KINDS and rate the fraction of requests
+        per_page (int)          : default FAKE_PER_PAGE, page size if a request sets none
+        rate_limits (dict)      : default FAKE_RATE_LIMITS, quota per token and resource
+        rate_windows (dict)     : default FAKE_RATE_WINDOWS, seconds until quotas reset
+                                  by resource
+        timeout_delay (float)   : default FAKE_TIMEOUT_DELAY, seconds a timeout stalls
+        retry_after (int)       : default FAKE_RETRY_AFTER, Retry-After of secondary limits
+        seed (int)              : default 0, seed of error injection
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        latency=None,
+        errors=None,
+        per_page=FAKE_PER_PAGE,
+        rate_limits=None,
+        rate_windows=None,
+        timeout_delay=FAKE_TIMEOUT_DELAY,
+        retry_after=FAKE_RETRY_AFTER,
+        seed=0,
+    ):
+        if latency is None:
+            latency = {}
+        if errors is None:
+            errors = {}
+        if rate_limits is None:
+            rate_limits = {}
+        if rate_windows is None:
+            rate_windows = {}
+        check_endpoints(latency, "latency")
+        check_endpoints(errors, "errors")
+        for kinds in errors.values():
+            unknown = [x for x in kinds if x not in FAKE_ERROR_KINDS]
+            if unknown:
+                raise ValueError(
+                    f"Expected error kinds in {FAKE_ERROR_KINDS}, got {unknown}."
+                )
+        self.latency = latency
+        self.errors = errors
+        self.per_page = per_page
+        self.rate_limits = {**FAKE_RATE_LIMITS, **rate_limits}
+        self.rate_windows = {**FAKE_RATE_WINDOWS, **rate_windows}
+        self.timeout_delay = timeout_delay
+        self.retry_after = retry_after
+        self.seed = seed
+
+    def get_latency(self, endpoint):
+        """
+        Seconds requests to endpoint are delayed.
+        """
+        return self.latency.get(endpoint, self.latency.get("*", 0.0))
+
+    def get_errors(self, endpoint):
+        """
+        Error kind to rate of requests to endpoint.
+        """
+        return self.errors.get(endpoint, self.errors.get("*", {}))
+
+
+class FakeGitHubApi:
+    """
+    Owners, repos and quotas served by the stand in, see create_app.
+    Args:
+        owners (list)       : owner data dicts (see synthetic.get_synthetic_data), with
+                              optional "type" "User" (default) or "Organization"
+        user_login (str)    : default None, login of the authenticated user, the first
+                              owner if None
+        config              : default None, FakeApiConfig, defaults if None
+    """
+
+    def __init__(self, owners, user_login=None, config=None):
+        if config is None:
+            config = FakeApiConfig()
+        if user_login is None:
+            user_login = owners[0]["login"] if owners else "user"
+        self.config = config
+        self.user_login = user_login
+        self.owners = {x["login"]: x for x in owners}
+        if user_login not in self.owners:
+            self.owners[user_login] = {"login": user_login, "repos": []}
+        self.owner_ids = {x: i + 1 for i, x in enumerate(self.owners)}
+        self.repos = {}
+        self.heads = {}
+        for login, owner_data in self.owners.items():
+            for repo_data in owner_data["repos"]:
+                self.repos[(login, repo_data["name"])] = repo_data
+                for branch_data in repo_data["branches"]:
+                    self.heads[(login, repo_data["name"], branch_data["sha"])] = (
+                        branch_data
+                    )
+        self.repo_ids = {x: i + 1 for i, x in enumerate(self.repos)}
+        self.quotas = {}
+        self.random = random.Random(config.seed)
+        self.lock = threading.Lock()
+
+    def get_urls(self):
+        """
+        API and web root urls of the current request.
+        """
+        root = request.host_url.rstrip("/")
+        return f"{root}{FAKE_API_PREFIX}", root
+
+    def get_user_json(self, login):
+        """
+        User or organization json of owner login.
+        """
+        api_url, web_url = self.get_urls()
+        owner_data = self.owners[login]
+        return {
+            "login": login,
+            "id": self.owner_ids[login],
+            "type": owner_data.get("type", "User"),
+            "site_admin": False,
+            "name": login,
+            "avatar_url": "",
+            "url": f"{api_url}/users/{login}",
+            "html_url": f"{web_url}/{login}",
+            "repos_url": f"{api_url}/users/{login}/repos",
+            "public_repos": len(owner_data["repos"]),
+        }
+
+    def get_org_json(self, login):
+        """
+        Organization json as listed by the orgs endpoints.
+        """
+        api_url, web_url = self.get_urls()
+        return {
+            "login": login,
+            "id": self.owner_ids[login],
+            "url": f"{api_url}/orgs/{login}",
+            "html_url": f"{web_url}/{login}",
+            "repos_url": f"{api_url}/orgs/{login}/repos",
+            "avatar_url": "",
+        }
+
+    def get_repo_json(self, login, repo_data):
+        """
+        Repository json of repo_data of owner login.
+        """
+        api_url, web_url = self.get_urls()
+        name = repo_data["name"]
+        languages = repo_data["languages"]
+        return {
+            "id": self.repo_ids[(login, name)],
+            "name": name,
+            "full_name": f"{login}/{name}",
+            "owner": self.get_user_json(login),
+            "private": repo_data["private"],
+            "fork": False,
+            "archived": False,
+            "html_url": f"{web_url}/{login}/{name}",
+            "url": f"{api_url}/repos/{login}/{name}",
+            "pushed_at": f"{repo_data['pushed_at']}Z",
+            "updated_at": f"{repo_data['updated_at']}Z",
+            "created_at": f"{repo_data['pushed_at']}Z",
+            "default_branch": (
+                repo_data["branches"][0]["name"] if repo_data["branches"] else "main"
+            ),
+            "language": max(languages, key=languages.get) if languages else None,
+        }
+
+    def get_branch_json(self, login, name, branch_data):
+        """
+        Branch json as listed by the branches endpoint, the commit is completed lazily.
+        """
+        api_url, _ = self.get_urls()
+        return {
+            "name": branch_data["name"],
+            "protected": branch_data["protected"],
+            "commit": {
+                "sha": branch_data["sha"],
+                "url": f"{api_url}/repos/{login}/{name}/commits/{branch_data['sha']}",
+            },
+        }
+
+    def get_commit_json(self, login, name, branch_data):
+        """
+        Commit json of the head of branch_data.
+        """
+        api_url, web_url = self.get_urls()
+        sha = branch_data["sha"]
+        signature = {
+            "name": branch_data["committer"] or "unknown",
+            "email": "",
+            "date": f"{branch_data['date']}Z",
+        }
+        committer = None
+        if branch_data["committer"] is not None:
+            committer = {
+                "login": branch_data["committer"],
+                "id": 0,
+                "type": "User",
+                "url": f"{api_url}/users/{branch_data['committer']}",
+                "html_url": f"{web_url}/{branch_data['committer']}",
+            }
+        return {
+            "sha": sha,
+            "url": f"{api_url}/repos/{login}/{name}/commits/{sha}",
+            "html_url": f"{web_url}/{login}/{name}/commit/{sha}",
+            "commit": {"author": signature, "committer": signature, "message": ""},
+            "author": committer,
+            "committer": committer,
+        }
+
+    def get_page(self, items, get_json, total_key=None):
+        """
+        Response of the requested page of items, each converted by get_json.
+        Link headers follow GitHub, page is the last parameter of each link.
+        With total_key the page is wrapped as {total_key: total, "items": page}.
+        """
+        page = max(int(request.args.get("page", 1)), 1)
+        per_page = min(
+            max(int(request.args.get("per_page", self.config.per_page)), 1),
+            FAKE_MAX_PER_PAGE,
+        )
+        last = max(math.ceil(len(items) / per_page), 1)
+        page_items = [
+            get_json(x) for x in items[(page - 1) * per_page : page * per_page]
+        ]
+        body = page_items
+        if total_key is not None:
+            body = {
+                total_key: len(items),
+                "incomplete_results": False,
+                "items": page_items,
+            }
+        response = jsonify(body)
+        params = [(x, y) for x, y in request.args.items(multi=True) if x != "page"]
+        links = {}
+        if page < last:
+            links["next"] = page + 1
+            links["last"] = last
+        if page > 1:
+            links["prev"] = page - 1
+            links["first"] = 1
+        if links:
+            response.headers["Link"] = ", ".join(
+                f'<{request.base_url}?{urlencode(params + [("page", y)])}>; rel="{x}"'
+                for x, y in links.items()
+            )
+        return response
+
+    def get_quota(self, resource):
+        """
+        Quota of the requesting token for resource, a new window starts at the reset.
+        Caller must hold lock.
+        """
+        token = request.headers.get("Authorization", f"anonymous {request.remote_addr}")
+        now = time.time()
+        quota = self.quotas.get((token, resource))
+        if quota is None or now >= quota["reset"]:
+            quota = {
+                "limit": self.config.rate_limits[resource],
+                "used": 0,
+                "reset": int(now + self.config.rate_windows[resource]),
+            }
+            self.quotas[(token, resource)] = quota
+        return quota
+
+    def get_error(self, endpoint):
+        """
+        Injected error kind of this request, None for most.
+        """
+        with self.lock:
+            for kind, rate in self.config.get_errors(endpoint).items():
+                if self.random.random() < rate:
+                    return kind
+        return None
+
+    def before_request(self):
+        """
+        Apply latency, injected errors and the rate limit to a request.
+        """
+        endpoint = request.endpoint
+        if endpoint not in FAKE_ENDPOINTS:
+            return None
+        latency = self.config.get_latency(endpoint)
+        if latency > 0:
+            time.sleep(latency)
+        error = self.get_error(endpoint)
+        if error == "timeout":
+            time.sleep(self.config.timeout_delay)
+        elif error == "secondary":
+            response = jsonify(
+                {
+                    "message": "You have exceeded a secondary rate limit. "
+                    "Please wait a few minutes before you try again.",
+                    "documentation_url": FAKE_DOCS_URL,
+                }
+            )
+            response.headers["Retry-After"] = str(self.config.retry_after)
+            return response, 403
+        elif error == "server":
+            return jsonify({"message": "Server Error"}), 502
+        if endpoint == "rate_limit":
+            return None
+        resource = "search" if endpoint == "search" else "core"
+        with self.lock:
+            quota = self.get_quota(resource)
+            g.quota = (resource, quota)
+            if quota["used"] >= quota["limit"]:
+                return (
+                    jsonify(
+                        {
+                            "message": "API rate limit exceeded for user.",
+                            "documentation_url": FAKE_DOCS_URL,
+                        }
+                    ),
+                    403,
+                )
+            quota["used"] += 1
+        return None
+
+    def after_request(self, response):
+        """
+        Add rate limit headers and an ETag, answering a matching If-None-Match with 304.
+        GitHub does not count 304 replies against the quota.
+        """
+        resource, quota = g.get("quota", (None, None))
+        if response.status_code == 200 and request.method == "GET":
+            etag = f'"{hashlib.md5(response.get_data()).hexdigest()}"'
+            if request.headers.get("If-None-Match") == etag:
+                response = make_response("", 304)
+                if quota is not None:
+                    with self.lock:
+                        quota["used"] = max(quota["used"] - 1, 0)
+            response.headers["ETag"] = etag
+        if quota is not None:
+            with self.lock:
+                response.headers["X-RateLimit-Limit"] = str(quota["limit"])
+                response.headers["X-RateLimit-Remaining"] = str(
+                    max(quota["limit"] - quota["used"], 0)
+                )
+                response.headers["X-RateLimit-Reset"] = str(quota["reset"])
+                response.headers["X-RateLimit-Used"] = str(quota["used"])
+                response.headers["X-RateLimit-Resource"] = resource
+        return response
+
+    def not_found(self):
+        """
+        GitHub not found response.
+        """
+        return (
+            jsonify({"message": "Not Found", "documentation_url": FAKE_DOCS_URL}),
+            404,
+        )
+
+    def user(self, login=None):
+        """
+        Authenticated user, or user or org login.
+        """
+        if login is None:
+            login = self.user_login
+        if login not in self.owners:
+            return self.not_found()
+        return jsonify(self.get_user_json(login))
+
+    def list_repos(self, login=None):
+        """
+        Repos of the authenticated user, or of user or org login.
+        """
+        if login is None:
+            login = self.user_login
+        if login not in self.owners:
+            return self.not_found()
+        return self.get_page(
+            self.owners[login]["repos"], lambda x: self.get_repo_json(login, x)
+        )
+
+    def orgs(self, login=None):
+        """
+        Organizations of the authenticated user, or of user login.
+        Every organization is listed for the authenticated user.
+        """
+        if login is not None and login not in self.owners:
+            return self.not_found()
+        orgs = []
+        if login is None or login == self.user_login:
+            orgs = [
+                x
+                for x, y in self.owners.items()
+                if y.get("type", "User") == "Organization"
+            ]
+        return self.get_page(orgs, self.get_org_json)
+
+    def teams(self):
+        """
+        Teams of the authenticated user, there are none.
+        """
+        return self.get_page([], lambda x: x)
+
+    def repo(self, login, name):
+        """
+        Repo name of owner login.
+        """
+        if (login, name) not in self.repos:
+            return self.not_found()
+        return jsonify(self.get_repo_json(login, self.repos[(login, name)]))
+
+    def branches(self, login, name):
+        """
+        Branches of a repo.
+        """
+        if (login, name) not in self.repos:
+            return self.not_found()
+        return self.get_page(
+            self.repos[(login, name)]["branches"],
+            lambda x: self.get_branch_json(login, name, x),
+        )
+
+    def commits(self, login, name, sha):
+        """
+        Head commit of a branch, with the Last-Modified header PyGitHub reads.
+        """
+        if (login, name, sha) not in self.heads:
+            return self.not_found()
+        branch_data = self.heads[(login, name, sha)]
+        response = jsonify(self.get_commit_json(login, name, branch_data))
+        response.headers["Last-Modified"] = branch_data["last_modified"]
+        return response
+
+    def get_numbered(self, login, name, kind):
+        """
+        Open issues or pulls of a repo, only their count is recorded.
+        """
+        if (login, name) not in self.repos:
+            return self.not_found()
+        api_url, web_url = self.get_urls()
+        count = self.repos[(login, name)]["issues" if kind == "issues" else kind]
+        return self.get_page(
+            range(1, count + 1),
+            lambda x: {
+                "id": x,
+                "number": x,
+                "title": f"{kind} {x}",
+                "state": "open",
+                "url": f"{api_url}/repos/{login}/{name}/{kind}/{x}",
+                "html_url": f"{web_url}/{login}/{name}/{kind}/{x}",
+            },
+        )
+
+    def issues(self, login, name):
+        """
+        Open issues of a repo.
+        """
+        return self.get_numbered(login, name, "issues")
+
+    def pulls(self, login, name):
+        """
+        Open pull requests of a repo.
+        """
+        return self.get_numbered(login, name, "pull_requests")
+
+    def languages(self, login, name):
+        """
+        Bytes per language of a repo.
+        """
+        if (login, name) not in self.repos:
+            return self.not_found()
+        return jsonify(self.repos[(login, name)]["languages"])
+
+    def search(self):
+        """
+        Search users or repositories by name, type:user and type:org are applied.
+        """
+        kind = "users" if request.path.endswith("/users") else "repositories"
+        words = request.args.get("q", "").lower().split()
+        terms = [x for x in words if ":" not in x]
+        owner_type = {"type:user": "User", "type:org": "Organization"}
+        types = [owner_type[x] for x in words if x in owner_type]
+        if kind == "users":
+            items = [
+                x
+                for x, y in self.owners.items()
+                if all(term in x.lower() for term in terms)
+                and (not types or y.get("type", "User") in types)
+            ]
+            return self.get_page(
+                sorted(items),
+                lambda x: {**self.get_user_json(x), "score": 1.0},
+                "total_count",
+            )
+        items = [
+            x
+            for x in sorted(self.repos)
+            if all(term in f"{x[0]}/{x[1]}".lower() for term in terms)
+        ]
+        return self.get_page(
+            items,
+            lambda x: {**self.get_repo_json(x[0], self.repos[x]), "score": 1.0},
+            "total_count",
+        )
+
+    def rate_limit(self):
+        """
+        Quotas of the requesting token, this request is not counted.
+        """
+        with self.lock:
+            resources = {
+                resource: {
+                    "limit": quota["limit"],
+                    "remaining": max(quota["limit"] - quota["used"], 0),
+                    "reset": quota["reset"],
+                    "used": quota["used"],
+                }
+                for resource, quota in (
+                    (x, self.get_quota(x)) for x in self.config.rate_limits
+                )
+            }
+        return jsonify({"resources": resources, "rate": resources["core"]})
+
+    def create_app(self):
+        """
+        Flask app serving the stand in, view endpoints are named as FAKE_ENDPOINTS.
+        """
+        fake_app = Flask(__name__)
+        rules = [
+            ("/user", "user", self.user),
+            ("/users/<login>", "user", self.user),
+            ("/orgs/<login>", "user", self.user),
+            ("/user/repos", "repos", self.list_repos),
+            ("/users/<login>/repos", "repos", self.list_repos),
+            ("/orgs/<login>/repos", "repos", self.list_repos),
+            ("/user/orgs", "orgs", self.orgs),
+            ("/users/<login>/orgs", "orgs", self.orgs),
+            ("/user/teams", "teams", self.teams),
+            ("/repos/<login>/<name>", "repo", self.repo),
+            ("/repos/<login>/<name>/branches", "branches", self.branches),
+            ("/repos/<login>/<name>/commits/<sha>", "commits", self.commits),
+            ("/repos/<login>/<name>/issues", "issues", self.issues),
+            ("/repos/<login>/<name>/pulls", "pulls", self.pulls),
+            ("/repos/<login>/<name>/languages", "languages", self.languages),
+            ("/search/users", "search", self.search),
+            ("/search/repositories", "search", self.search),
+            ("/rate_limit", "rate_limit", self.rate_limit),
+        ]
+        for rule, endpoint, view in rules:
+            fake_app.add_url_rule(
+                f"{FAKE_API_PREFIX}{rule}", endpoint=endpoint, view_func=view
+            )
+        fake_app.before_request(self.before_request)
+        fake_app.after_request(self.after_request)
+        fake_app.register_error_handler(404, lambda _: self.not_found())
+        return fake_app
+
+
+def start_server(wsgi_app, host="127.0.0.1", port=0):
+    """
+    Serve wsgi_app from a background thread, returning the server.
+    port 0 picks a free port, see server.server_port. Stop with server.shutdown().
+    """
+    server = make_server(host, port, wsgi_app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def parse_latency(values):
+    """
+    Latency dict from SECONDS or ENDPOINT=SECONDS arguments.
+    """
+    latency = {}
+    for value in values or []:
+        endpoint, _, seconds = value.rpartition("=")
+        latency[endpoint or "*"] = float(seconds)
+    return latency
+
+
+def parse_errors(values):
+    """
+    Errors dict from [ENDPOINT=]KIND:RATE arguments.
+    """
+    errors = {}
+    for value in values or []:
+        endpoint, _, error = value.rpartition("=")
+        kind, _, rate = error.partition(":")
+        errors.setdefault(endpoint or "*", {})[kind] = float(rate)
+    return errors
+
+
+def get_parser():
+    """
+    Argument parser of the stand in server.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m GitHubHealth.fake_api",
+        description="Serve a local stand in for the GitHub REST API.",
+    )
+    parser.add_argument(
+        "--owner",
+        action="append",
+        dest="owners",
+        help="synthetic owner LOGIN or LOGIN:org, repeatable, default synthetic",
+    )
+    parser.add_argument(
+        "--recording",
+        action="append",
+        dest="recordings",
+        help="owner recorded with synthetic.record_owner, repeatable",
+    )
+    parser.add_argument("--repos", type=int, default=100, help="per synthetic owner")
+    parser.add_argument("--branches", type=int, default=5, help="per synthetic repo")
+    parser.add_argument("--user", help="authenticated user login, default first owner")
+    parser.add_argument(
+        "--latency",
+        action="append",
+        help="SECONDS or ENDPOINT=SECONDS, repeatable, endpoints: "
+        + ", ".join(FAKE_ENDPOINTS),
+    )
+    parser.add_argument(
+        "--error",
+        action="append",
+        dest="errors",
+        help="[ENDPOINT=]KIND:RATE, repeatable, kinds: " + ", ".join(FAKE_ERROR_KINDS),
+    )
+    parser.add_argument("--per-page", type=int, default=FAKE_PER_PAGE)
+    parser.add_argument("--core-limit", type=int, default=FAKE_RATE_LIMITS["core"])
+    parser.add_argument("--search-limit", type=int, default=FAKE_RATE_LIMITS["search"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=FAKE_PORT)
+    return parser
+
+
+def get_owners(owners=None, recordings=None, repos=100, branches=5):
+    """
+    Owner data of synthetic owners ("login" or "login:org") and recordings.
+    """
+    if not owners and not recordings:
+        owners = ["synthetic"]
+    owner_list = []
+    for seed, owner in enumerate(owners or []):
+        login, _, owner_type = owner.partition(":")
+        owner_data = get_synthetic_data(repos, branches, login, seed=seed)
+        owner_data["type"] = "Organization" if owner_type == "org" else "User"
+        owner_list.append(owner_data)
+    owner_list += [load_owner_data(x) for x in recordings or []]
+    return owner_list
+
+
+def main(argv=None):
+    """
+    Run the stand in server until interrupted.
+    """
+    parser = get_parser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(format="[%(asctime)s] %(message)s", level="INFO")
+    try:
+        config = FakeApiConfig(
+            latency=parse_latency(args.latency),
+            errors=parse_errors(args.errors),
+            per_page=args.per_page,
+            rate_limits={"core": args.core_limit, "search": args.search_limit},
+            seed=args.seed,
+        )
+    except ValueError as config_error:
+        parser.error(str(config_error))
+    owners = get_owners(args.owners, args.recordings, args.repos, args.branches)
+    fake_api = FakeGitHubApi(owners, args.user, config)
+    logger.info("log in with hostname http://%s:%s, any token", args.host, args.port)
+    make_server(
+        args.host, args.port, fake_api.create_app(), threaded=True
+    ).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
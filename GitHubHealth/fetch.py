@@ -0,0 +1,149 @@
+"""
+Fetch engine for retrieving repo details concurrently.
+"""
+
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    wait,
+)
+import itertools
+import logging
+
+from .utils import (
+    MAX_WORKERS,
+    get_branch_df,
+    get_repo_details,
+    get_repos_builder,
+)
+
+# repos submitted per worker when streaming, bounds memory for long repo lists
+IN_FLIGHT_PER_WORKER = 2
+
+logger = logging.getLogger(__name__)
+logger.setLevel("INFO")
+
+
+def get_repo_record(repo, policy=None):
+    """
+    Get details of a single repo as a record of plain values.
+    """
+    return get_repo_details(repo, output="record", policy=policy)
+
+
+def get_repo_branch_records(repo, policy=None):
+    """
+    Get details of a single repo and its branches as records, from the same requests.
+    """
+    branch_records = []
+    repo_record = get_repo_details(
+        repo, output="record", policy=policy, branch_records=branch_records
+    )
+    return repo_record, branch_records
+
+
+class RepoFetcher:
+    """
+    Fetch repo details in a bounded thread pool.
+    Args:
+        max_workers (int)   : default MAX_WORKERS, 1 fetches serially
+        policy              : default None, HealthPolicy used for scores
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, policy=None):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self.policy = policy
+
+    def get_repo_record(self, repo):
+        """
+        Get details of a single repo scored with this fetcher's policy.
+        """
+        return get_repo_record(repo, self.policy)
+
+    def get_repo_branch_records(self, repo):
+        """
+        Get details of a single repo and its branches scored with this fetcher's policy.
+        """
+        return get_repo_branch_records(repo, self.policy)
+
+    def get_repo_records(self, repos):
+        """
+        Get details of each repo as a record, in the same order as repos.
+        """
+        repos = list(repos)
+        if self.max_workers == 1 or len(repos) <= 1:
+            return [self.get_repo_record(repo) for repo in repos]
+        workers = min(self.max_workers, len(repos))
+        logger.debug("fetching %s repos with %s workers", len(repos), workers)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.get_repo_record, repos))
+
+    def iter_repo_branch_records(self, repos):
+        """
+        Yield (repo record, branch records) of each repo as soon as it is fetched.
+        repos can be any iterable, e.g. a PaginatedList, and is consumed lazily with at
+        most IN_FLIGHT_PER_WORKER * max_workers repos held at a time.
+        """
+        repos = iter(repos)
+        if self.max_workers == 1:
+            for repo in repos:
+                yield self.get_repo_branch_records(repo)
+            return
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {
+                executor.submit(self.get_repo_branch_records, repo)
+                for repo in itertools.islice(
+                    repos, IN_FLIGHT_PER_WORKER * self.max_workers
+                )
+            }
+            try:
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                    for repo in itertools.islice(repos, len(done)):
+                        pending.add(executor.submit(self.get_repo_branch_records, repo))
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def iter_repo_records(self, repos):
+        """
+        Yield details of each repo as a record as soon as it is fetched.
+        """
+        for record, _ in self.iter_repo_branch_records(repos):
+            yield record
+
+    def get_repo_df(self, repos, callback=None, branch_callback=None):
+        """
+        Get details of all repos in one DataFrame sorted by repo name.
+        If callback is given it is called with each record as soon as it is fetched.
+        If branch_callback is given it is called with the repo name and branch records
+        of each repo, from the requests the repo details were made from.
+        """
+        if callback is None and branch_callback is None:
+            records = self.get_repo_records(repos)
+        else:
+            records = []
+            for record, branch_records in self.iter_repo_branch_records(repos):
+                if callback is not None:
+                    callback(record)
+                if branch_callback is not None:
+                    branch_callback(record["repo"], branch_records)
+                records.append(record)
+        repo_df = (
+            get_repos_builder(records)
+            .to_df()
+            .sort_values(by="repo")
+            .reset_index(drop=True)
+        )
+        return repo_df
+
+    # pylint: disable=no-self-use
+    def get_branch_df(self, repo):
+        """
+        Get branch details of a single repo.
+        """
+        return get_branch_df(repo)
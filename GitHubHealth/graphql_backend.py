@@ -0,0 +1,319 @@
+"""
+GraphQL fetch backend.
+Gets branch, issue, pull request and language details for many repos per request
+instead of 1 + N_branches + 3 REST requests per repo.
+"""
+
+from datetime import datetime, timezone
+from email.utils import format_datetime
+import itertools
+import logging
+
+import requests
+from github import MainClass
+from github.GithubException import (
+    GithubException,
+    RateLimitExceededException,
+    UnknownObjectException,
+)
+
+from .scheduler import (
+    is_primary_limit,
+    is_secondary_limit,
+)
+from .utils import (
+    DATE_NOW,
+    TIMEOUT,
+    get_branch_builder,
+    get_health,
+    get_repos_builder,
+)
+
+GRAPHQL_REPOS_PER_QUERY = 20
+GRAPHQL_BRANCHES_PER_PAGE = 100
+
+BRANCH_FIELDS = """
+fragment BranchFields on RefConnection {
+  pageInfo { hasNextPage endCursor }
+  nodes {
+    name
+    branchProtectionRule { id }
+    target {
+      ... on Commit {
+        oid
+        url
+        committedDate
+        author { date }
+        committer { user { login } }
+      }
+    }
+  }
+}
+"""
+REPO_FIELDS = (
+    """
+fragment RepoFields on Repository {
+  name
+  url
+  isPrivate
+  issues(states: OPEN) { totalCount }
+  pullRequests(states: OPEN) { totalCount }
+  languages(first: 1, orderBy: {field: SIZE, direction: DESC}) { nodes { name } }
+  refs(refPrefix: "refs/heads/", first: %(branches)s) { ...BranchFields }
+}
+"""
+    % {"branches": GRAPHQL_BRANCHES_PER_PAGE}
+    + BRANCH_FIELDS
+)
+BRANCHES_QUERY = (
+    """
+query($owner: String!, $name: String!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    refs(refPrefix: "refs/heads/", first: %(branches)s, after: $cursor) {
+      ...BranchFields
+    }
+  }
+}
+"""
+    % {"branches": GRAPHQL_BRANCHES_PER_PAGE}
+    + BRANCH_FIELDS
+)
+
+logger = logging.getLogger(__name__)
+logger.setLevel("INFO")
+
+
+def get_graphql_url(base_url):
+    """
+    Get GraphQL endpoint from REST base url.
+    github.com uses https://api.github.com/graphql, enterprise uses https://host/api/graphql.
+    """
+    if base_url.rstrip("/") == MainClass.DEFAULT_BASE_URL:
+        return f"{MainClass.DEFAULT_BASE_URL}/graphql"
+    if base_url.rstrip("/").endswith("/api/v3"):
+        return f"{base_url.rstrip('/')[:-len('/v3')]}/graphql"
+    return f"{base_url.rstrip('/')}/graphql"
+
+
+def get_repos_query(n_repos):
+    """
+    Build query for n_repos repositories, each aliased r<i> with owner<i>/name<i> variables.
+    """
+    variables = ", ".join(f"$owner{i}: String!, $name{i}: String!" for i in range(n_repos))
+    aliases = "\n".join(
+        f"  r{i}: repository(owner: $owner{i}, name: $name{i}) {{ ...RepoFields }}"
+        for i in range(n_repos)
+    )
+    return f"query({variables}) {{\n{aliases}\n}}\n{REPO_FIELDS}"
+
+
+def parse_date(date):
+    """
+    Parse GraphQL timestamp to naive UTC datetime like PyGitHub.
+    """
+    parsed = datetime.fromisoformat(date.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def get_branch_record(node):
+    """
+    Format GraphQL ref node as branch record matching get_branch_details.
+    """
+    commit = node["target"]
+    committer = "unknown_user"
+    if commit["committer"] is not None and commit["committer"]["user"] is not None:
+        committer = commit["committer"]["user"]["login"]
+    last_modified = format_datetime(
+        parse_date(commit["committedDate"]).replace(tzinfo=timezone.utc), usegmt=True
+    )
+    return {
+        "branch": node["name"],
+        "url": commit["url"],
+        "sha": commit["oid"][:7],
+        "last modified": last_modified,
+        "age (days)": (DATE_NOW - parse_date(commit["author"]["date"])).days,
+        "protected": node["branchProtectionRule"] is not None,
+        "committer": committer,
+    }
+
+
+def get_repo_record(node, branch_records, policy=None):
+    """
+    Format GraphQL repository node as repo record matching get_repo_details.
+    The REST issues endpoint counts pull requests as issues so they are added here too.
+    """
+    ages = [branch["age (days)"] for branch in branch_records]
+    languages = node["languages"]["nodes"]
+    pull_requests = node["pullRequests"]["totalCount"]
+    repo_record = {
+        "repo": node["name"],
+        "repo_url": node["url"],
+        "private": node["isPrivate"],
+        "branch count": len(ages),
+        "min branch age (days)": min(ages) if ages else float("nan"),
+        "max branch age (days)": max(ages) if ages else float("nan"),
+        "issues": node["issues"]["totalCount"] + pull_requests,
+        "pull requests": pull_requests,
+        "primary language": languages[0]["name"] if languages else None,
+    }
+    repo_record["score"] = get_health(repo_record, policy)
+    return repo_record
+
+
+class GraphQLClient:
+    """
+    Minimal GitHub GraphQL client.
+    Args:
+        base_url (str)      : REST base url of the host
+        token (str)         : personal access token, GraphQL does not accept passwords
+        timeout (int)       : default TIMEOUT
+        session (Session)   : default None, requests.Session used to post queries
+    """
+
+    def __init__(self, base_url, token, timeout=TIMEOUT, session=None):
+        if session is None:
+            session = requests.Session()
+        self.url = get_graphql_url(base_url)
+        self.token = token
+        self.timeout = timeout
+        self.session = session
+
+    def query(self, query, variables=None):
+        """
+        Post query and return data, raising RateLimitExceededException if the request
+        was rate limited and GithubException on errors without data. Partial errors,
+        e.g. an alias of a deleted repo resolving to null, are logged and data returned.
+        """
+        response = self.session.post(
+            self.url,
+            json={"query": query, "variables": variables or {}},
+            headers={"Authorization": f"bearer {self.token}"},
+            timeout=self.timeout,
+        )
+        output = response.json()
+        if is_primary_limit(response) or is_secondary_limit(response):
+            raise RateLimitExceededException(
+                response.status_code, output, response.headers
+            )
+        if response.status_code >= 400 or output.get("data") is None:
+            raise GithubException(response.status_code, output, response.headers)
+        for error in output.get("errors") or []:
+            logger.warning("graphql error: %s", error.get("message"))
+        return output["data"]
+
+
+class GraphQLFetcher:
+    """
+    Fetch repo details through GraphQL, batching many repos per query.
+    Drop in replacement for RepoFetcher.
+    Args:
+        client (GraphQLClient)  : client to run queries
+        repos_per_query (int)   : default GRAPHQL_REPOS_PER_QUERY
+        policy                  : default None, HealthPolicy used for scores
+    """
+
+    def __init__(self, client, repos_per_query=GRAPHQL_REPOS_PER_QUERY, policy=None):
+        if repos_per_query < 1:
+            raise ValueError("repos_per_query must be at least 1")
+        self.client = client
+        self.repos_per_query = repos_per_query
+        self.policy = policy
+
+    def get_branch_nodes(self, owner, name, refs):
+        """
+        Get all ref nodes, following pagination beyond the first page.
+        """
+        nodes = list(refs["nodes"])
+        while refs["pageInfo"]["hasNextPage"]:
+            data = self.client.query(
+                BRANCHES_QUERY,
+                {"owner": owner, "name": name, "cursor": refs["pageInfo"]["endCursor"]},
+            )
+            if data["repository"] is None:
+                break
+            refs = data["repository"]["refs"]
+            nodes.extend(refs["nodes"])
+        return nodes
+
+    def iter_repo_nodes(self, repos):
+        """
+        Yield (repo node, branch records) for repos, batched by repos_per_query.
+        repos can be any iterable and is consumed one batch at a time. Repos whose alias
+        resolves to null (deleted, renamed or inaccessible) are skipped.
+        """
+        repos = iter(repos)
+        while True:
+            batch = list(itertools.islice(repos, self.repos_per_query))
+            if len(batch) == 0:
+                return
+            variables = {}
+            for i, repo in enumerate(batch):
+                variables[f"owner{i}"] = repo.owner.login
+                variables[f"name{i}"] = repo.name
+            logger.debug("graphql query for %s repos", len(batch))
+            data = self.client.query(get_repos_query(len(batch)), variables)
+            for i, repo in enumerate(batch):
+                node = data.get(f"r{i}")
+                if node is None:
+                    logger.warning(
+                        "skipping %s/%s, not found", repo.owner.login, repo.name
+                    )
+                    continue
+                branch_nodes = self.get_branch_nodes(
+                    repo.owner.login, repo.name, node["refs"]
+                )
+                yield node, [get_branch_record(x) for x in branch_nodes]
+
+    def iter_repo_branch_records(self, repos):
+        """
+        Yield (repo record, branch records) of each repo as soon as its batch is fetched.
+        """
+        for node, branch_records in self.iter_repo_nodes(repos):
+            yield get_repo_record(node, branch_records, self.policy), branch_records
+
+    def iter_repo_records(self, repos):
+        """
+        Yield details of each repo as a record as soon as its batch is fetched.
+        """
+        for record, _ in self.iter_repo_branch_records(repos):
+            yield record
+
+    def get_repo_records(self, repos):
+        """
+        Get details of each repo as a record, in the same order as repos.
+        """
+        return list(self.iter_repo_records(repos))
+
+    def get_repo_df(self, repos, callback=None, branch_callback=None):
+        """
+        Get details of all repos in one DataFrame sorted by repo name.
+        If callback is given it is called with each record as soon as it is fetched.
+        If branch_callback is given it is called with the repo name and branch records
+        of each repo, from the queries the repo details were made from.
+        """
+        records = []
+        for record, branch_records in self.iter_repo_branch_records(repos):
+            if callback is not None:
+                callback(record)
+            if branch_callback is not None:
+                branch_callback(record["repo"], branch_records)
+            records.append(record)
+        repo_df = (
+            get_repos_builder(records)
+            .to_df()
+            .sort_values(by="repo")
+            .reset_index(drop=True)
+        )
+        return repo_df
+
+    def get_branch_df(self, repo):
+        """
+        Get branch details of a single repo.
+        """
+        for _, branch_records in self.iter_repo_nodes([repo]):
+            return get_branch_builder(branch_records).to_df()
+        raise UnknownObjectException(
+            404, {"message": f"{repo.owner.login}/{repo.name} not found"}, {}
+        )
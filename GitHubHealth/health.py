@@ -0,0 +1,165 @@
+"""
+Health scoring engine.
+A HealthPolicy holds rules that each take weight off max_score when a repo column
+crosses a threshold. Scores for a whole repo_df are computed in one vectorized pass,
+so cached results can be rescored under a new policy without refetching.
+"""
+
+import numpy as np
+import pandas as pd
+
+HEALTH_MAX_SCORE = 10.0
+HEALTH_OPERATORS = {
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+# formula heavily modified from pylint https://docs.pylint.org/en/1.6.0/faq.html
+DEFAULT_HEALTH_CONFIG = {
+    "max_score": HEALTH_MAX_SCORE,
+    "rules": [
+        {"column": "branch count", "operator": ">=", "threshold": 3, "weight": 2.5},
+        {
+            "column": "min branch age (days)",
+            "operator": ">=",
+            "threshold": 90,
+            "weight": 2.5,
+        },
+        {"column": "issues", "operator": ">", "threshold": 0, "weight": 2.5},
+        {"column": "pull requests", "operator": ">", "threshold": 0, "weight": 2.5},
+    ],
+}
+
+
+def get_float_values(values):
+    """
+    Values as a float array, missing values as nan.
+    """
+    if isinstance(values, pd.Series):
+        return pd.to_numeric(values, errors="coerce").to_numpy(
+            dtype="float64", na_value=np.nan
+        )
+    return np.array(
+        [np.nan if value is None or pd.isna(value) else value for value in values],
+        dtype="float64",
+    )
+
+
+# pylint: disable=too-few-public-methods
+class HealthRule:
+    """
+    Penalty applied when column compares true against threshold.
+    Missing values never match, except for "!=".
+    Args:
+        column (str)        : repo_df column
+        operator (str)      : one of HEALTH_OPERATORS
+        threshold (float)   : value compared against
+        weight (float)      : default 2.5, score taken off when the rule matches
+    """
+
+    def __init__(self, column, operator, threshold, weight=2.5):
+        if operator not in HEALTH_OPERATORS:
+            raise ValueError(
+                f"Expected operator in {list(HEALTH_OPERATORS)}, got {operator}."
+            )
+        self.column = column
+        self.operator = operator
+        self.threshold = threshold
+        self.weight = weight
+
+    def get_penalty(self, values):
+        """
+        Penalty of each value in a float array.
+        """
+        with np.errstate(invalid="ignore"):
+            matches = HEALTH_OPERATORS[self.operator](values, self.threshold)
+        return self.weight * matches
+
+    def to_dict(self):
+        """
+        Rule as a config dict.
+        """
+        return {
+            "column": self.column,
+            "operator": self.operator,
+            "threshold": self.threshold,
+            "weight": self.weight,
+        }
+
+
+class HealthPolicy:
+    """
+    Set of health rules, see DEFAULT_HEALTH_CONFIG for the config format.
+    Args:
+        rules (list)        : HealthRule objects
+        max_score (float)   : default HEALTH_MAX_SCORE, score of a repo matching no rule
+    """
+
+    def __init__(self, rules, max_score=HEALTH_MAX_SCORE):
+        self.rules = list(rules)
+        self.max_score = max_score
+
+    @classmethod
+    def from_dict(cls, config):
+        """
+        Create policy from a config dict.
+        """
+        return cls(
+            [HealthRule(**rule) for rule in config["rules"]],
+            max_score=config.get("max_score", HEALTH_MAX_SCORE),
+        )
+
+    def to_dict(self):
+        """
+        Policy as a config dict.
+        """
+        return {
+            "max_score": self.max_score,
+            "rules": [rule.to_dict() for rule in self.rules],
+        }
+
+    def get_penalty(self, columns, length):
+        """
+        Summed penalty per row of columns (mapping of column to values).
+        """
+        penalty = np.zeros(length, dtype="float64")
+        for rule in self.rules:
+            penalty += rule.get_penalty(get_float_values(columns[rule.column]))
+        return penalty
+
+    def score(self, repo_df):
+        """
+        Score of each row of repo_df as a Series aligned to its index.
+        """
+        penalty = self.get_penalty(repo_df, len(repo_df))
+        return pd.Series(
+            np.maximum(self.max_score - penalty, 0.0), index=repo_df.index, name="score"
+        )
+
+    def rescore(self, repo_df):
+        """
+        Copy of repo_df with score recomputed under this policy.
+        """
+        return repo_df.assign(score=self.score(repo_df))
+
+    def score_record(self, record):
+        """
+        Score of a single repo record.
+        """
+        penalty = self.get_penalty({key: [value] for key, value in record.items()}, 1)
+        return float(max(self.max_score - penalty[0], 0.0))
+
+    def score_summary(self, repo_df):
+        """
+        Score of all repos together, max_score less the mean penalty.
+        """
+        if len(repo_df) == 0:
+            return np.nan
+        penalty = self.get_penalty(repo_df, len(repo_df))
+        return float(max(self.max_score - penalty.mean(), 0.0))
+
+
+DEFAULT_HEALTH_POLICY = HealthPolicy.from_dict(DEFAULT_HEALTH_CONFIG)
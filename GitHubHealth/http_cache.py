@@ -0,0 +1,149 @@
+"""
+Response caches for conditional (ETag) requests to GitHub.
+Any object with get(key) and set(key, entry) methods can be used as a cache.
+An entry is a dict with keys etag, last_modified, headers and body.
+"""
+
+from collections import OrderedDict
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_SIZE = 100 * 1024 * 1024
+# responses of authenticated requests are private to the user running the app
+CACHE_DIR_MODE = 0o700
+CACHE_FILE_MODE = 0o600
+
+
+def get_entry_size(entry):
+    """
+    Approximate size of a cache entry in bytes.
+    """
+    return len(entry["body"]) + len(json.dumps(entry["headers"]))
+
+
+class MemoryResponseCache:
+    """
+    In process LRU response cache.
+    Args:
+        max_size (int)      : default DEFAULT_CACHE_SIZE, size cap in bytes
+    """
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self.size = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """
+        Get entry and mark it as most recently used.
+        """
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def set(self, key, entry):
+        """
+        Add entry, evicting least recently used entries above max_size.
+        """
+        entry_size = get_entry_size(entry)
+        with self.lock:
+            if key in self.entries:
+                self.size -= get_entry_size(self.entries.pop(key))
+            if entry_size > self.max_size:
+                return
+            self.entries[key] = entry
+            self.size += entry_size
+            while self.size > self.max_size:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= get_entry_size(evicted)
+
+
+class DiskResponseCache:
+    """
+    Persistent LRU response cache stored in a SQLite file.
+    The directory and file are made readable by their owner only.
+    Args:
+        path (str)          : directory for the cache file, created if missing
+        max_size (int)      : default DEFAULT_CACHE_SIZE, size cap in bytes
+    """
+
+    def __init__(self, path, max_size=DEFAULT_CACHE_SIZE):
+        os.makedirs(path, mode=CACHE_DIR_MODE, exist_ok=True)
+        os.chmod(path, CACHE_DIR_MODE)
+        self.path = os.path.join(path, "responses.sqlite")
+        os.close(os.open(self.path, os.O_CREAT | os.O_RDWR, CACHE_FILE_MODE))
+        os.chmod(self.path, CACHE_FILE_MODE)
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.con = sqlite3.connect(self.path, check_same_thread=False)
+        with self.lock, self.con:
+            self.con.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, headers TEXT, "
+                "body BLOB, size INTEGER, accessed REAL)"
+            )
+            self.con.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)"
+            )
+
+    def __len__(self):
+        with self.lock:
+            return self.con.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, key):
+        """
+        Get entry and mark it as most recently used.
+        """
+        with self.lock, self.con:
+            row = self.con.execute(
+                "SELECT etag, last_modified, headers, body FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self.con.execute(
+                "UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key)
+            )
+        return {
+            "etag": row[0],
+            "last_modified": row[1],
+            "headers": json.loads(row[2]),
+            "body": bytes(row[3]),
+        }
+
+    def set(self, key, entry):
+        """
+        Add entry, evicting least recently used entries above max_size.
+        """
+        entry_size = get_entry_size(entry)
+        if entry_size > self.max_size:
+            return
+        with self.lock, self.con:
+            self.con.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    entry["etag"],
+                    entry["last_modified"],
+                    json.dumps(entry["headers"]),
+                    entry["body"],
+                    entry_size,
+                    time.time(),
+                ),
+            )
+            total = self.con.execute("SELECT SUM(size) FROM responses").fetchone()[0]
+            while total > self.max_size:
+                key, size = self.con.execute(
+                    "SELECT key, size FROM responses ORDER BY accessed LIMIT 1"
+                ).fetchone()
+                self.con.execute("DELETE FROM responses WHERE key = ?", (key,))
+                total -= size
@@ -3,18 +3,35 @@ Helper functions to parse repo details.
 Main function handles logic to connect to GitHub and select repos for analysis.
 """
 
-from github import MainClass
+import requests
+
 from github.GithubException import UnknownObjectException
 
+from .cache import TTLCache
+from .fetch import RepoFetcher
+from .health import DEFAULT_HEALTH_POLICY
+from .graphql_backend import (
+    GraphQLClient,
+    GraphQLFetcher,
+)
 from .requested_object import (
     RequestedObject,
     RequestedRepo,
     SearchResults,
+    get_base_url,
     get_connection,
+    get_public_url,
 )
+from .scheduler import RateLimitScheduler
+from .token_pool import TokenPool
+from .transport import GitHubAdapter
 from .utils import (
+    MAX_WORKERS,
+    PLOT_MAX_ROWS,
+    SEARCH_CACHE_SIZE,
+    SEARCH_CACHE_TTL,
     TIMEOUT,
-    render_repo_html_table,
+    get_repo_table,
 )
 
 ACCESS_TOKEN_VAR_NAME = "GITHUB_TOKEN"
@@ -26,11 +43,24 @@ class GitHubHealth:
     """
     Class object for GitHubHeath.
     Args:
-        hostname (str)      : default None
+        hostname (str)      : default None, github.com, an enterprise host or a url
+                              with scheme such as http://localhost:5001 (see fake_api)
         login (str)         : default None
         password (str)      : default None
         gat (str)           : default None
         timeout (int)       : default TIMEOUT
+        max_workers (int)   : default MAX_WORKERS, repos fetched concurrently
+        backend (str)       : default "rest", "graphql" batches repo details per request
+        cache               : default None, response cache from http_cache
+        scheduler           : default None, RateLimitScheduler shared by all requests,
+                              one allowing max_workers requests in flight if None
+        tokens (list)       : default None, pool of access tokens to spread requests over,
+                              gat defaults to the first token
+        token_policy (str)  : default "round-robin", or "most-remaining"
+        search_ttl (float)  : default SEARCH_CACHE_TTL, seconds search result pages are
+                              reused, None keeps them until evicted
+        health_policy       : default None, HealthPolicy (see health) used for scores,
+                              DEFAULT_HEALTH_POLICY if None
     """
 
     def __init__(
@@ -40,35 +70,75 @@ class GitHubHealth:
         password=None,
         gat=None,
         timeout=TIMEOUT,
+        max_workers=MAX_WORKERS,
+        backend="rest",
+        cache=None,
+        scheduler=None,
+        tokens=None,
+        token_policy="round-robin",
+        search_ttl=SEARCH_CACHE_TTL,
+        health_policy=None,
     ):
         """
         Create connection based on (login+password) or (gat).
         """
-        if hostname is None:
-            self.base_url = MainClass.DEFAULT_BASE_URL
-        elif hostname == "github.com":
-            self.base_url = MainClass.DEFAULT_BASE_URL
+        self.base_url = get_base_url(hostname)
+        self.public_url = get_public_url(hostname)
+        if scheduler is None:
+            scheduler = RateLimitScheduler(max_concurrency=max_workers)
+        self.scheduler = scheduler
+        self.token_pool = None
+        if tokens is not None:
+            if gat is None:
+                gat = tokens[0]
+            self.token_pool = TokenPool(
+                [gat] + [x for x in tokens if x != gat], token_policy
+            )
+        if health_policy is None:
+            health_policy = DEFAULT_HEALTH_POLICY
+        self.health_policy = health_policy
+        if backend == "rest":
+            self.fetcher = RepoFetcher(max_workers, health_policy)
+        elif backend == "graphql":
+            if gat is None:
+                raise ValueError("graphql backend requires gat")
+            session = requests.Session()
+            session.mount(
+                f"{self.base_url.split('://')[0]}://",
+                GitHubAdapter(scheduler=scheduler, token_pool=self.token_pool),
+            )
+            self.fetcher = GraphQLFetcher(
+                GraphQLClient(self.base_url, gat, timeout, session),
+                policy=health_policy,
+            )
         else:
-            self.base_url = f"https://{hostname}/api/v3"
-        self.public_url = f"https://{hostname}/"
+            raise ValueError(f'Expected backend="rest" or "graphql", got {backend}.')
         self.con, self.user = get_connection(
             hostname,
             login,
             password,
             gat,
             timeout,
+            max_workers,
+            cache,
+            scheduler,
+            self.token_pool,
         )
+        setattr(self.user, "fetcher", self.fetcher)
         self.username = self.user.name
         self.user_url = self.user.url
         self.repos = []
         self.repo_dfs = {}
         self.repo_html = {}
         self.plots = None
+        self.plot_data = None
         self.requested_df = None
+        self.requested_table = None
         self.requested_object = None
         self.requested_user = None
         self.requested_org = None
         self.search_results = None
+        self.search_cache = TTLCache(maxsize=SEARCH_CACHE_SIZE, ttl=search_ttl)
 
     def get_repo(self, repo_owner, repo_name):
         """
@@ -78,6 +148,7 @@ class GitHubHealth:
         requested_repo = RequestedRepo(
             this_repo,
             this_repo.html_url,
+            self.fetcher,
         )
         return requested_repo
 
@@ -94,22 +165,32 @@ class GitHubHealth:
         search_results.get_output_results()
         setattr(self, "search_results", search_results)
 
-    def get_requested_object(self, resource_name):
+    def get_object(self, resource_name):
         """
-        Method to get repos as a class object.
+        Get user or org resource_name as a RequestedObject, obj is None if not found.
+        Unlike get_requested_object this leaves self unchanged, so it is safe to call
+        from several threads.
         """
         try:
             this_user = self.con.get_user(resource_name)
             requested_user = RequestedObject(
                 this_user,
                 this_user.html_url,
+                self.fetcher,
             )
         except UnknownObjectException:
             requested_user = RequestedObject(
                 None,
                 f"{self.public_url}/{resource_name}",
+                self.fetcher,
             )
-        setattr(self, "requested_object", requested_user)
+        return requested_user
+
+    def get_requested_object(self, resource_name):
+        """
+        Method to get repos as a class object.
+        """
+        setattr(self, "requested_object", self.get_object(resource_name))
 
     def get_requested_repos(self):
         """
@@ -118,25 +199,44 @@ class GitHubHealth:
         self.requested_object.get_repos()
         setattr(self, "requested_repos", self.requested_object.repos)
 
-    def get_requested_df(self):
+    def get_requested_df(self, callback=None):
         """
         Main method to parse repo details into pandas DataFrame.
+        If callback is given it is called with each repo record as soon as it is ready.
         """
-        self.requested_object.get_repo_df()
+        self.requested_object.get_repo_df(callback=callback)
         setattr(self, "requested_df", self.requested_object.repo_df)
 
+    def set_health_policy(self, policy):
+        """
+        Score with policy from now on and rescore the requested df without refetching.
+        """
+        setattr(self, "health_policy", policy)
+        setattr(self.fetcher, "policy", policy)
+        if self.requested_df is not None:
+            self.requested_object.rescore(policy)
+            setattr(self, "requested_df", self.requested_object.repo_df)
+            if self.requested_table is not None:
+                self.get_requested_table()
+
+    def get_requested_table(self):
+        """
+        Format requested df cells once for rendering or paging (see render.HtmlTable).
+        """
+        setattr(self, "requested_table", get_repo_table(self.requested_df))
+
     def render_requested_html_table(self):
         """
         Render pandas df to html with formatting of cells etc.
         """
-        requested_html = render_repo_html_table(
-            self.requested_df, table_id="requested-obj-metadata"
-        )
+        self.get_requested_table()
+        requested_html = self.requested_table.render("requested-obj-metadata")
         setattr(self, "repo_html", requested_html)
 
-    def get_plots(self):
+    def get_plots(self, max_rows=PLOT_MAX_ROWS):
         """
         get altair plot objects as html.
         """
-        self.requested_object.get_plots()
+        self.requested_object.get_plots(max_rows=max_rows)
         setattr(self, "plots", self.requested_object.plots)
+        setattr(self, "plot_data", self.requested_object.plot_data)
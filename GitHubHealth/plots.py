@@ -0,0 +1,205 @@
+"""
+Altair plots of repo and branch DataFrames.
+Imported on first use, importing altair is most of the cost of importing GitHubHealth.
+"""
+
+import hashlib
+import json
+
+import altair as alt
+from altair.utils.core import infer_vegalite_type
+import numpy as np
+import pandas as pd
+
+from .cache import TTLCache
+from .utils import (
+    PLOT_BIN_VARS,
+    PLOT_BINS,
+    PLOT_CACHE_SIZE,
+    PLOT_DATA_NAME,
+    PLOT_MAX_ROWS,
+    PLOT_TOP_N,
+)
+
+# plot specs and datasets by content of the plotted columns, see get_plot_specs
+PLOT_CACHE = TTLCache(maxsize=PLOT_CACHE_SIZE)
+
+
+def ghh_theme():
+    """
+    define the theme by returning the dictionary of configurations
+    """
+    return {
+        "config": {
+            "view": {
+                "height": 500,
+                "width": 500,
+            },
+            "mark": {
+                "color": "black",
+                "fill": "#1818ab",
+                "stroke": "black",
+                "strokeWidth": 10,
+            },
+            "axis": {
+                "titleFontSize": "20",
+                "labelFontSize": "20",
+            },
+            "title": {
+                "fontSize": "20",
+            },
+        }
+    }
+
+
+def enable_ghh_theme():
+    """
+    Register and enable ghh_theme, unless it is already the active theme.
+    """
+    if alt.themes.active != "ghh_theme":
+        alt.themes.register("ghh_theme", ghh_theme)
+        alt.themes.enable("ghh_theme")
+
+
+def get_content_hash(plot_df):
+    """
+    Hash of the columns, dtypes and values of plot_df.
+    """
+    content = hashlib.sha256()
+    content.update(repr(list(plot_df.dtypes.items())).encode("utf-8"))
+    content.update(pd.util.hash_pandas_object(plot_df, index=False).to_numpy())
+    return content.hexdigest()
+
+
+def get_plot_data(plot_df, columns):
+    """
+    Rows of plot_df columns as a json list, the dataset shared by all plots of a df.
+    """
+    return json.dumps(
+        alt.utils.sanitize_dataframe(plot_df[columns]).to_dict(orient="records")
+    )
+
+
+def get_ghh_plot(plot_df, var, x="repo"):
+    """
+    Standard formatting of ghh plot.
+    The spec references the PLOT_DATA_NAME dataset (see get_plot_data), plot_df is
+    only used to infer field types.
+    """
+    enable_ghh_theme()
+    var_type = infer_vegalite_type(plot_df[var])
+    plot = (
+        alt.Chart(alt.NamedData(name=PLOT_DATA_NAME))
+        .mark_bar()
+        .encode(
+            x=alt.X(x, type=infer_vegalite_type(plot_df[x])),
+            y=alt.Y(var, type=var_type),
+            tooltip=alt.Tooltip(var, type=var_type),
+        )
+        .interactive()
+        .properties(title=f"{var.replace('_', ' ')} by {x}")
+    )
+    return plot
+
+
+def get_ghh_repo_plot(plot_df, var):
+    """
+    Standard formatting of ghh plot.
+    """
+    return get_ghh_plot(plot_df, var, x="branch")
+
+
+def get_top_df(plot_df, var, x="repo", top_n=PLOT_TOP_N):
+    """
+    top_n rows of plot_df by var, the rest averaged into one "other" row.
+    """
+    values = plot_df[[x, var]].astype({var: "float64"})
+    top_df = values.nlargest(top_n, var)
+    rest = values.drop(top_df.index)
+    if len(rest) > 0:
+        other = pd.DataFrame(
+            {x: [f"other ({len(rest)}, mean)"], var: [rest[var].mean()]}
+        )
+        top_df = pd.concat([top_df, other], ignore_index=True)
+    return top_df
+
+
+def get_bin_df(plot_df, var, bins=PLOT_BINS):
+    """
+    Count of plot_df rows by var in at most bins whole number bins, plus missing.
+    """
+    values = pd.to_numeric(plot_df[var], errors="coerce").astype("float64")
+    present = values[values.notna()]
+    labels, counts = [], []
+    if len(present) > 0:
+        low = int(np.floor(present.min()))
+        high = int(np.floor(present.max())) + 1
+        width = max(1, int(np.ceil((high - low) / bins)))
+        edges = np.arange(low, high + width, width)
+        counts = np.histogram(present, bins=edges)[0].tolist()
+        labels = [
+            str(start) if width == 1 else f"{start}-{start + width - 1}"
+            for start in edges[:-1]
+        ]
+    if values.isna().any():
+        labels.append("missing")
+        counts.append(int(values.isna().sum()))
+    return pd.DataFrame({var: labels, "count": counts})
+
+
+def get_aggregated_plot(plot_df, var, x="repo"):
+    """
+    Plot of var with a bounded number of bars whatever the length of plot_df.
+    Histogram for PLOT_BIN_VARS, row count of each value for non numeric vars,
+    top PLOT_TOP_N rows by x otherwise. Aggregated data is embedded in the spec.
+    """
+    enable_ghh_theme()
+    if var in PLOT_BIN_VARS or infer_vegalite_type(plot_df[var]) != "quantitative":
+        if var in PLOT_BIN_VARS:
+            agg_df = get_bin_df(plot_df, var)
+        else:
+            agg_df = plot_df[var].astype(str).value_counts().rename_axis(var)
+            agg_df = agg_df.reset_index(name="count")
+        title = f"{x} count by {var.replace('_', ' ')}"
+        x_field, y_field = var, "count"
+    else:
+        agg_df = get_top_df(plot_df, var, x=x)
+        title = f"{var.replace('_', ' ')} of top {PLOT_TOP_N} by {x}"
+        x_field, y_field = x, var
+    plot = (
+        alt.Chart(agg_df)
+        .mark_bar()
+        .encode(
+            x=alt.X(x_field, type="nominal", sort=None),
+            y=alt.Y(y_field, type="quantitative"),
+            tooltip=alt.Tooltip(y_field, type="quantitative"),
+        )
+        .interactive()
+        .properties(title=title)
+    )
+    return plot
+
+
+def get_plot_specs(plot_df, x, plot_vars, max_rows=PLOT_MAX_ROWS):
+    """
+    Spec json of a plot of each of plot_vars by x, and the dataset they share.
+    Above max_rows rows plots are aggregated (see get_aggregated_plot) and carry
+    their own data, the shared dataset is then empty.
+    Cached in PLOT_CACHE by the content of the plotted columns, so unchanged data is
+    served without building charts.
+    """
+    columns = [x] + list(plot_vars)
+    aggregate = len(plot_df) > max_rows
+    key = (x, tuple(plot_vars), aggregate, get_content_hash(plot_df[columns]))
+    cached = PLOT_CACHE.get(key)
+    if cached is None:
+        if aggregate:
+            plots = [get_aggregated_plot(plot_df, var, x=x) for var in plot_vars]
+            plot_data = "[]"
+        else:
+            plots = [get_ghh_plot(plot_df, var, x=x) for var in plot_vars]
+            plot_data = get_plot_data(plot_df, columns)
+        plots = [plot.configure_view(discreteWidth=300).to_json() for plot in plots]
+        cached = (plots, plot_data)
+        PLOT_CACHE.set(key, cached)
+    return list(cached[0]), cached[1]
@@ -2,6 +2,7 @@
 RequesteObject class define attributes for easily retrieval.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 import logging
 import warnings
 
@@ -16,22 +17,63 @@ from github.NamedUser import NamedUser
 from github.Organization import Organization
 from github.Repository import Repository
 
+from .fetch import RepoFetcher
+from .transport import (
+    GitHubAdapter,
+    make_thread_safe,
+)
 from .utils import (
-    REPOS_TEMPLATE_DF,
+    MAX_WORKERS,
+    PLOT_MAX_ROWS,
+    REPO_CHUNK_SIZE,
     SEARCH_DF_COLUMNS,
     TIMEOUT,
-    get_ghh_plot,
-    get_ghh_repo_plot,
-    get_repo_details,
-    get_branch_df,
+    get_repos_builder,
+    get_single_repo_table,
     render_metadata_html_table,
-    render_single_repo_html_table,
 )
 
+SEARCH_RESOURCES = ["user", "org", "repo"]
+REPO_PLOT_VARS = [
+    "branch count",
+    "max branch age (days)",
+    "min branch age (days)",
+    "issues",
+    "pull requests",
+]
+BRANCH_PLOT_VARS = ["age (days)", "protected"]
+METADATA_SOURCES = [
+    ("repo", "get_repos"),
+    ("org", "get_orgs"),
+    ("team", "get_teams"),
+]
+
 logger = logging.getLogger(__name__)
 logger.setLevel("INFO")
 
 
+def get_base_url(hostname=None):
+    """
+    REST API url of hostname.
+    hostname may be given with a scheme, e.g. http://localhost:5001 for a local stand in
+    (see fake_api), otherwise https is used.
+    """
+    if hostname is None or hostname == "github.com":
+        return MainClass.DEFAULT_BASE_URL
+    if hostname.startswith(("http://", "https://")):
+        return f"{hostname.rstrip('/')}/api/v3"
+    return f"https://{hostname}/api/v3"
+
+
+def get_public_url(hostname=None):
+    """
+    Web url of hostname, see get_base_url.
+    """
+    if hostname is not None and hostname.startswith(("http://", "https://")):
+        return f"{hostname.rstrip('/')}/"
+    return f"https://{hostname}/"
+
+
 # pylint: disable=too-many-arguments
 def get_connection(
     hostname=None,
@@ -39,21 +81,25 @@ def get_connection(
     password=None,
     gat=None,
     timeout=TIMEOUT,
+    max_workers=MAX_WORKERS,
+    cache=None,
+    scheduler=None,
+    token_pool=None,
 ):
     """
     Get connection and login.
+    The connection pool is sized to max_workers so concurrent fetches reuse connections.
+    If cache is given (see http_cache) GET responses are cached and revalidated by ETag.
+    If scheduler is given (see scheduler) requests are paced by the rate limit.
+    If token_pool is given (see token_pool) requests are spread over its tokens.
     """
-    if hostname is None:
-        base_url = MainClass.DEFAULT_BASE_URL
-    elif hostname == "github.com":
-        base_url = MainClass.DEFAULT_BASE_URL
-    else:
-        base_url = f"https://{hostname}/api/v3"
+    base_url = get_base_url(hostname)
     if gat is not None:
         github_con = Github(
             base_url=base_url,
             login_or_token=gat,
             timeout=timeout,
+            pool_size=max_workers,
         )
     elif user is not None:
         if password is not None:
@@ -62,17 +108,93 @@ def get_connection(
                 login_or_token=user,
                 password=password,
                 timeout=timeout,
+                pool_size=max_workers,
             )
         else:
             raise Exception("provide either user+password or gat")
     else:
         raise Exception("provide either user+password or gat")
+    adapter = None
+    if any(x is not None for x in [cache, scheduler, token_pool]):
+        adapter = GitHubAdapter(
+            cache=cache,
+            scheduler=scheduler,
+            token_pool=token_pool,
+            pool_connections=max_workers,
+            pool_maxsize=max_workers,
+        )
+    make_thread_safe(github_con, adapter)
     this_user = github_con.get_user()
     _ = this_user.login
     this_user = RequestedObject(this_user, this_user.html_url)
     return github_con, this_user
 
 
+def get_repo_version(repo):
+    """
+    Timestamps that move when a repo's branches, issues or pull requests may have changed.
+    """
+    return repo.pushed_at, repo.updated_at
+
+
+def get_per_page(paginated_list):
+    """
+    Page size a PaginatedList requests with.
+    """
+    # pylint: disable=protected-access
+    return paginated_list._PaginatedList__requester.per_page
+
+
+def get_paginated_slice(paginated_list, start, end, pages=None):
+    """
+    Items start:end of a PaginatedList, requesting only the pages that cover them.
+    Slicing a PaginatedList directly requests every page before start.
+    If pages (dict of page number to items) is given it is used as a page cache.
+    """
+    if end <= start:
+        return []
+    per_page = get_per_page(paginated_list)
+    first_page = start // per_page
+    items = []
+    for page in range(first_page, (end - 1) // per_page + 1):
+        if pages is None:
+            items.extend(paginated_list.get_page(page))
+            continue
+        if page not in pages:
+            pages[page] = paginated_list.get_page(page)
+        items.extend(pages[page])
+    offset = first_page * per_page
+    return items[start - offset : end - offset]
+
+
+def get_metadata_row(resource, item, public_url):
+    """
+    Metadata row of a repo, org or team.
+    Only attributes in the list responses are used so no item is requested again.
+    """
+    if resource == "repo":
+        owner = item.owner.login
+        name = item.name
+        url = item.html_url
+    elif resource == "org":
+        owner = item.login
+        name = item.login
+        url = f"{public_url}/{item.login}"
+    elif resource == "team":
+        owner = item.organization.login
+        name = item.name
+        url = f"{public_url}/orgs/{owner}/teams/{item.slug}"
+    else:
+        raise Exception(f'Expected resource="repo", "org" or "team", got {resource}.')
+    return {
+        "resource": resource,
+        "owner": owner,
+        "name": name,
+        "url": url,
+        "health": "health",
+    }
+
+
 class Metadata:
     """
     Class for holding metadata from a requested object.
@@ -109,48 +231,35 @@ class Metadata:
         setattr(self, "input_from", input_from)
         setattr(self, "input_to", input_to)
 
+    def get_sources(self):
+        """
+        Paginated lists of repos, orgs and teams with their totals.
+        Kept on the requested object so further pages cost no extra requests.
+        """
+        return self.requested_object.get_metadata_sources()
+
     def get_metadata(self):
         """
         resource_type, resource_name
         url is external link to github
         health is internal link dynamically created by javascript in user.html
+        Only the API pages covering input_from..input_to are requested.
         """
         metadata_dict = {akey: [] for akey in SEARCH_DF_COLUMNS}
-        i = 0
-        self.requested_object.get_repos()
-        self.requested_object.get_orgs()
-        self.requested_object.get_teams()
-        for repo in self.requested_object.repos:
-            i += 1
-            if self.input_from <= i <= self.input_to:
-                metadata_dict["resource"].append("repo")
-                metadata_dict["owner"].append(repo.owner.login)
-                metadata_dict["name"].append(repo.name)
-                metadata_dict["url"].append(repo.html_url)
-                metadata_dict["health"].append("health")
-        for org in self.requested_object.orgs:
-            i += 1
-            if self.input_from <= i <= self.input_to:
-                metadata_dict["resource"].append("org")
-                metadata_dict["owner"].append(org.owner.login)
-                metadata_dict["name"].append(org.name)
-                metadata_dict["url"].append(org.html_url)
-                metadata_dict["health"].append("health")
-        for team in self.requested_object.teams:
-            i += 1
-            if self.input_from <= i <= self.input_to:
-                metadata_dict["resource"].append("team")
-                metadata_dict["owner"].append(team.owner.login)
-                metadata_dict["name"].append(team.name)
-                metadata_dict["url"].append(team.members_url)
-                metadata_dict["health"].append("health")
+        public_url = self.requested_object.url.rsplit("/", 1)[0]
+        offset = 0
+        total = 0
+        for resource, paginated_list, resource_total in self.get_sources():
+            start = max(self.input_from - 1 - offset, 0)
+            end = min(self.input_to - offset, resource_total)
+            for item in get_paginated_slice(paginated_list, start, end):
+                row = get_metadata_row(resource, item, public_url)
+                for key, value in row.items():
+                    metadata_dict[key].append(value)
+            offset += resource_total
+            total += resource_total
         metadata_df = pd.DataFrame.from_dict(metadata_dict).reset_index(drop=True)
         retrieved = self.input_to - self.input_from
-        total = (
-            len(self.requested_object.repos)
-            + len(self.requested_object.orgs)
-            + len(self.requested_object.teams)
-        )
         if total < self.input_to:
             warnings.warn(UserWarning("more results requested than available"))
             setattr(self, "input_to", total)
@@ -185,7 +294,10 @@ class DummyResults:
 # pylint: disable=too-many-instance-attributes
 class SearchResults:
     """
-    Use ghh object to search for users and/or orgs.
+    Use ghh object to search for users, orgs and/or repos.
+    Enabled search types run concurrently and are merged in SEARCH_RESOURCES order.
+    Result pages are kept in ghh.search_cache (see cache.TTLCache) keyed by query, flags
+    and ignore, so paging through results only requests pages not yet fetched.
     """
 
     def __init__(
@@ -230,8 +342,12 @@ class SearchResults:
         self.retrieved = -1
         self.table_df = None
         self.html = None
+        self.results = None
         self.user_results = None
+        self.org_results = None
         self.repo_results = None
+        self.totals = None
+        self.pages = None
 
     def set_input_limits(self, input_from, input_to):
         """
@@ -255,19 +371,81 @@ class SearchResults:
         ignore = ignore.split(",")
         setattr(self, "ignore", ignore)
 
-    def search(self):
+    def get_cache_key(self):
         """
-        Let's search for some shit.
+        Key of these results in the search cache.
+        """
+        return (
+            self.search_request,
+            self.users,
+            self.orgs,
+            self.repos,
+            tuple(self.ignore),
+        )
+
+    def get_queries(self):
         """
+        Query of each enabled search type, in output order.
+        Users are restricted to type:user when orgs are searched separately.
+        """
+        queries = {}
         if self.users is True:
-            user_results = self.ghh.con.search_users(self.search_request)
-        else:
-            user_results = DummyResults()
+            queries["user"] = self.search_request
+            if self.orgs is True:
+                queries["user"] = f"{self.search_request} type:user"
+        if self.orgs is True:
+            queries["org"] = f"{self.search_request} type:org"
         if self.repos is True:
-            repo_results = self.ghh.con.search_repositories(self.search_request)
+            queries["repo"] = self.search_request
+        return queries
+
+    def run_search(self, resource, query):
+        """
+        Search one resource type, returning its results and total.
+        """
+        if resource == "repo":
+            results = self.ghh.con.search_repositories(query)
+        else:
+            results = self.ghh.con.search_users(query)
+        # PaginatedList requests totalCount again while it is 0, so the int is kept
+        return results, results.totalCount
+
+    def get_results(self):
+        """
+        Run enabled searches concurrently, or reuse results and pages of the same search.
+        """
+        cache = getattr(self.ghh, "search_cache", None)
+        key = self.get_cache_key()
+        entry = None if cache is None else cache.get(key)
+        if entry is None:
+            queries = self.get_queries()
+            results = {x: DummyResults() for x in SEARCH_RESOURCES}
+            totals = {x: 0 for x in SEARCH_RESOURCES}
+            if len(queries) > 0:
+                with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+                    for resource, (resource_results, total) in zip(
+                        queries,
+                        executor.map(self.run_search, queries, queries.values()),
+                    ):
+                        results[resource] = resource_results
+                        totals[resource] = total
+            entry = {
+                "results": results,
+                "totals": totals,
+                "pages": {x: {} for x in SEARCH_RESOURCES},
+            }
+            if cache is not None:
+                cache.set(key, entry)
         else:
-            repo_results = DummyResults()
-        total = user_results.totalCount + repo_results.totalCount
+            logger.info("search cache hit: %s", self.search_request)
+        return entry["results"], entry["totals"], entry["pages"]
+
+    def search(self):
+        """
+        Let's search for some shit.
+        """
+        results, totals, pages = self.get_results()
+        total = sum(totals.values())
         requested = self.input_to - self.input_from + 1
         if total < self.input_to:
             warnings.warn(UserWarning("more results requested than available"))
@@ -275,22 +453,25 @@ class SearchResults:
         if self.input_from > self.input_to:
             warnings.warn(UserWarning("results start greater than results end"))
             setattr(self, "input_from", max((self.input_to - requested), 1))
-        setattr(self, "user_results", user_results)
-        setattr(self, "repo_results", repo_results)
+        setattr(self, "results", results)
+        setattr(self, "user_results", results["user"])
+        setattr(self, "org_results", results["org"])
+        setattr(self, "repo_results", results["repo"])
+        setattr(self, "totals", totals)
+        setattr(self, "pages", pages)
         setattr(self, "total", total)
-        logger.info("search user_results count: %s", self.user_results.totalCount)
-        logger.info("search repo_results count: %s", self.repo_results.totalCount)
+        for resource, resource_total in totals.items():
+            logger.info("search %s_results count: %s", resource, resource_total)
         logger.info("search total: %s", total)
 
     def get_slices(self):
         """
-        Check requested results from and to against retrieved results and return indices.
+        Check requested results from and to against retrieved results.
+        Returns dict of resource type to (start, end) indices, None if none are needed.
         """
         assert self.input_to >= self.input_from
         requested_total = self.input_to - self.input_from + 1
-        user_total = self.user_results.totalCount
-        repo_total = self.repo_results.totalCount
-        results_total = user_total + repo_total
+        results_total = sum(self.totals.values())
         if self.input_from > results_total:
             # more requested than exist
             # shift input_from and input_to by requested_total
@@ -303,75 +484,64 @@ class SearchResults:
             input_to = self.input_to + requested_total
             setattr(self, "input_from", input_from)
             setattr(self, "input_to", input_to)
-        # some of user none of repo
-        if (self.input_from <= user_total) and (self.input_to <= user_total):
-            user_start = self.input_from - 1
-            user_end = self.input_to
-            repo_start = None
-            repo_end = None
-        # some of user some of repo
-        elif self.input_from <= user_total < self.input_to:
-            user_start = self.input_from - 1
-            user_end = user_total
-            user_retrieved = user_end - user_start
-            remaining = requested_total - user_retrieved
-            repo_start = 0
-            repo_end = remaining
-            if remaining > repo_total:
-                repo_end = repo_total
-        # none of user some of repo
-        elif (self.input_from > user_total) and (self.input_to >= user_total):
-            user_start = None
-            user_end = None
-            repo_start = self.input_from - user_total - 1
-            remaining = requested_total
-            repo_end = repo_start + remaining
-        else:
-            raise Exception("this should not occur")
-        return user_start, user_end, repo_start, repo_end
+        slices = {}
+        offset = 0
+        for resource in SEARCH_RESOURCES:
+            resource_total = self.totals[resource]
+            start = max(self.input_from - 1 - offset, 0)
+            end = min(self.input_to - offset, resource_total)
+            slices[resource] = (start, end) if end > start else None
+            offset += resource_total
+        return slices
+
+    def get_slice(self, resource, start, end):
+        """
+        Results start:end of resource type, only requesting pages not fetched yet.
+        """
+        return get_paginated_slice(
+            self.results[resource], start, end, self.pages[resource]
+        )
 
     def get_output_results(self):
         """
         Retrieve slices and use them for temporary results. Use these to get table.
-        """
-        user_start, user_end, repo_start, repo_end = self.get_slices()
-        # pylint: disable=unsubscriptable-object
-        logger.info("user_start: %s, user_end: %s", user_start, user_end)
-        logger.info("repo_start: %s, repo_end: %s", user_start, user_end)
-        # slicing returns Slice object and not PaginatedList
-        if user_start is None and user_end is None:
-            user_results = []
-        else:
-            user_results = self.user_results[user_start:user_end]
-        if repo_start is None and repo_end is None:
-            repo_results = []
-        else:
-            repo_results = self.repo_results[repo_start:repo_end]
-        metadata_dict = {akey: [] for akey in SEARCH_DF_COLUMNS}
-        for user in user_results:
-            if isinstance(user, NamedUser):
-                if user.login not in self.ignore:
-                    metadata_dict["resource"].append("user")
-                    metadata_dict["owner"].append(user.login)
-                    metadata_dict["name"].append(user.login)
-                    metadata_dict["url"].append(user.html_url)
-                    metadata_dict["health"].append("health")
-            else:
-                warnings.warn(
-                    f"unexpected search result found: {type(user)} {user.login}"
+        Pages of different resource types are requested concurrently.
+        """
+        slices = {x: y for x, y in self.get_slices().items() if y is not None}
+        logger.info("search slices: %s", slices)
+        output_results = {x: [] for x in SEARCH_RESOURCES}
+        if len(slices) > 0:
+            with ThreadPoolExecutor(max_workers=len(slices)) as executor:
+                output_results.update(
+                    zip(
+                        slices,
+                        executor.map(
+                            self.get_slice,
+                            slices,
+                            [x[0] for x in slices.values()],
+                            [x[1] for x in slices.values()],
+                        ),
+                    )
                 )
-        for repo in repo_results:
-            if isinstance(repo, Repository):
-                if repo.name not in self.ignore:
-                    metadata_dict["resource"].append("repo")
-                    metadata_dict["owner"].append(repo.owner.login)
-                    metadata_dict["name"].append(repo.name)
-                    metadata_dict["url"].append(repo.html_url)
-                    metadata_dict["health"].append("health")
-            else:
-                warnings.warn(
-                    f"unexpected search result found: {type(repo)} {repo.name}"
+        metadata_dict = {akey: [] for akey in SEARCH_DF_COLUMNS}
+        for resource in SEARCH_RESOURCES:
+            for result in output_results[resource]:
+                expected = Repository if resource == "repo" else NamedUser
+                if not isinstance(result, expected):
+                    warnings.warn(
+                        f"unexpected search result found: {type(result)} {result}"
+                    )
+                    continue
+                name = result.name if resource == "repo" else result.login
+                if name in self.ignore:
+                    continue
+                metadata_dict["resource"].append(resource)
+                metadata_dict["owner"].append(
+                    result.owner.login if resource == "repo" else result.login
                 )
+                metadata_dict["name"].append(name)
+                metadata_dict["url"].append(result.html_url)
+                metadata_dict["health"].append("health")
         table_df = pd.DataFrame.from_dict(metadata_dict).reset_index(drop=True)
         html = render_metadata_html_table(table_df, table_id="search-metadata")
         setattr(self, "retrieved", len(table_df))
@@ -385,8 +555,11 @@ class RequestedObject:
     Container for requested objects.
     """
 
-    def __init__(self, obj, url):
+    def __init__(self, obj, url, fetcher=None):
+        if fetcher is None:
+            fetcher = RepoFetcher()
         self.obj = obj
+        self.fetcher = fetcher
         self.name = None
         self.avatar_url = None
         if isinstance(obj, AuthenticatedUser):
@@ -403,10 +576,14 @@ class RequestedObject:
         self.url = url
         self.metadata = None
         self.metadata_html = None
+        self.metadata_sources = None
         self.repos = []
+        self.ignore = []
         self.repo_dict = None
         self.repo_df = None
+        self.repo_versions = {}
         self.plots = []
+        self.plot_data = None
 
     def get_repo(self, repo_name):
         """
@@ -414,14 +591,48 @@ class RequestedObject:
         """
         return self.obj.get_repo(repo_name)
 
+    def iter_repos(self, ignore=None):
+        """
+        Yield repos of requested object straight from the paginated list.
+        """
+        if ignore is None:
+            ignore = []
+        for repo in self.obj.get_repos():
+            if repo.name not in ignore:
+                yield repo
+
     def get_repos(self, ignore=None):
         """
         Get repos of requested object.
         """
         if ignore is None:
             ignore = []
-        repos = [x for x in self.obj.get_repos() if x.name not in ignore]
+        repos = list(self.iter_repos(ignore))
         setattr(self, "repos", repos)
+        setattr(self, "ignore", ignore)
+
+    def iter_repo_details(self, ignore=None):
+        """
+        Yield one record per repo as soon as it is fetched.
+        Repos are read lazily from the paginated list and not kept, so memory does not
+        grow with the number of repos. Records arrive in completion order.
+        """
+        return self.fetcher.iter_repo_records(self.iter_repos(ignore))
+
+    def iter_repo_dfs(self, chunk_size=REPO_CHUNK_SIZE, ignore=None):
+        """
+        Yield repo details as DataFrames of up to chunk_size rows.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        builder = get_repos_builder()
+        for record in self.iter_repo_details(ignore):
+            builder.append(record)
+            if len(builder) >= chunk_size:
+                yield builder.to_df()
+                builder = get_repos_builder()
+        if len(builder) > 0:
+            yield builder.to_df()
 
     def get_orgs(self, ignore=None):
         """
@@ -451,6 +662,21 @@ class RequestedObject:
             self.get_repos(ignore=ignore)
         return self.repos
 
+    def get_metadata_sources(self):
+        """
+        Paginated lists of repos, orgs and teams of obj with their totals, see Metadata.
+        """
+        if self.metadata_sources is None:
+            sources = []
+            for resource, getter in METADATA_SOURCES:
+                if hasattr(self.obj, getter):
+                    paginated_list = getattr(self.obj, getter)()
+                    sources.append(
+                        (resource, paginated_list, paginated_list.totalCount)
+                    )
+            setattr(self, "metadata_sources", sources)
+        return self.metadata_sources
+
     def get_metadata(self):
         """
         Main method to parse object metadata into pandas DataFrame.
@@ -468,42 +694,76 @@ class RequestedObject:
         self.metadata.get_metadata_html()
         setattr(self, "metadata_html", self.metadata.metadata_html)
 
-    def get_repo_df(self):
+    # pylint: disable=too-many-arguments
+    def get_repo_df(
+        self, incremental=False, callback=None, branch_callback=None, ignore=None
+    ):
         """
         Main method to parse repo details into pandas DataFrame.
+        With incremental=True the repo list is refreshed and only repos whose
+        pushed_at/updated_at moved since the previous call are refetched.
+        Rows of unchanged repos are kept and rows of deleted repos dropped.
+        If callback is given it is called with each fetched record as soon as it is ready,
+        branch_callback with the repo name and branch records of each fetched repo.
+        Repos in ignore are skipped, if None the ignore of the last get_repos is kept.
         """
-        if self.repos == []:
-            self.get_repos()
-        repo_df = (
-            pd.concat(
-                [REPOS_TEMPLATE_DF] + [get_repo_details(repo) for repo in self.repos],
-                ignore_index=True,
-            )
-            .sort_values(by="repo")
-            .reset_index(drop=True)
-        )
+        if ignore is None:
+            ignore = self.ignore
+        if incremental and self.repo_df is not None:
+            self.get_repos(ignore=ignore)
+            changed = [
+                repo
+                for repo in self.repos
+                if self.repo_versions.get(repo.name) != get_repo_version(repo)
+            ]
+            logger.info("refetching %s of %s repos", len(changed), len(self.repos))
+            changed_names = [repo.name for repo in changed]
+            current_names = [repo.name for repo in self.repos]
+            kept_df = self.repo_df[
+                self.repo_df["repo"].isin(current_names)
+                & ~self.repo_df["repo"].isin(changed_names)
+            ]
+            repo_df = kept_df
+            if len(changed) > 0:
+                repo_df = pd.concat(
+                    [
+                        kept_df,
+                        self.fetcher.get_repo_df(changed, callback, branch_callback),
+                    ]
+                )
+            repo_df = repo_df.sort_values(by="repo").reset_index(drop=True)
+        else:
+            if self.repos == [] or ignore != self.ignore:
+                self.get_repos(ignore=ignore)
+            repo_df = self.fetcher.get_repo_df(self.repos, callback, branch_callback)
+        repo_versions = {repo.name: get_repo_version(repo) for repo in self.repos}
+        setattr(self, "repo_versions", repo_versions)
         repo_dict = repo_df.to_dict(orient="list")
         setattr(self, "repo_dict", repo_dict)
         setattr(self, "repo_df", repo_df)
 
-    def get_plots(self):
-        """
-        Get plots from repo df.
-        """
-        branch_count_plot = get_ghh_plot(self.repo_df, "branch count")
-        branch_age_max_plot = get_ghh_plot(self.repo_df, "max branch age (days)")
-        branch_age_min_plot = get_ghh_plot(self.repo_df, "min branch age (days)")
-        issues_plot = get_ghh_plot(self.repo_df, "issues")
-        pr_plot = get_ghh_plot(self.repo_df, "pull requests")
-        plots = [
-            branch_count_plot,
-            branch_age_max_plot,
-            branch_age_min_plot,
-            issues_plot,
-            pr_plot,
-        ]
-        plots = [x.configure_view(discreteWidth=300).to_json() for x in plots]
+    def rescore(self, policy):
+        """
+        Recompute scores of repo_df under policy (see health.HealthPolicy).
+        Nothing is refetched.
+        """
+        repo_df = policy.rescore(self.repo_df)
+        setattr(self, "repo_dict", repo_df.to_dict(orient="list"))
+        setattr(self, "repo_df", repo_df)
+
+    def get_plots(self, max_rows=PLOT_MAX_ROWS):
+        """
+        Get plots from repo df, all specs reference the one plot_data dataset.
+        Above max_rows repos plots are aggregated, see plots.get_plot_specs.
+        """
+        # pylint: disable=import-outside-toplevel
+        from .plots import get_plot_specs
+
+        plots, plot_data = get_plot_specs(
+            self.repo_df, "repo", REPO_PLOT_VARS, max_rows=max_rows
+        )
         setattr(self, "plots", plots)
+        setattr(self, "plot_data", plot_data)
 
 
 class RequestedRepo(RequestedObject):
@@ -515,29 +775,34 @@ class RequestedRepo(RequestedObject):
         """
         Main method to parse repo details into pandas DataFrame.
         """
-        repo_df = get_branch_df(self.obj)
+        repo_df = self.fetcher.get_branch_df(self.obj)
         setattr(self, "repo_df", repo_df)
 
-    def get_plots(self):
+    def get_plots(self, max_rows=PLOT_MAX_ROWS):
         """
-        Get plots from repo df.
+        Get plots from repo df, all specs reference the one plot_data dataset.
+        Above max_rows branches plots are aggregated, see plots.get_plot_specs.
         """
-        branch_age_plot = get_ghh_repo_plot(self.repo_df, "age (days)")
-        protected_plot = get_ghh_repo_plot(self.repo_df, "protected")
-        plots = [
-            branch_age_plot,
-            protected_plot,
-        ]
-        plots = [x.configure_view(discreteWidth=300).to_json() for x in plots]
+        # pylint: disable=import-outside-toplevel
+        from .plots import get_plot_specs
+
+        plots, plot_data = get_plot_specs(
+            self.repo_df, "branch", BRANCH_PLOT_VARS, max_rows=max_rows
+        )
         setattr(self, "plots", plots)
+        setattr(self, "plot_data", plot_data)
 
-    def get_html_table(self):
+    def get_table(self):
         """
-        Get html table.
+        Get HtmlTable of branches for rendering or paging.
         """
         if self.repo_df is None:
             self.get_repo_df()
-        html_table = render_single_repo_html_table(
-            self.repo_df, table_id="repo-metadata"
-        )
-        setattr(self, "html_table", html_table)
+        setattr(self, "table", get_single_repo_table(self.repo_df))
+
+    def get_html_table(self):
+        """
+        Get html table.
+        """
+        self.get_table()
+        setattr(self, "html_table", self.table.render("repo-metadata"))
@@ -0,0 +1,246 @@
+"""
+Rate limit aware request scheduler.
+Reads X-RateLimit-Remaining/Reset and secondary limit Retry-After headers from responses
+to pace requests with a token bucket, throttle concurrency and pause instead of failing.
+"""
+
+import logging
+import threading
+import time
+
+from .utils import MAX_WORKERS
+
+RATE_LIMIT_RESERVE = 50
+RATE_LIMIT_RESERVE_SHARE = 10
+RATE_LIMIT_PACE_BELOW = 500
+RATE_LIMIT_MAX_RETRIES = 3
+RATE_LIMIT_MAX_WAIT = 900
+SECONDARY_LIMIT_WAIT = 60
+
+logger = logging.getLogger(__name__)
+logger.setLevel("INFO")
+
+
+def get_resource(url):
+    """
+    Rate limit resource a request url counts against.
+    """
+    if "/graphql" in url:
+        return "graphql"
+    if "/search/" in url:
+        return "search"
+    return "core"
+
+
+def get_state_key(url, token=None):
+    """
+    Key of the rate limit state a request counts against, tokens have separate quotas.
+    """
+    if token is None:
+        return get_resource(url)
+    return token, get_resource(url)
+
+
+def is_secondary_limit(response):
+    """
+    Check if response is a secondary (abuse) rate limit rejection.
+    """
+    if response.status_code not in [403, 429]:
+        return False
+    if "Retry-After" in response.headers:
+        return True
+    return "secondary rate limit" in response.text.lower()
+
+
+def is_primary_limit(response):
+    """
+    Check if response is rejected because the hourly quota is spent.
+    """
+    return (
+        response.status_code in [403, 429]
+        and response.headers.get("X-RateLimit-Remaining") == "0"
+        and "X-RateLimit-Reset" in response.headers
+    )
+
+
+def get_retry_after(headers, now=None):
+    """
+    Seconds until a request rejected with response headers may be retried.
+    Header names are matched in any case, PyGitHub exceptions hold them lowercased.
+    """
+    if now is None:
+        now = time.time()
+    headers = {key.lower(): value for key, value in (headers or {}).items()}
+    if "retry-after" in headers:
+        return int(headers["retry-after"])
+    if "x-ratelimit-reset" in headers:
+        return max(int(headers["x-ratelimit-reset"]) - int(now), 0)
+    return SECONDARY_LIMIT_WAIT
+
+
+# pylint: disable=too-few-public-methods
+class RateLimitState:
+    """
+    Token bucket for one rate limit resource (core, search or graphql).
+    The bucket is only used once remaining falls below pace_below, then refills at
+    (remaining - reserve) / seconds to reset so the quota lasts until the reset.
+    """
+
+    def __init__(self):
+        self.limit = None
+        self.remaining = None
+        self.reset_time = None
+        self.rate = None
+        self.tokens = 0.0
+        self.refilled = time.time()
+        self.paused_until = 0.0
+
+    def refill(self, now):
+        """
+        Add tokens earned since last refill, at most one second of burst.
+        """
+        if self.rate is not None:
+            self.tokens = min(
+                self.tokens + (now - self.refilled) * self.rate, max(self.rate, 1.0)
+            )
+        self.refilled = now
+
+    def get_delay(self, now):
+        """
+        Seconds until a request may start.
+        """
+        if now < self.paused_until:
+            return self.paused_until - now
+        self.refill(now)
+        if self.rate is None or self.tokens >= 1:
+            return 0.0
+        if self.rate == 0:
+            return max(self.reset_time - now, 0.0)
+        return (1 - self.tokens) / self.rate
+
+
+# pylint: disable=too-many-instance-attributes
+class RateLimitScheduler:
+    """
+    Pace and throttle requests from rate limit headers, shared by all workers.
+    Concurrency is halved on secondary limits and grows back by one after each
+    concurrency-sized run of successful responses.
+    Args:
+        max_concurrency (int)   : default MAX_WORKERS, most requests in flight
+        reserve (int)           : default RATE_LIMIT_RESERVE, quota left untouched, at
+                                  most 1 / RATE_LIMIT_RESERVE_SHARE of the resource limit
+        pace_below (int)        : default RATE_LIMIT_PACE_BELOW, remaining quota that
+                                  starts pacing
+        max_retries (int)       : default RATE_LIMIT_MAX_RETRIES, retries of rejected requests
+        max_wait (float)        : default RATE_LIMIT_MAX_WAIT, longest pause in seconds,
+                                  longer pauses fail the request instead
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        max_concurrency=MAX_WORKERS,
+        reserve=RATE_LIMIT_RESERVE,
+        pace_below=RATE_LIMIT_PACE_BELOW,
+        max_retries=RATE_LIMIT_MAX_RETRIES,
+        max_wait=RATE_LIMIT_MAX_WAIT,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.concurrency = max_concurrency
+        self.reserve = reserve
+        self.pace_below = pace_below
+        self.max_retries = max_retries
+        self.max_wait = max_wait
+        self.active = 0
+        self.successes = 0
+        self.states = {}
+        self.condition = threading.Condition()
+
+    def get_state(self, resource):
+        """
+        Get state of resource, caller must hold condition.
+        With a token pool resource is a (token index, resource) pair.
+        """
+        if resource not in self.states:
+            self.states[resource] = RateLimitState()
+        return self.states[resource]
+
+    def acquire(self, url, token=None):
+        """
+        Block until a request to url (with pool token index token) may start.
+        Pauses longer than max_wait are not waited for.
+        """
+        with self.condition:
+            state = self.get_state(get_state_key(url, token))
+            while True:
+                delay = state.get_delay(time.time())
+                if delay > self.max_wait:
+                    logger.warning("rate limit pause of %.0fs exceeds max_wait", delay)
+                    break
+                if delay <= 0 and self.active < self.concurrency:
+                    break
+                self.condition.wait(timeout=delay if delay > 0 else None)
+            self.active += 1
+            if state.rate is not None:
+                state.tokens -= 1
+
+    def release(self, url, response, token=None):
+        """
+        Record response of a request to url, returning True if it should be retried.
+        """
+        with self.condition:
+            self.active -= 1
+            retry = False
+            if response is not None:
+                retry = self.update(self.get_state(get_state_key(url, token)), response)
+            self.condition.notify_all()
+        return retry
+
+    def get_reserve(self, state):
+        """
+        Quota of state left untouched, scaled down for small limits like search (30).
+        """
+        if state.limit is None:
+            return self.reserve
+        return min(self.reserve, state.limit // RATE_LIMIT_RESERVE_SHARE)
+
+    def update(self, state, response):
+        """
+        Update state from response headers, caller must hold condition.
+        """
+        now = time.time()
+        headers = response.headers
+        if "X-RateLimit-Remaining" in headers and "X-RateLimit-Reset" in headers:
+            state.remaining = int(headers["X-RateLimit-Remaining"])
+            state.reset_time = int(headers["X-RateLimit-Reset"])
+            if "X-RateLimit-Limit" in headers:
+                state.limit = int(headers["X-RateLimit-Limit"])
+            if state.remaining < self.pace_below:
+                state.rate = max(state.remaining - self.get_reserve(state), 0) / max(
+                    state.reset_time - now, 1
+                )
+            else:
+                state.rate = None
+        if is_secondary_limit(response):
+            wait = int(headers.get("Retry-After", SECONDARY_LIMIT_WAIT))
+            state.paused_until = max(state.paused_until, now + wait)
+            self.concurrency = max(self.concurrency // 2, 1)
+            self.successes = 0
+            logger.info(
+                "secondary rate limit, pausing %ss with concurrency %s",
+                wait,
+                self.concurrency,
+            )
+            return wait <= self.max_wait
+        if is_primary_limit(response):
+            state.paused_until = max(state.paused_until, float(state.reset_time))
+            logger.info("rate limit spent, pausing until %s", state.reset_time)
+            return state.reset_time - now <= self.max_wait
+        if response.status_code < 400:
+            self.successes += 1
+            if self.successes >= self.concurrency:
+                self.concurrency = min(self.concurrency + 1, self.max_concurrency)
+                self.successes = 0
+        return False
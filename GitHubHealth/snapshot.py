@@ -0,0 +1,285 @@
+"""
+Historical snapshot store for repo and branch health.
+Timestamped REPOS_DF_COLUMNS / BRANCH_DF_COLUMNS rows are appended to a local SQLite file
+so trends and last known results can be served without the API.
+Each append is one snapshot with an autoincrement id, snapshots are ordered by id.
+"""
+
+from datetime import datetime
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from .utils import (
+    BRANCH_DF_COLUMNS,
+    BRANCH_DF_DTYPES,
+    REPOS_DF_COLUMNS,
+    REPOS_DF_DTYPES,
+)
+
+SNAPSHOT_TABLE = "snapshots"
+REPO_SNAPSHOT_TABLE = "repo_snapshots"
+BRANCH_SNAPSHOT_TABLE = "branch_snapshots"
+SNAPSHOT_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+def quote(column):
+    """
+    Quote column name for SQL, columns contain spaces.
+    """
+    return '"' + column.replace('"', '""') + '"'
+
+
+def format_snapshot_time(snapshot_time):
+    """
+    Format datetime as sortable string, strings are passed through.
+    """
+    if snapshot_time is None:
+        snapshot_time = datetime.utcnow()
+    if isinstance(snapshot_time, datetime):
+        snapshot_time = snapshot_time.strftime(SNAPSHOT_TIME_FORMAT)
+    return snapshot_time
+
+
+class SnapshotStore:
+    """
+    Append only store of repo and branch DataFrames.
+    Args:
+        path (str)              : SQLite file, parent directory created if missing
+        max_snapshots (int)     : default None, snapshots kept per owner (repo snapshots)
+                                  or owner and repo (branch snapshots), oldest dropped
+                                  first, None keeps all
+    """
+
+    def __init__(self, path, max_snapshots=None):
+        if max_snapshots is not None and max_snapshots < 1:
+            raise ValueError("max_snapshots must be at least 1")
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.max_snapshots = max_snapshots
+        self.lock = threading.Lock()
+        self.con = None
+        repo_columns = ", ".join(quote(x) for x in REPOS_DF_COLUMNS)
+        branch_columns = ", ".join(quote(x) for x in BRANCH_DF_COLUMNS)
+        with self.lock, self.get_con() as con:
+            con.execute(
+                f"CREATE TABLE IF NOT EXISTS {SNAPSHOT_TABLE} "
+                "(snapshot_id INTEGER PRIMARY KEY AUTOINCREMENT, snapshot_time TEXT, "
+                "owner TEXT, repo TEXT)"
+            )
+            con.execute(
+                f"CREATE INDEX IF NOT EXISTS {SNAPSHOT_TABLE}_idx ON "
+                f"{SNAPSHOT_TABLE} (owner, repo, snapshot_id)"
+            )
+            con.execute(
+                f"CREATE TABLE IF NOT EXISTS {REPO_SNAPSHOT_TABLE} "
+                f"(snapshot_id INTEGER, snapshot_time TEXT, owner TEXT, {repo_columns})"
+            )
+            con.execute(
+                f"CREATE INDEX IF NOT EXISTS {REPO_SNAPSHOT_TABLE}_idx ON "
+                f'{REPO_SNAPSHOT_TABLE} (owner, "repo", snapshot_time)'
+            )
+            con.execute(
+                f"CREATE INDEX IF NOT EXISTS {REPO_SNAPSHOT_TABLE}_time_idx ON "
+                f"{REPO_SNAPSHOT_TABLE} (snapshot_time)"
+            )
+            con.execute(
+                f"CREATE INDEX IF NOT EXISTS {REPO_SNAPSHOT_TABLE}_id_idx ON "
+                f"{REPO_SNAPSHOT_TABLE} (snapshot_id)"
+            )
+            con.execute(
+                f"CREATE TABLE IF NOT EXISTS {BRANCH_SNAPSHOT_TABLE} "
+                "(snapshot_id INTEGER, snapshot_time TEXT, owner TEXT, repo TEXT, "
+                f"{branch_columns})"
+            )
+            con.execute(
+                f"CREATE INDEX IF NOT EXISTS {BRANCH_SNAPSHOT_TABLE}_idx ON "
+                f"{BRANCH_SNAPSHOT_TABLE} (owner, repo, snapshot_time)"
+            )
+            con.execute(
+                f"CREATE INDEX IF NOT EXISTS {BRANCH_SNAPSHOT_TABLE}_id_idx ON "
+                f"{BRANCH_SNAPSHOT_TABLE} (snapshot_id)"
+            )
+
+    def get_con(self):
+        """
+        SQLite connection, reopened if the store was closed, caller must hold lock.
+        """
+        if self.con is None:
+            self.con = sqlite3.connect(self.path, check_same_thread=False)
+        return self.con
+
+    def close(self):
+        """
+        Close the connection, it is reopened if the store is used again.
+        """
+        with self.lock:
+            if self.con is not None:
+                self.con.close()
+                self.con = None
+
+    # pylint: disable=too-many-arguments
+    def append(self, table, columns, values_df, owner, repo=None, snapshot_time=None):
+        """
+        Append rows of values_df to table as a new snapshot of owner (and repo),
+        dropping snapshots above max_snapshots. Returns the snapshot id.
+        """
+        snapshot_time = format_snapshot_time(snapshot_time)
+        values_df = values_df.assign(snapshot_time=snapshot_time, owner=owner)
+        columns = ["snapshot_time", "owner"] + columns
+        placeholders = ", ".join("?" for _ in ["snapshot_id"] + columns)
+        column_names = ", ".join(quote(x) for x in ["snapshot_id"] + columns)
+        rows = [
+            tuple(None if pd.isna(x) else x for x in row)
+            for row in values_df[columns].astype(object).itertuples(index=False)
+        ]
+        with self.lock, self.get_con() as con:
+            snapshot_id = con.execute(
+                f"INSERT INTO {SNAPSHOT_TABLE} (snapshot_time, owner, repo) "
+                "VALUES (?, ?, ?)",
+                (snapshot_time, owner, repo),
+            ).lastrowid
+            con.executemany(
+                f"INSERT INTO {table} ({column_names}) VALUES ({placeholders})",
+                [(snapshot_id,) + row for row in rows],
+            )
+            self.prune(table, owner, repo)
+        return snapshot_id
+
+    def prune(self, table, owner, repo=None):
+        """
+        Drop snapshots of owner (and repo) above max_snapshots, caller must hold lock.
+        """
+        if self.max_snapshots is None:
+            return
+        expired = self.con.execute(
+            f"SELECT snapshot_id FROM {SNAPSHOT_TABLE} WHERE owner = ? AND repo IS ? "
+            "ORDER BY snapshot_id DESC LIMIT -1 OFFSET ?",
+            (owner, repo, self.max_snapshots),
+        ).fetchall()
+        for expired_table in [table, SNAPSHOT_TABLE]:
+            self.con.executemany(
+                f"DELETE FROM {expired_table} WHERE snapshot_id = ?", expired
+            )
+
+    def append_repo_df(self, owner, repo_df, snapshot_time=None):
+        """
+        Append repo_df rows for owner, returning the snapshot id.
+        """
+        return self.append(
+            REPO_SNAPSHOT_TABLE,
+            REPOS_DF_COLUMNS,
+            repo_df,
+            owner,
+            snapshot_time=snapshot_time,
+        )
+
+    def append_branch_df(self, owner, repo, branch_df, snapshot_time=None):
+        """
+        Append branch_df rows for owner/repo, returning the snapshot id.
+        """
+        return self.append(
+            BRANCH_SNAPSHOT_TABLE,
+            ["repo"] + BRANCH_DF_COLUMNS,
+            branch_df.assign(repo=repo),
+            owner,
+            repo=repo,
+            snapshot_time=snapshot_time,
+        )
+
+    # pylint: disable=too-many-arguments
+    def query(
+        self, table, owner=None, repo=None, start=None, end=None, snapshot_id=None
+    ):
+        """
+        Select rows by owner, repo, snapshot time range (inclusive) and snapshot id.
+        """
+        conditions = []
+        params = []
+        for column, operator, value in [
+            ("owner", "=", owner),
+            ("repo", "=", repo),
+            ("snapshot_time", ">=", start),
+            ("snapshot_time", "<=", end),
+            ("snapshot_id", "=", snapshot_id),
+        ]:
+            if value is not None:
+                conditions.append(f"{quote(column)} {operator} ?")
+                params.append(
+                    format_snapshot_time(value) if column == "snapshot_time" else value
+                )
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self.lock:
+            snapshot_df = pd.read_sql_query(
+                f"SELECT * FROM {table} {where} ORDER BY snapshot_id",
+                self.get_con(),
+                params=params,
+            )
+        return snapshot_df
+
+    def get_repo_history(self, owner=None, repo=None, start=None, end=None):
+        """
+        Repo rows with snapshot_id, snapshot_time and owner columns, oldest first.
+        """
+        history_df = self.query(REPO_SNAPSHOT_TABLE, owner, repo, start, end)
+        return history_df.astype({**REPOS_DF_DTYPES, "private": "bool"})
+
+    def get_branch_history(self, owner=None, repo=None, start=None, end=None):
+        """
+        Branch rows with snapshot_id, snapshot_time, owner and repo columns, oldest first.
+        """
+        history_df = self.query(BRANCH_SNAPSHOT_TABLE, owner, repo, start, end)
+        return history_df.astype(BRANCH_DF_DTYPES)
+
+    def get_latest_snapshot(self, owner):
+        """
+        Id and time of the most recent repo snapshot of owner, (None, None) if none.
+        """
+        with self.lock:
+            row = (
+                self.get_con()
+                .execute(
+                    f"SELECT snapshot_id, snapshot_time FROM {SNAPSHOT_TABLE} "
+                    "WHERE owner = ? AND repo IS NULL ORDER BY snapshot_id DESC LIMIT 1",
+                    (owner,),
+                )
+                .fetchone()
+            )
+        return (None, None) if row is None else row
+
+    def get_latest_snapshot_time(self, owner):
+        """
+        Time of the most recent repo snapshot of owner, None if there is none.
+        """
+        return self.get_latest_snapshot(owner)[1]
+
+    def get_latest_repo_df(self, owner):
+        """
+        Last known repo_df of owner, None if there is no snapshot.
+        """
+        snapshot_id = self.get_latest_snapshot(owner)[0]
+        if snapshot_id is None:
+            return None
+        history_df = self.query(REPO_SNAPSHOT_TABLE, owner, snapshot_id=snapshot_id)
+        history_df = history_df.astype({**REPOS_DF_DTYPES, "private": "bool"})
+        return history_df[REPOS_DF_COLUMNS].reset_index(drop=True)
+
+    def get_trend(self, owner):
+        """
+        Summary of each repo snapshot of owner for trend views.
+        """
+        history_df = self.get_repo_history(owner)
+        trend_df = (
+            history_df.groupby(["snapshot_id", "snapshot_time"])
+            .agg(
+                repos=("repo", "count"),
+                score=("score", "mean"),
+                issues=("issues", "sum"),
+                pull_requests=("pull requests", "sum"),
+            )
+            .reset_index()
+        )
+        return trend_df
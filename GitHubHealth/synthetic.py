@@ -0,0 +1,289 @@
+"""
+Offline stand ins for PyGitHub owners and repos.
+Owners are either synthesised at a given size (repos x branches) or replayed from a
+recording of a real owner, both serialize to the same json owner data so a recording
+made once with a token can be benchmarked or served later without one.
+"""
+
+from datetime import (
+    datetime,
+    timedelta,
+)
+import json
+import time
+
+import numpy as np
+
+from .utils import (
+    DATE_NOW,
+    get_paginated_list_len,
+)
+
+SYNTHETIC_LOGIN = "synthetic"
+SYNTHETIC_LANGUAGES = ["Python", "JavaScript", "HTML", "Go", "Rust", "Shell"]
+SYNTHETIC_PUBLIC_URL = "https://github.com"
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+# pylint: disable=too-few-public-methods
+class SyntheticObject:
+    """
+    Object with attributes only, like the nested parts of a PyGitHub branch.
+    """
+
+    def __init__(self, **kwargs):
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+
+class SyntheticCount:
+    """
+    Stand in for a PaginatedList when only totalCount is used.
+    """
+
+    def __init__(self, total_count):
+        self.totalCount = total_count  # pylint: disable=invalid-name
+
+
+def get_branch(branch_data, repo_url, owner_login):
+    """
+    PyGitHub like branch from branch data.
+    """
+    return SyntheticObject(
+        name=branch_data["name"],
+        protected=branch_data["protected"],
+        commit=SyntheticObject(
+            commit=SyntheticObject(
+                author=SyntheticObject(
+                    date=datetime.strptime(branch_data["date"], DATE_FORMAT)
+                )
+            ),
+            committer=(
+                None
+                if branch_data["committer"] is None
+                else SyntheticObject(login=branch_data["committer"])
+            ),
+            html_url=f"{repo_url}/commit/{branch_data['sha']}",
+            sha=branch_data["sha"],
+            last_modified=branch_data["last_modified"],
+        ),
+    )
+
+
+class SyntheticRepo:
+    """
+    Stand in for a PyGitHub Repository built from repo data.
+    Args:
+        repo_data (dict)    : see get_synthetic_data for the keys
+        owner_login (str)   : login of the owner
+        latency (float)     : default 0.0, seconds slept on each simulated request
+    """
+
+    def __init__(self, repo_data, owner_login, latency=0.0):
+        self.name = repo_data["name"]
+        self.full_name = f"{owner_login}/{self.name}"
+        self.owner = SyntheticObject(login=owner_login)
+        self.html_url = repo_data["html_url"]
+        self.private = repo_data["private"]
+        self.pushed_at = datetime.strptime(repo_data["pushed_at"], DATE_FORMAT)
+        self.updated_at = datetime.strptime(repo_data["updated_at"], DATE_FORMAT)
+        self.issues = repo_data["issues"]
+        self.pull_requests = repo_data["pull_requests"]
+        self.languages = repo_data["languages"]
+        self.branches = [
+            get_branch(x, self.html_url, owner_login) for x in repo_data["branches"]
+        ]
+        self.latency = latency
+        self.requests = 0
+
+    def request(self):
+        """
+        Count a simulated request and sleep its latency.
+        """
+        if self.latency > 0:
+            time.sleep(self.latency)
+        self.requests += 1
+
+    def get_branches(self):
+        """
+        Simulated branches request.
+        """
+        self.request()
+        return self.branches
+
+    def get_issues(self):
+        """
+        Simulated issues request.
+        """
+        self.request()
+        return SyntheticCount(self.issues)
+
+    def get_pulls(self):
+        """
+        Simulated pull requests request.
+        """
+        self.request()
+        return SyntheticCount(self.pull_requests)
+
+    def get_languages(self):
+        """
+        Simulated languages request.
+        """
+        self.request()
+        return dict(self.languages)
+
+
+class SyntheticOwner:
+    """
+    Stand in for a PyGitHub NamedUser or Organization built from owner data.
+    Args:
+        owner_data (dict)   : see get_synthetic_data for the keys
+        latency (float)     : default 0.0, seconds slept on each simulated repo request
+    """
+
+    def __init__(self, owner_data, latency=0.0):
+        self.login = owner_data["login"]
+        self.html_url = f"{SYNTHETIC_PUBLIC_URL}/{self.login}"
+        self.avatar_url = ""
+        self.repos = [
+            SyntheticRepo(x, self.login, latency) for x in owner_data["repos"]
+        ]
+
+    def get_repos(self):
+        """
+        Simulated repos request.
+        """
+        return list(self.repos)
+
+    def get_repo(self, repo_name):
+        """
+        Simulated repo request.
+        """
+        return next(x for x in self.repos if x.name == repo_name)
+
+
+# pylint: disable=too-many-arguments
+def get_synthetic_data(
+    repos=100, branches=5, login=SYNTHETIC_LOGIN, seed=0, max_age=365, max_count=4
+):
+    """
+    Owner data of login with repos repos of branches branches each.
+    Branch ages, issue and pull request counts and languages are drawn from a seeded
+    generator so the same arguments always give the same owner.
+    """
+    rng = np.random.default_rng(seed)
+    repo_list = []
+    for i in range(repos):
+        repo_url = f"{SYNTHETIC_PUBLIC_URL}/{login}/repo-{i}"
+        ages = np.sort(rng.integers(0, max_age, size=branches))
+        pushed_at = DATE_NOW - timedelta(days=int(ages[0]) if branches else max_age)
+        repo_list.append(
+            {
+                "name": f"repo-{i}",
+                "html_url": repo_url,
+                "private": bool(rng.integers(2)),
+                "pushed_at": pushed_at.strftime(DATE_FORMAT),
+                "updated_at": pushed_at.strftime(DATE_FORMAT),
+                "issues": int(rng.integers(0, max_count)),
+                "pull_requests": int(rng.integers(0, max_count)),
+                "languages": {
+                    str(x): int(rng.integers(1, 10000))
+                    for x in rng.choice(
+                        SYNTHETIC_LANGUAGES, size=rng.integers(0, 3), replace=False
+                    )
+                },
+                "branches": [
+                    {
+                        "name": "main" if j == 0 else f"branch-{j}",
+                        "protected": j == 0,
+                        "sha": f"{i:020x}{j:020x}",
+                        "date": (DATE_NOW - timedelta(days=int(age))).strftime(
+                            DATE_FORMAT
+                        ),
+                        "last_modified": "Tue, 04 Jan 2022 10:00:00 GMT",
+                        "committer": None if j % 5 == 4 else f"user-{j % 3}",
+                    }
+                    for j, age in enumerate(ages)
+                ],
+            }
+        )
+    return {"login": login, "repos": repo_list}
+
+
+def get_synthetic_owner(repos=100, branches=5, login=SYNTHETIC_LOGIN, latency=0.0):
+    """
+    SyntheticOwner of get_synthetic_data(repos, branches, login).
+    """
+    return SyntheticOwner(get_synthetic_data(repos, branches, login), latency)
+
+
+def record_repo(repo):
+    """
+    Repo data of a PyGitHub Repository, this sends the requests get_repo_details does.
+    """
+    issues, _ = get_paginated_list_len(repo.get_issues())
+    pull_requests, _ = get_paginated_list_len(repo.get_pulls())
+    branches = []
+    for branch in repo.get_branches():
+        commit = branch.commit
+        branches.append(
+            {
+                "name": branch.name,
+                "protected": branch.protected,
+                "sha": commit.sha,
+                "date": commit.commit.author.date.strftime(DATE_FORMAT),
+                "last_modified": commit.last_modified,
+                "committer": (
+                    None if commit.committer is None else commit.committer.login
+                ),
+            }
+        )
+    return {
+        "name": repo.name,
+        "html_url": repo.html_url,
+        "private": repo.private,
+        "pushed_at": repo.pushed_at.strftime(DATE_FORMAT),
+        "updated_at": repo.updated_at.strftime(DATE_FORMAT),
+        "issues": issues,
+        "pull_requests": pull_requests,
+        "languages": repo.get_languages(),
+        "branches": branches,
+    }
+
+
+def record_owner(owner, path, max_repos=None):
+    """
+    Record owner (PyGitHub NamedUser or Organization) to json file path.
+    Only the first max_repos repos are recorded if given.
+    """
+    repos = []
+    for repo in owner.get_repos():
+        if max_repos is not None and len(repos) >= max_repos:
+            break
+        repos.append(record_repo(repo))
+    owner_data = {"login": owner.login, "repos": repos}
+    save_owner_data(owner_data, path)
+    return owner_data
+
+
+def save_owner_data(owner_data, path):
+    """
+    Write owner data to json file path.
+    """
+    with open(path, "w", encoding="utf-8") as owner_file:
+        json.dump(owner_data, owner_file)
+
+
+def load_owner_data(path):
+    """
+    Read owner data from json file path.
+    """
+    with open(path, "r", encoding="utf-8") as owner_file:
+        return json.load(owner_file)
+
+
+def load_owner(path, latency=0.0):
+    """
+    SyntheticOwner replaying the recording at path.
+    """
+    return SyntheticOwner(load_owner_data(path), latency)
@@ -0,0 +1,168 @@
+"""
+Pool of access tokens to spread requests over several rate limits.
+Each request is sent with the token chosen by the pool policy and the quota of every
+token is tracked per resource from the X-RateLimit headers of its responses.
+"""
+
+import itertools
+import logging
+import threading
+import time
+
+import pandas as pd
+
+from .scheduler import (
+    get_resource,
+    is_primary_limit,
+)
+
+TOKEN_POLICIES = ["round-robin", "most-remaining"]
+
+logger = logging.getLogger(__name__)
+logger.setLevel("INFO")
+
+
+def mask_token(token):
+    """
+    Last characters of token, safe to log.
+    """
+    return f"...{token[-4:]}"
+
+
+# pylint: disable=too-few-public-methods
+class TokenState:
+    """
+    Quota and usage of one token for one resource.
+    """
+
+    def __init__(self):
+        self.remaining = None
+        self.reset_time = None
+        self.requests = 0
+        self.limited = 0
+
+    def is_spent(self, now):
+        """
+        Check if quota is used up until the reset.
+        """
+        return (
+            self.remaining == 0
+            and self.reset_time is not None
+            and now < self.reset_time
+        )
+
+
+class TokenPool:
+    """
+    Select a token for each request and account for its rate limit.
+    Args:
+        tokens (list)       : personal access tokens, all must see the scanned repos
+        policy (str)        : default "round-robin", or "most-remaining" to pick the token
+                              with the largest remaining quota
+    """
+
+    def __init__(self, tokens, policy="round-robin"):
+        if len(tokens) == 0:
+            raise ValueError("tokens must not be empty")
+        if policy not in TOKEN_POLICIES:
+            raise ValueError(f"Expected policy in {TOKEN_POLICIES}, got {policy}.")
+        self.tokens = list(tokens)
+        self.policy = policy
+        self.states = {}
+        self.order = itertools.cycle(range(len(self.tokens)))
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def get_state(self, index, resource):
+        """
+        Get state of token index for resource, caller must hold lock.
+        """
+        if (index, resource) not in self.states:
+            self.states[(index, resource)] = TokenState()
+        return self.states[(index, resource)]
+
+    def select(self, url):
+        """
+        Index of the token to send a request to url with.
+        Spent tokens are skipped, if all are spent the one reset first is used.
+        """
+        resource = get_resource(url)
+        now = time.time()
+        with self.lock:
+            states = [self.get_state(i, resource) for i in range(len(self.tokens))]
+            available = [i for i, state in enumerate(states) if not state.is_spent(now)]
+            if len(available) == 0:
+                index = min(range(len(states)), key=lambda i: states[i].reset_time)
+            elif self.policy == "round-robin":
+                index = next(x for x in self.order if x in available)
+            else:
+                index = max(
+                    available,
+                    key=lambda i: (
+                        float("inf")
+                        if states[i].remaining is None
+                        else states[i].remaining
+                    ),
+                )
+            states[index].requests += 1
+        return index
+
+    def get_authorization(self, index, authorization=None):
+        """
+        Authorization header for token index, keeping the scheme of authorization.
+        """
+        scheme = "token"
+        if authorization is not None and authorization.lower().startswith("bearer "):
+            scheme = "bearer"
+        return f"{scheme} {self.tokens[index]}"
+
+    def update(self, index, url, response):
+        """
+        Record response sent with token index, returning True if the token is spent.
+        """
+        headers = response.headers
+        with self.lock:
+            state = self.get_state(index, get_resource(url))
+            if "X-RateLimit-Remaining" in headers and "X-RateLimit-Reset" in headers:
+                state.remaining = int(headers["X-RateLimit-Remaining"])
+                state.reset_time = int(headers["X-RateLimit-Reset"])
+            spent = is_primary_limit(response)
+            if spent:
+                state.limited += 1
+                logger.info("token %s spent", mask_token(self.tokens[index]))
+        return spent
+
+    def has_available(self, url):
+        """
+        Check if any token has quota left for url.
+        """
+        resource = get_resource(url)
+        now = time.time()
+        with self.lock:
+            return any(
+                not self.get_state(i, resource).is_spent(now)
+                for i in range(len(self.tokens))
+            )
+
+    def get_usage_df(self):
+        """
+        Requests and last known quota of each token per resource.
+        """
+        with self.lock:
+            rows = [
+                {
+                    "token": mask_token(self.tokens[index]),
+                    "resource": resource,
+                    "requests": state.requests,
+                    "limited": state.limited,
+                    "remaining": state.remaining,
+                    "reset": state.reset_time,
+                }
+                for (index, resource), state in sorted(self.states.items())
+            ]
+        return pd.DataFrame(
+            rows,
+            columns=["token", "resource", "requests", "limited", "remaining", "reset"],
+        )
@@ -0,0 +1,220 @@
+"""
+Transport helpers that sit underneath the PyGitHub connection.
+"""
+
+import hashlib
+import threading
+
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from github.Requester import RequestsResponse
+
+from .scheduler import RATE_LIMIT_MAX_RETRIES
+
+# headers that describe the request or quota rather than the cached body
+UNCACHED_HEADERS = [
+    "date",
+    "x-ratelimit-remaining",
+    "x-ratelimit-reset",
+    "x-ratelimit-used",
+]
+
+
+def get_cache_key(request):
+    """
+    Hash of method, url and the headers that change the response body.
+    """
+    key = "\n".join(
+        [
+            request.method,
+            request.url,
+            request.headers.get("Authorization", ""),
+            request.headers.get("Accept", ""),
+        ]
+    )
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def get_cached_response(request, entry, not_modified):
+    """
+    Build a 200 response from a cache entry and the headers of the 304 response.
+    """
+    response = Response()
+    response.status_code = 200
+    response.reason = "OK"
+    response.headers = CaseInsensitiveDict(entry["headers"])
+    response.headers.update(not_modified.headers)
+    # pylint: disable=protected-access
+    response._content = entry["body"]
+    response.encoding = not_modified.encoding or "utf-8"
+    response.url = request.url
+    response.request = request
+    response.connection = not_modified.connection
+    return response
+
+
+class GitHubAdapter(HTTPAdapter):
+    """
+    Transport adapter for GitHub requests, mounted under the PyGitHub connection.
+    With a cache, GET responses are stored with their ETag and revalidated: repeat
+    requests send If-None-Match and a 304 reply is served from the cache.
+    GitHub does not count 304 replies against the rate limit.
+    With a scheduler, requests are paced from rate limit headers and requests rejected
+    by a rate limit are retried after the pause instead of failing.
+    With a token pool, each request is sent with a token chosen by the pool and requests
+    rejected because a token is spent are retried with another token.
+    Cache keys use the Authorization header set by PyGitHub, not the pool token.
+    Args:
+        cache               : default None, object with get(key) and set(key, entry),
+                              see http_cache
+        scheduler           : default None, RateLimitScheduler shared by all requests
+        token_pool          : default None, TokenPool to send requests with
+    """
+
+    def __init__(self, cache=None, scheduler=None, token_pool=None, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+        self.scheduler = scheduler
+        self.token_pool = token_pool
+
+    def send_scheduled(self, request, **kwargs):
+        """
+        Send request when the scheduler allows, retrying rate limit rejections.
+        """
+        if self.scheduler is None and self.token_pool is None:
+            return super().send(request, **kwargs)
+        max_retries = RATE_LIMIT_MAX_RETRIES
+        if self.scheduler is not None:
+            max_retries = self.scheduler.max_retries
+        authorization = request.headers.get("Authorization")
+        for attempt in range(max_retries + 1):
+            token = None
+            if self.token_pool is not None:
+                token = self.token_pool.select(request.url)
+                request.headers["Authorization"] = self.token_pool.get_authorization(
+                    token, authorization
+                )
+            if self.scheduler is not None:
+                self.scheduler.acquire(request.url, token)
+            try:
+                response = super().send(request, **kwargs)
+            except Exception:
+                if self.scheduler is not None:
+                    self.scheduler.release(request.url, None, token)
+                raise
+            retry = False
+            if self.scheduler is not None:
+                retry = self.scheduler.release(request.url, response, token)
+            if self.token_pool is not None:
+                spent = self.token_pool.update(token, request.url, response)
+                retry = retry or (spent and self.token_pool.has_available(request.url))
+            if not retry or attempt == max_retries:
+                break
+            response.close()
+        return response
+
+    # pylint: disable=arguments-differ
+    def send(self, request, **kwargs):
+        if self.cache is None or request.method != "GET":
+            return self.send_scheduled(request, **kwargs)
+        key = get_cache_key(request)
+        entry = self.cache.get(key)
+        if entry is not None:
+            if entry["etag"] is not None:
+                request.headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"] is not None:
+                request.headers["If-Modified-Since"] = entry["last_modified"]
+        response = self.send_scheduled(request, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            return get_cached_response(request, entry, response)
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status_code == 200 and (etag or last_modified):
+            self.cache.set(
+                key,
+                {
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "headers": {
+                        name: value
+                        for name, value in response.headers.items()
+                        if name.lower() not in UNCACHED_HEADERS
+                    },
+                    "body": response.content,
+                },
+            )
+        return response
+
+
+def thread_safe_connection_class(connection_class, adapter=None):
+    """
+    Wrap a PyGitHub connection class so one persisted connection can be shared by threads.
+    PyGitHub stores the pending request on the connection object between request() and
+    getresponse(), so concurrent callers would overwrite each other's url and headers.
+    If adapter is given it is mounted on the connection session.
+    """
+
+    class ThreadSafeConnection(connection_class):
+        """
+        Connection that keeps the pending request in thread local storage.
+        """
+
+        # pylint: disable=too-many-arguments
+        def __init__(
+            self,
+            host,
+            port=None,
+            strict=False,
+            timeout=None,
+            retry=None,
+            pool_size=None,
+            **kwargs,
+        ):
+            super().__init__(
+                host,
+                port=port,
+                strict=strict,
+                timeout=timeout,
+                retry=retry,
+                pool_size=pool_size,
+                **kwargs,
+            )
+            self.pending = threading.local()
+            if adapter is not None:
+                self.session.mount(f"{self.protocol}://", adapter)
+
+        # pylint: disable=redefined-builtin
+        def request(self, verb, url, input, headers):
+            self.pending.verb = verb
+            self.pending.url = url
+            self.pending.input = input
+            self.pending.headers = headers
+
+        def getresponse(self):
+            verb = getattr(self.session, self.pending.verb.lower())
+            url = f"{self.protocol}://{self.host}:{self.port}{self.pending.url}"
+            response = verb(
+                url,
+                headers=self.pending.headers,
+                data=self.pending.input,
+                timeout=self.timeout,
+                verify=self.verify,
+                allow_redirects=False,
+            )
+            return RequestsResponse(response)
+
+    return ThreadSafeConnection
+
+
+def make_thread_safe(github_con, adapter=None):
+    """
+    Swap the connection class of a Github object for a thread safe version.
+    Must be called before the first request is made on github_con.
+    """
+    # pylint: disable=protected-access
+    requester = github_con._Github__requester
+    requester._Requester__connectionClass = thread_safe_connection_class(
+        requester._Requester__connectionClass, adapter
+    )
+    return github_con
@@ -2,11 +2,10 @@
 Helper functions for GitHubHealth class and app.
 """
 
-from copy import deepcopy
 from datetime import datetime
+import importlib
 import logging
 
-import altair as alt
 import numpy as np
 import pandas as pd
 from requests.exceptions import ReadTimeout
@@ -14,6 +13,17 @@ from requests.exceptions import ReadTimeout
 from github.Repository import Repository
 from github.NamedUser import NamedUser
 
+from .health import DEFAULT_HEALTH_POLICY
+from .render import (
+    BOLD_CLASS,
+    RED_CLASS,
+    HtmlTable,
+    gt_mask,
+    is_false_mask,
+    link_columns,
+    parent_url,
+)
+
 BRANCH_DF_COLUMNS = [
     "branch",
     "url",
@@ -42,53 +52,116 @@ SEARCH_DF_COLUMNS = [
     "url",
     "health",
 ]
-BRANCH_TEMPLATE_DF = pd.DataFrame(columns=BRANCH_DF_COLUMNS)
-REPOS_TEMPLATE_DF = pd.DataFrame(columns=REPOS_DF_COLUMNS)
+BRANCH_DF_DTYPES = {
+    "age (days)": "int64",
+    "protected": "bool",
+}
+REPOS_DF_DTYPES = {
+    "branch count": "int64",
+    "min branch age (days)": "float64",
+    "max branch age (days)": "float64",
+    "issues": "Int64",
+    "pull requests": "Int64",
+    "score": "float64",
+}
 SEARCH_TEMPLATE_DF = pd.DataFrame(columns=SEARCH_DF_COLUMNS)
 DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
 DATE_NOW = datetime.now()
 TIMEOUT = 2
+MAX_WORKERS = 8
+REPO_CHUNK_SIZE = 100
+SEARCH_CACHE_SIZE = 64
+SEARCH_CACHE_TTL = 300
 MIN_BR_LIMIT = 45
 MAX_BR_LIMIT = 90
 BC_LIMIT = 3
 I_LIMIT = 1
 PR_LIMIT = 1
-
+PLOT_DATA_NAME = "ghh-data"
+PLOT_CACHE_SIZE = 64
+# above this many rows plots are aggregated to bounded size
+PLOT_MAX_ROWS = 200
+PLOT_TOP_N = 30
+PLOT_BINS = 20
+PLOT_BIN_VARS = [
+    "min branch age (days)",
+    "max branch age (days)",
+    "age (days)",
+    "issues",
+    "pull requests",
+]
+RED_LIMITS = {
+    "branch count": BC_LIMIT,
+    "min branch age (days)": MIN_BR_LIMIT,
+    "max branch age (days)": MAX_BR_LIMIT,
+    "issues": I_LIMIT,
+    "pull requests": PR_LIMIT,
+}
+# plotting lives in .plots and loads altair, it is imported on first use
+PLOTS_NAMES = [
+    "ghh_theme",
+    "get_ghh_plot",
+    "get_ghh_repo_plot",
+    "get_plot_specs",
+]
 
 logger = logging.getLogger(__name__)
 logger.setLevel("INFO")
 
 
-def ghh_theme():
-    """
-    define the theme by returning the dictionary of configurations
-    """
-    return {
-        "config": {
-            "view": {
-                "height": 500,
-                "width": 500,
-            },
-            "mark": {
-                "color": "black",
-                "fill": "#1818ab",
-                "stroke": "black",
-                "strokeWidth": 10,
-            },
-            "axis": {
-                "titleFontSize": "20",
-                "labelFontSize": "20",
-            },
-            "title": {
-                "fontSize": "20",
-            },
-        }
-    }
+def __getattr__(name):
+    """
+    Load plotting helpers from .plots when first used.
+    """
+    if name in PLOTS_NAMES:
+        return getattr(importlib.import_module(".plots", __package__), name)
+    raise AttributeError(f"module {__name__} has no attribute {name}")
+
+
+class FrameBuilder:
+    """
+    Accumulate rows as plain column lists and build a typed DataFrame once at the end.
+    Avoids constructing and concatenating a one row DataFrame per record.
+    Args:
+        columns (list)      : column order of the output DataFrame
+        dtypes (dict)       : default None, dtypes applied to columns on to_df
+    """
+
+    def __init__(self, columns, dtypes=None):
+        if dtypes is None:
+            dtypes = {}
+        self.columns = list(columns)
+        self.dtypes = dtypes
+        self.data = {column: [] for column in self.columns}
+
+    def __len__(self):
+        return len(self.data[self.columns[0]])
+
+    def append(self, record):
+        """
+        Add one record (dict of column: scalar value).
+        """
+        for column in self.columns:
+            self.data[column].append(record[column])
 
+    def extend(self, records):
+        """
+        Add many records.
+        """
+        for record in records:
+            self.append(record)
 
-def get_branch_details(branch):
+    def to_df(self):
+        """
+        Build the DataFrame from accumulated values.
+        """
+        return pd.DataFrame(self.data, columns=self.columns).astype(self.dtypes)
+
+
+def get_branch_details(branch, output="df"):
     """
-    Get information on branch from PyGitHub API and format in pandas DataFrame.
+    Get information on branch from PyGitHub API.
+    output="record" returns a dict of plain values, output="df" a one row DataFrame.
     """
     commit = branch.commit
     date = commit.commit.author.date
@@ -96,52 +169,80 @@ def get_branch_details(branch):
     committer = "unknown_user"
     if commit.committer is not None:
         committer = commit.committer.login
-    branch_dict = {
-        "branch": [branch.name],
-        "url": [commit.html_url],
-        "sha": [commit.sha[:7]],  # short sha should work
-        "last modified": [commit.last_modified],
-        "age (days)": [age],
-        "protected": [branch.protected],
-        "committer": [committer],
+    branch_record = {
+        "branch": branch.name,
+        "url": commit.html_url,
+        "sha": commit.sha[:7],  # short sha should work
+        "last modified": commit.last_modified,
+        "age (days)": age,
+        "protected": branch.protected,
+        "committer": committer,
     }
-    branch_df = pd.DataFrame.from_dict(branch_dict)
-    return branch_df
+    if output == "record":
+        return_obj = branch_record
+    elif output == "df":
+        return_obj = get_branch_builder([branch_record]).to_df()
+    else:
+        raise Exception(f'Expected output="df" or "record", got {output}.')
+    return return_obj
+
+
+def get_branch_builder(records=None):
+    """
+    Get FrameBuilder for branch records.
+    """
+    builder = FrameBuilder(BRANCH_DF_COLUMNS, BRANCH_DF_DTYPES)
+    if records is not None:
+        builder.extend(records)
+    return builder
+
+
+def get_repos_builder(records=None):
+    """
+    Get FrameBuilder for repo records.
+    """
+    builder = FrameBuilder(REPOS_DF_COLUMNS, REPOS_DF_DTYPES)
+    if records is not None:
+        builder.extend(records)
+    return builder
 
 
 def get_branch_df(repo):
     """
     Get information on repo from PyGitHub API and format in pandas DataFrame.
     """
-    branch_df = pd.concat(
-        [BRANCH_TEMPLATE_DF]
-        + [get_branch_details(branch) for branch in repo.get_branches()],
-        ignore_index=True,
-    )
+    branch_df = get_branch_builder(
+        get_branch_details(branch, output="record") for branch in repo.get_branches()
+    ).to_df()
     return branch_df
 
 
-def get_repo_details(repo, output="df"):
+def get_repo_details(repo, output="df", policy=None, branch_records=None):
     """
-    Get information on repo from PyGitHub API and format in pandas DataFrame.
+    Get information on repo from PyGitHub API.
+    output="record" returns a dict of plain values, output="dict" a dict of one item
+    lists and output="df" a one row DataFrame.
+    score follows policy, DEFAULT_HEALTH_POLICY if None.
+    If branch_records (list) is given the records of the branches are added to it.
     """
-    branch_df = pd.concat(
-        [BRANCH_TEMPLATE_DF]
-        + [get_branch_details(branch) for branch in repo.get_branches()],
-        ignore_index=True,
-    )
+    records = [
+        get_branch_details(branch, output="record") for branch in repo.get_branches()
+    ]
+    if branch_records is not None:
+        branch_records.extend(records)
+    ages = [x["age (days)"] for x in records]
     # will handle these errors later but for now let the value propagate through as None
     issues, _ = get_paginated_list_len(repo.get_issues())
     pull_requests, _ = get_paginated_list_len(repo.get_pulls())
-    repo_dict = {
-        "repo": [repo.name],
-        "repo_url": [repo.html_url],
-        "private": [repo.private],
-        "branch count": [len(branch_df)],
-        "min branch age (days)": [branch_df["age (days)"].min()],
-        "max branch age (days)": [branch_df["age (days)"].max()],
-        "issues": [issues],
-        "pull requests": [pull_requests],
+    repo_record = {
+        "repo": repo.name,
+        "repo_url": repo.html_url,
+        "private": repo.private,
+        "branch count": len(ages),
+        "min branch age (days)": min(ages) if ages else np.nan,
+        "max branch age (days)": max(ages) if ages else np.nan,
+        "issues": issues,
+        "pull requests": pull_requests,
     }
     languages = repo.get_languages()
     primary_language = None
@@ -149,41 +250,19 @@ def get_repo_details(repo, output="df"):
         primary_language = sorted(languages.items(), key=lambda x: x[1], reverse=True)[
             0
         ][0]
-    repo_dict["primary language"] = [primary_language]
-    repo_dict["score"] = [get_health(repo_dict)]
-    repo_df = pd.DataFrame.from_dict(repo_dict)
-    if output == "df":
-        return_obj = repo_df
+    repo_record["primary language"] = primary_language
+    repo_record["score"] = get_health(repo_record, policy)
+    if output == "record":
+        return_obj = repo_record
+    elif output == "df":
+        return_obj = get_repos_builder([repo_record]).to_df()
     elif output == "dict":
-        return_obj = repo_dict
+        return_obj = {key: [value] for key, value in repo_record.items()}
     else:
-        raise Exception('Expected output="df" or "dict", got {output}.')
+        raise Exception(f'Expected output="df", "dict" or "record", got {output}.')
     return return_obj
 
 
-def format_gt_red(val, red_length):
-    """
-    Helper function to get css style of color for cell value.
-    """
-    return "color: red" if val > red_length else None
-
-
-def get_user_gh_df(user):
-    """
-    Main method to parse repo details into pandas DataFrame.
-    """
-    repo_df = (
-        pd.concat(
-            [REPOS_TEMPLATE_DF]
-            + [get_repo_details(repo) for repo in user.get_repos() if user is not None],
-            ignore_index=True,
-        )
-        .sort_values(by="repo")
-        .reset_index(drop=True)
-    )
-    return repo_df
-
-
 def get_paginated_list_len(pl_obj):
     """
     No inbuilt method to get length so iterate through?
@@ -198,143 +277,82 @@ def get_paginated_list_len(pl_obj):
     return this_len, error_message
 
 
-def link_repo_name_url(name, url, target="_blank"):
+def get_metadata_table(metadata_df):
     """
-    concat repo name and url in hyperlink
+    Get HtmlTable of metadata_df, owner and name link to url.
     """
-    return f"<a target='{target}' href='{url}'>{name}</a>"
+    metadata_df_cpy = metadata_df.copy()
+    if len(metadata_df_cpy) > 0:
+        metadata_df_cpy["owner"] = link_columns(
+            metadata_df_cpy["owner"], parent_url(metadata_df_cpy["url"])
+        )
+        metadata_df_cpy["name"] = link_columns(
+            metadata_df_cpy["name"], metadata_df_cpy["url"]
+        )
+        metadata_df_cpy.drop("url", axis=1, inplace=True)
+    return HtmlTable(metadata_df_cpy, sort_df=metadata_df[metadata_df_cpy.columns])
 
 
 def render_metadata_html_table(metadata_df, table_id=None):
     """
     format repo_df to html.
     """
-    metadata_df_cpy = deepcopy(metadata_df)
-    if len(metadata_df_cpy) > 0:
-        metadata_df_cpy["owner"] = metadata_df_cpy.apply(
-            lambda x: link_repo_name_url(
-                x["owner"], "/".join(x["url"].split("/")[:-1])
-            ),
-            axis=1,
-        )
-        metadata_df_cpy["name"] = metadata_df_cpy.apply(
-            lambda x: link_repo_name_url(x["name"], x["url"]), axis=1
-        )
-        metadata_df_cpy.drop("url", axis=1, inplace=True)
+    return get_metadata_table(metadata_df).render(table_id)
 
-    repo_html = metadata_df_cpy.style.hide_index()
-    if table_id is not None:
-        repo_html.set_uuid(table_id)
-    repo_html = repo_html.render()
-    return repo_html
 
-
-def render_single_repo_html_table(repo_df, table_id=None):
+def get_single_repo_table(repo_df):
     """
-    format repo_df to html.
+    Get HtmlTable of branch df, branch, sha and committer link to GitHub.
     """
-    repo_df_cpy = deepcopy(repo_df)
+    repo_df_cpy = repo_df.copy()
     if len(repo_df_cpy) > 0:
-        repo_df_cpy["branch"] = repo_df_cpy.apply(
-            lambda x: link_repo_name_url(
-                x["branch"], "/".join(x["url"].split("/")[:-2] + ["tree", x["branch"]])
-            ),
-            axis=1,
-        )
-        repo_df_cpy["sha"] = repo_df_cpy.apply(
-            lambda x: link_repo_name_url(x["sha"], x["url"]), axis=1
+        url = repo_df_cpy["url"].astype(str)
+        repo_df_cpy["branch"] = link_columns(
+            repo_df_cpy["branch"],
+            parent_url(url, 2) + "/tree/" + repo_df_cpy["branch"].astype(str),
         )
-        repo_df_cpy["committer"] = repo_df_cpy.apply(
-            lambda x: link_repo_name_url(
-                x["committer"], "/".join(x["url"].split("/")[:-4] + [x["committer"]])
-            ),
-            axis=1,
+        repo_df_cpy["sha"] = link_columns(repo_df_cpy["sha"], url)
+        repo_df_cpy["committer"] = link_columns(
+            repo_df_cpy["committer"],
+            parent_url(url, 4) + "/" + repo_df_cpy["committer"].astype(str),
         )
         repo_df_cpy.drop("url", axis=1, inplace=True)
-    repo_html = repo_df_cpy.style.hide_index()
-    if table_id is not None:
-        repo_html.set_uuid(table_id)
-    repo_html = repo_html.render()
-    return repo_html
+    return HtmlTable(repo_df_cpy, sort_df=repo_df[repo_df_cpy.columns])
 
 
-def render_repo_html_table(repo_df, table_id=None):
+def render_single_repo_html_table(repo_df, table_id=None):
     """
     format repo_df to html.
     """
-    repo_df_cpy = deepcopy(repo_df)
-    repo_df_cpy["issues"] = repo_df_cpy["issues"].astype(int)
-    repo_df_cpy["pull requests"] = repo_df_cpy["pull requests"].astype(int)
+    return get_single_repo_table(repo_df).render(table_id)
+
+
+def get_repo_table(repo_df):
+    """
+    Get HtmlTable of repo_df with repo links and out of limit values marked.
+    """
+    repo_df_cpy = repo_df.copy()
     if len(repo_df_cpy) > 0:
-        repo_df_cpy["repo"] = repo_df_cpy.apply(
-            lambda x: link_repo_name_url(x["repo"], x["repo_url"]), axis=1
-        )
+        repo_df_cpy["repo"] = link_columns(repo_df_cpy["repo"], repo_df_cpy["repo_url"])
         repo_df_cpy.drop("repo_url", axis=1, inplace=True)
-
-    repo_html = (
-        repo_df_cpy.style.hide_index()
-        .applymap(
-            lambda x: "font-weight: bold" if x is False else None,
-            subset=["private"],
-        )
-        .applymap(
-            lambda x: format_gt_red(x, MIN_BR_LIMIT), subset=["min branch age (days)"]
-        )
-        .applymap(
-            lambda x: format_gt_red(x, MAX_BR_LIMIT), subset=["max branch age (days)"]
-        )
-        .applymap(lambda x: format_gt_red(x, BC_LIMIT), subset=["branch count"])
-        .applymap(lambda x: format_gt_red(x, I_LIMIT), subset=["issues"])
-        .applymap(lambda x: format_gt_red(x, PR_LIMIT), subset=["pull requests"])
-    ).format(precision=0, na_rep="missing", formatter={"score": "{:.2f}"})
-    if table_id is not None:
-        repo_html.set_uuid(table_id)
-    repo_html = repo_html.render()
-    return repo_html
-
-
-def get_ghh_plot(plot_df, var):
-    """
-    Standard formatting of ghh plot.
-    """
-    # register the custom theme under a chosen name
-    alt.themes.register("ghh_theme", ghh_theme)
-    # enable the newly registered theme
-    alt.themes.enable("ghh_theme")
-    plot = (
-        alt.Chart(plot_df)
-        .mark_bar()
-        .encode(
-            x="repo",
-            y=var,
-            tooltip=var,
-        )
-        .interactive()
-        .properties(title=f"{var.replace('_', ' ')} by repo")
+    cell_classes = {"private": [(is_false_mask(repo_df_cpy["private"]), BOLD_CLASS)]}
+    for column, limit in RED_LIMITS.items():
+        cell_classes[column] = [(gt_mask(repo_df_cpy[column], limit), RED_CLASS)]
+    return HtmlTable(
+        repo_df_cpy,
+        sort_df=repo_df[repo_df_cpy.columns],
+        precision=0,
+        na_rep="missing",
+        formatters={"score": "{:.2f}"},
+        cell_classes=cell_classes,
     )
-    return plot
 
 
-def get_ghh_repo_plot(plot_df, var):
+def render_repo_html_table(repo_df, table_id=None):
     """
-    Standard formatting of ghh plot.
+    format repo_df to html.
     """
-    # register the custom theme under a chosen name
-    alt.themes.register("ghh_theme", ghh_theme)
-    # enable the newly registered theme
-    alt.themes.enable("ghh_theme")
-    plot = (
-        alt.Chart(plot_df)
-        .mark_bar()
-        .encode(
-            x="branch",
-            y=var,
-            tooltip=var,
-        )
-        .interactive()
-        .properties(title=f"{var.replace('_', ' ')} by branch")
-    )
-    return plot
+    return get_repo_table(repo_df).render(table_id)
 
 
 def get_health_ghh_obj(obj):
@@ -347,10 +365,8 @@ def get_health_ghh_obj(obj):
     elif isinstance(obj, NamedUser):
         repos = list(obj.get_repos())
         repo_df = (
-            pd.concat(
-                [REPOS_TEMPLATE_DF] + [get_repo_details(repo) for repo in repos],
-                ignore_index=True,
-            )
+            get_repos_builder(get_repo_details(repo, output="record") for repo in repos)
+            .to_df()
             .sort_values(by="repo")
             .reset_index(drop=True)
         )
@@ -359,86 +375,22 @@ def get_health_ghh_obj(obj):
     return score
 
 
-def get_health_single(obj):
-    """
-    get individual scores for 4 repo components.
-    """
-    branch_count = 0
-    branch_age = 0
-    issues = 0
-    pull_requests = 0
-    denom = 1
-    if obj["branch count"] >= 3:
-        branch_count = 1
-    if obj["min branch age (days)"] >= 90:
-        branch_age = 1
-    if obj["issues"] > 0:
-        issues = 1
-    if obj["pull requests"] > 0:
-        pull_requests = 1
-    return denom, branch_count, branch_age, issues, pull_requests
-
-
-def get_health_multiple(obj):
-    """
-    get individual scores for 4 repo components.
-    """
-    branch_count = 0
-    branch_age = 0
-    issues = 0
-    pull_requests = 0
-    denom = len(obj["repo"])
-    assert all(isinstance(obj[x], list) for x in obj)
-    assert all(len(obj[x]) == denom for x in obj)
-    for brc in obj["branch count"]:
-        if brc >= 3:
-            branch_count += 1
-    for mba in obj["min branch age (days)"]:
-        if mba >= 90:
-            branch_age += 1
-    for i in obj["issues"]:
-        if i > 0:
-            issues += 1
-    for prq in obj["pull requests"]:
-        if prq > 0:
-            pull_requests += 1
-    return denom, branch_count, branch_age, issues, pull_requests
-
-
-def get_health(obj):
+def get_health(obj, policy=None):
     """
     calculate health from object depending on type.
+    Scores follow policy (see health.HealthPolicy), DEFAULT_HEALTH_POLICY if None.
     """
+    if policy is None:
+        policy = DEFAULT_HEALTH_POLICY
     if isinstance(obj, dict):
         assert all(x in REPOS_DF_COLUMNS for x in obj)
         if "score" in obj:
             return obj["score"]
         if isinstance(obj["repo"], str):
-            denom, branch_count, branch_age, issues, pull_requests = get_health_single(
-                obj
-            )
-        else:
-            (
-                denom,
-                branch_count,
-                branch_age,
-                issues,
-                pull_requests,
-            ) = get_health_multiple(obj)
-    elif isinstance(obj, (NamedUser, Repository)):
-        denom, branch_count, branch_age, issues, pull_requests = get_health_ghh_obj(obj)
-    # formula heavily modified from pylint https://docs.pylint.org/en/1.6.0/faq.html
-    logging.debug("branch_count: %s", branch_count)
-    logging.debug("branch_age: %s", branch_age)
-    logging.debug("issues: %s", issues)
-    logging.debug("pull_requests: %s", pull_requests)
-    logging.debug("denom: %s", denom)
-    if denom > 0:
-        neg_score = float(
-            2.5 * (branch_count + branch_age + issues + pull_requests) / denom
-        )
-    else:
-        neg_score = np.nan
-    logging.debug("neg_score: %s", neg_score)
-    health = max(10.0 - neg_score, 0.0)
-    return health
+            return policy.score_record(obj)
+        assert all(isinstance(obj[x], list) for x in obj)
+        assert all(len(obj[x]) == len(obj["repo"]) for x in obj)
+        return policy.score_summary(pd.DataFrame(obj))
+    if isinstance(obj, (NamedUser, Repository)):
+        return get_health_ghh_obj(obj)
+    raise Exception(f"Expected dict, NamedUser or Repository, got {type(obj)}.")
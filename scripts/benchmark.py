@@ -0,0 +1,215 @@
+"""
+Offline benchmark suite, no token or network needed.
+Times fetching, scoring, rendering and plotting on a synthetic owner of repos x branches
+or on a recording made with GitHubHealth.synthetic.record_owner. Each run is saved as
+json in the results dir and compared against the previous run there, or --compare.
+usage: python scripts/benchmark.py [--repos 500] [--branches 5] [--recording owner.json]
+"""
+
+import argparse
+from datetime import datetime
+import glob
+import json
+import os
+import platform
+import timeit
+
+import pandas as pd
+
+from GitHubHealth import plots
+from GitHubHealth.fetch import RepoFetcher
+from GitHubHealth.health import DEFAULT_HEALTH_POLICY
+from GitHubHealth.requested_object import (
+    RequestedObject,
+    get_metadata_row,
+)
+from GitHubHealth.synthetic import (
+    SYNTHETIC_PUBLIC_URL,
+    get_synthetic_owner,
+    load_owner,
+)
+from GitHubHealth.utils import (
+    get_branch_df,
+    get_health,
+    get_repo_details,
+    render_metadata_html_table,
+    render_repo_html_table,
+    render_single_repo_html_table,
+)
+
+REPOS = 500
+BRANCHES = 5
+REPEAT = 5
+RESULTS_DIR = "benchmark_results"
+
+
+def get_version():
+    """
+    Installed GitHubHealth version, unknown when running from a plain checkout.
+    """
+    try:
+        # pylint: disable=import-outside-toplevel
+        from importlib.metadata import version
+
+        return version("GitHubHealth")
+    # pylint: disable=broad-except
+    except Exception:
+        return "unknown"
+
+
+def get_requested_object(owner, workers):
+    """
+    RequestedObject of owner with its repo list loaded.
+    """
+    requested_object = RequestedObject(
+        owner, f"{SYNTHETIC_PUBLIC_URL}/{owner.login}", RepoFetcher(workers)
+    )
+    requested_object.get_repos()
+    return requested_object
+
+
+def get_cold_plots(requested_object):
+    """
+    Plots built without the plot cache.
+    """
+    plots.PLOT_CACHE.clear()
+    requested_object.get_plots()
+
+
+def get_benchmarks(owner, workers):
+    """
+    Benchmark name to function timed, with the inputs they share built once.
+    """
+    repos = owner.get_repos()
+    requested_object = get_requested_object(owner, workers)
+    requested_object.get_repo_df()
+    repo_df = requested_object.repo_df
+    records = repo_df.to_dict(orient="records")
+    unscored = repo_df.drop("score", axis=1).to_dict(orient="list")
+    branch_df = pd.concat([get_branch_df(repo) for repo in repos], ignore_index=True)
+    metadata_df = pd.DataFrame(
+        [get_metadata_row("repo", repo, SYNTHETIC_PUBLIC_URL) for repo in repos]
+    )
+    requested_object.get_plots()
+    return {
+        "get_repo_details": lambda: [
+            get_repo_details(repo, output="record") for repo in repos
+        ],
+        "get_branch_df": lambda: [get_branch_df(repo) for repo in repos],
+        "RequestedObject.get_repo_df": lambda: get_requested_object(
+            owner, workers
+        ).get_repo_df(),
+        "HealthPolicy.score": lambda: DEFAULT_HEALTH_POLICY.score(repo_df),
+        "HealthPolicy.score_record": lambda: [
+            DEFAULT_HEALTH_POLICY.score_record(record) for record in records
+        ],
+        "get_health summary": lambda: get_health(unscored),
+        "render_repo_html_table": lambda: render_repo_html_table(repo_df),
+        "render_single_repo_html_table": lambda: render_single_repo_html_table(
+            branch_df
+        ),
+        "render_metadata_html_table": lambda: render_metadata_html_table(metadata_df),
+        "RequestedObject.get_plots": lambda: get_cold_plots(requested_object),
+        "RequestedObject.get_plots cached": requested_object.get_plots,
+    }
+
+
+def run(owner, workers=1, repeat=REPEAT, selected=None):
+    """
+    Best and median seconds of each benchmark over repeat runs.
+    """
+    results = {}
+    for name, func in get_benchmarks(owner, workers).items():
+        if selected and not any(x in name for x in selected):
+            continue
+        seconds = sorted(timeit.repeat(func, number=1, repeat=repeat))
+        results[name] = {"best": seconds[0], "median": seconds[len(seconds) // 2]}
+    return results
+
+
+def get_previous_path(results_dir):
+    """
+    Most recent results file in results_dir, None if there is none.
+    """
+    paths = sorted(glob.glob(os.path.join(results_dir, "*.json")))
+    return paths[-1] if paths else None
+
+
+def print_results(results, previous=None):
+    """
+    Print results, with the change in best time against previous results if given.
+    """
+    for name, result in results.items():
+        line = f"{name:>34}: {result['best']:.4f}s (median {result['median']:.4f}s)"
+        if previous is not None and name in previous["results"]:
+            before = previous["results"][name]["best"]
+            line += f" {100 * (result['best'] / before - 1):+.1f}% vs {before:.4f}s"
+        print(line)
+
+
+def get_parser():
+    """
+    Argument parser of the benchmark script.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repos", type=int, default=REPOS)
+    parser.add_argument("--branches", type=int, default=BRANCHES)
+    parser.add_argument(
+        "--recording", help="json recording to replay instead of a synthetic owner"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds per simulated request"
+    )
+    parser.add_argument("--workers", type=int, default=1, help="RepoFetcher workers")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument(
+        "-k", dest="selected", action="append", help="only run names containing this"
+    )
+    parser.add_argument("--results-dir", default=RESULTS_DIR)
+    parser.add_argument(
+        "--compare", help="results file to compare with, default the previous run"
+    )
+    parser.add_argument("--no-save", action="store_true")
+    return parser
+
+
+def main(argv=None):
+    """
+    Run the suite, print and save its results.
+    """
+    args = get_parser().parse_args(argv)
+    if args.recording is not None:
+        owner = load_owner(args.recording, args.latency)
+    else:
+        owner = get_synthetic_owner(args.repos, args.branches, latency=args.latency)
+    compare_path = args.compare or get_previous_path(args.results_dir)
+    previous = None
+    if compare_path is not None:
+        with open(compare_path, "r", encoding="utf-8") as previous_file:
+            previous = json.load(previous_file)
+        print(f"comparing with {compare_path}")
+    output = {
+        "created": datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
+        "version": get_version(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "owner": owner.login,
+        "repos": len(owner.repos),
+        "branches": sum(len(repo.branches) for repo in owner.repos),
+        "latency": args.latency,
+        "workers": args.workers,
+        "results": run(owner, args.workers, args.repeat, args.selected),
+    }
+    print_results(output["results"], previous)
+    if not args.no_save:
+        os.makedirs(args.results_dir, exist_ok=True)
+        path = os.path.join(
+            args.results_dir, f"{output['created'].replace(':', '')}.json"
+        )
+        with open(path, "w", encoding="utf-8") as output_file:
+            json.dump(output, output_file, indent=2)
+        print(f"saved {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Compare rendering the repo table with pandas Styler and with GitHubHealth.render.
+usage: python scripts/benchmark_render.py [rows]
+"""
+
+import sys
+import timeit
+
+import numpy as np
+
+from GitHubHealth.utils import (
+    BC_LIMIT,
+    I_LIMIT,
+    MAX_BR_LIMIT,
+    MIN_BR_LIMIT,
+    PR_LIMIT,
+    get_repos_builder,
+    render_repo_html_table,
+)
+
+ROWS = 10000
+REPEAT = 3
+
+
+def format_gt_red(val, red_length):
+    """
+    Helper function to get css style of color for cell value.
+    """
+    return "color: red" if val > red_length else None
+
+
+def link_repo_name_url(name, url, target="_blank"):
+    """
+    concat repo name and url in hyperlink
+    """
+    return f"<a target='{target}' href='{url}'>{name}</a>"
+
+
+def get_repo_df(rows):
+    """
+    Synthetic repo_df with rows repos.
+    """
+    rng = np.random.default_rng(0)
+    return get_repos_builder(
+        {
+            "repo": f"repo-{i}",
+            "repo_url": f"https://github.com/owner/repo-{i}",
+            "private": bool(rng.integers(2)),
+            "branch count": int(rng.integers(1, 10)),
+            "min branch age (days)": float(rng.integers(0, 200)),
+            "max branch age (days)": np.nan if i % 7 == 0 else float(i % 300),
+            "issues": int(rng.integers(0, 3)),
+            "pull requests": int(rng.integers(0, 3)),
+            "primary language": None if i % 5 == 0 else "Python",
+            "score": float(rng.uniform(0, 10)),
+        }
+        for i in range(rows)
+    ).to_df()
+
+
+def render_styler(repo_df, table_id=None):
+    """
+    Previous Styler based rendering of render_repo_html_table.
+    """
+    repo_df_cpy = repo_df.copy()
+    repo_df_cpy["issues"] = repo_df_cpy["issues"].astype(int)
+    repo_df_cpy["pull requests"] = repo_df_cpy["pull requests"].astype(int)
+    repo_df_cpy["repo"] = repo_df_cpy.apply(
+        lambda x: link_repo_name_url(x["repo"], x["repo_url"]), axis=1
+    )
+    repo_df_cpy.drop("repo_url", axis=1, inplace=True)
+    repo_html = (
+        repo_df_cpy.style.hide_index()
+        .applymap(
+            lambda x: "font-weight: bold" if x is False else None,
+            subset=["private"],
+        )
+        .applymap(
+            lambda x: format_gt_red(x, MIN_BR_LIMIT), subset=["min branch age (days)"]
+        )
+        .applymap(
+            lambda x: format_gt_red(x, MAX_BR_LIMIT), subset=["max branch age (days)"]
+        )
+        .applymap(lambda x: format_gt_red(x, BC_LIMIT), subset=["branch count"])
+        .applymap(lambda x: format_gt_red(x, I_LIMIT), subset=["issues"])
+        .applymap(lambda x: format_gt_red(x, PR_LIMIT), subset=["pull requests"])
+    ).format(precision=0, na_rep="missing", formatter={"score": "{:.2f}"})
+    if table_id is not None:
+        repo_html.set_uuid(table_id)
+    return repo_html.render()
+
+
+def main(rows=ROWS):
+    """
+    Print best of REPEAT timings of both renderers.
+    """
+    repo_df = get_repo_df(rows)
+    for name, func in [("styler", render_styler), ("template", render_repo_html_table)]:
+        seconds = min(
+            timeit.repeat(
+                lambda func=func: func(repo_df, table_id="repo-metadata"),
+                number=1,
+                repeat=REPEAT,
+            )
+        )
+        print(f"{name:>10}: {seconds:.3f}s for {rows} rows")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else ROWS)
@@ -0,0 +1,293 @@
+"""
+Load test of the Flask app against the local GitHub API stand in (GitHubHealth.fake_api).
+Each client logs in with its own token and repeats a visit: user page, search, status
+scan of an org with its job polled to the end, job table page, repo status and repo table
+page. Throughput and p50/p95/p99 latency are reported per route.
+usage: python scripts/load_test.py [--clients 8] [--duration 60] [--latency 0.05]
+"""
+
+import argparse
+from collections import defaultdict
+import json
+import random
+import re
+import threading
+import time
+
+import numpy as np
+import requests
+
+from GitHubHealth.fake_api import (
+    FAKE_ERROR_KINDS,
+    FAKE_RATE_LIMITS,
+    FakeApiConfig,
+    FakeGitHubApi,
+    get_owners,
+    parse_errors,
+    parse_latency,
+    start_server,
+)
+
+CLIENTS = 4
+DURATION = 30
+ORGS = 4
+USER_LOGIN = "me"
+POLL_INTERVAL = 0.2
+REQUEST_TIMEOUT = 120
+PERCENTILES = [50, 95, 99]
+CSRF_PATTERN = re.compile(r'name="csrf_token" type="hidden" value="([^"]+)"')
+JOB_PATTERN = re.compile(r"/job/([0-9a-f]{32})")
+
+
+class LoadClient:
+    """
+    One logged in browser session of the app, timing every request by route.
+    Args:
+        app_url (str)       : root url of the app
+        api_url (str)       : hostname given at login, url of the API stand in
+        token (str)         : token of this client, clients have separate quotas
+        records (list)      : shared list (route, seconds, ok) is appended to
+    """
+
+    def __init__(self, app_url, api_url, token, records):
+        self.app_url = app_url.rstrip("/")
+        self.api_url = api_url
+        self.token = token
+        self.records = records
+        self.session = requests.Session()
+        self.csrf_token = None
+
+    def request(self, route, method, path, **kwargs):
+        """
+        Send a request and record its time, returning the response or None on failure.
+        """
+        start = time.perf_counter()
+        response = None
+        try:
+            response = self.session.request(
+                method, f"{self.app_url}{path}", timeout=REQUEST_TIMEOUT, **kwargs
+            )
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        self.records.append((route, time.perf_counter() - start, ok))
+        return response
+
+    def set_csrf_token(self, response):
+        """
+        Keep the csrf token of a page with a form.
+        """
+        if response is not None:
+            match = CSRF_PATTERN.search(response.text)
+            if match is not None:
+                self.csrf_token = match.group(1)
+
+    def login(self):
+        """
+        Log in through the home page form, returning True on success.
+        """
+        self.set_csrf_token(self.request("home", "GET", "/"))
+        response = self.request(
+            "login",
+            "POST",
+            "/",
+            data={
+                "csrf_token": self.csrf_token,
+                "login_user": USER_LOGIN,
+                "gat": self.token,
+                "hostname": self.api_url,
+                "timeout": 10,
+            },
+        )
+        return response is not None and f"/user/{USER_LOGIN}" in response.url
+
+    def run_status(self, owner):
+        """
+        Start a status scan of owner and poll its job until it ends.
+        """
+        response = self.request("status", "GET", f"/status/{owner}")
+        match = None if response is None else JOB_PATTERN.search(response.text)
+        if match is None:
+            return
+        job_id = match.group(1)
+        while True:
+            response = self.request("job", "GET", f"/job/{job_id}")
+            if response is None or response.status_code != 200:
+                return
+            if response.json()["status"] in ["done", "error", "rate_limited"]:
+                break
+            time.sleep(POLL_INTERVAL)
+        self.request("job_table", "GET", f"/job/{job_id}/table", params={"count": 100})
+
+    def visit(self, owner, repo):
+        """
+        One pass through the app.
+        """
+        self.set_csrf_token(self.request("user", "GET", f"/user/{USER_LOGIN}"))
+        self.request(
+            "search",
+            "POST",
+            f"/user/{USER_LOGIN}",
+            data={
+                "csrf_token": self.csrf_token,
+                "search_request": "repo-1",
+                "search_users": "y",
+                "search_repos": "y",
+                "ignore": "",
+                "search": "Search",
+            },
+        )
+        self.run_status(owner)
+        self.request("repo_status", "GET", f"/repo_status/{owner}/{repo}")
+        self.request(
+            "repo_table",
+            "GET",
+            f"/repo_status/{owner}/{repo}/table",
+            params={"count": 100},
+        )
+
+
+def run_client(client, owners, repos, stop_time, seed):
+    """
+    Log in then visit random owners and repos until stop_time.
+    """
+    rng = random.Random(seed)
+    if not client.login():
+        return
+    while time.time() < stop_time:
+        client.visit(rng.choice(owners), f"repo-{rng.randrange(repos)}")
+
+
+def get_report(records, elapsed):
+    """
+    Requests, errors, throughput and latency percentiles (ms) per route and in total.
+    """
+    by_route = defaultdict(list)
+    for route, seconds, ok in records:
+        by_route[route].append((seconds, ok))
+    by_route["total"] = [(seconds, ok) for _, seconds, ok in records]
+    report = {}
+    for route, values in by_route.items():
+        seconds = np.array([x[0] for x in values])
+        report[route] = {
+            "requests": len(values),
+            "errors": sum(not x[1] for x in values),
+            "throughput": len(values) / elapsed,
+            **{f"p{x}": float(np.percentile(seconds, x) * 1000) for x in PERCENTILES},
+        }
+    return report
+
+
+def print_report(report):
+    """
+    Print report as a table.
+    """
+    columns = ["requests", "errors", "throughput"] + [f"p{x}" for x in PERCENTILES]
+    print(f"{'route':>12}" + "".join(f"{x:>12}" for x in columns))
+    for route, row in report.items():
+        print(
+            f"{route:>12}{row['requests']:>12}{row['errors']:>12}"
+            f"{row['throughput']:>10.2f}/s"
+            + "".join(f"{row[f'p{x}']:>10.1f}ms" for x in PERCENTILES)
+        )
+
+
+def get_parser():
+    """
+    Argument parser of the load test.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--clients", type=int, default=CLIENTS)
+    parser.add_argument("--duration", type=float, default=DURATION, help="seconds")
+    parser.add_argument("--orgs", type=int, default=ORGS, help="synthetic orgs scanned")
+    parser.add_argument("--repos", type=int, default=100, help="per org")
+    parser.add_argument("--branches", type=int, default=5, help="per repo")
+    parser.add_argument(
+        "--latency", action="append", help="SECONDS or ENDPOINT=SECONDS, repeatable"
+    )
+    parser.add_argument(
+        "--error",
+        action="append",
+        dest="errors",
+        help="[ENDPOINT=]KIND:RATE, repeatable, kinds: " + ", ".join(FAKE_ERROR_KINDS),
+    )
+    parser.add_argument("--core-limit", type=int, default=FAKE_RATE_LIMITS["core"])
+    parser.add_argument(
+        "--search-limit",
+        type=int,
+        default=FAKE_RATE_LIMITS["search"],
+        help="per minute, default the GitHub limit",
+    )
+    parser.add_argument(
+        "--app-url", help="app to load, default an app served in this process"
+    )
+    parser.add_argument(
+        "--api-url", help="API stand in to log in to, default one served here"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="json file to write the report to")
+    return parser
+
+
+def main(argv=None):
+    """
+    Serve the API stand in and app unless given, run the clients and report.
+    """
+    args = get_parser().parse_args(argv)
+    orgs = [f"org-{i}" for i in range(args.orgs)]
+    servers = []
+    api_url = args.api_url
+    if api_url is None:
+        config = FakeApiConfig(
+            latency=parse_latency(args.latency),
+            errors=parse_errors(args.errors),
+            rate_limits={"core": args.core_limit, "search": args.search_limit},
+            seed=args.seed,
+        )
+        owners = get_owners(
+            [USER_LOGIN] + [f"{x}:org" for x in orgs],
+            repos=args.repos,
+            branches=args.branches,
+        )
+        servers.append(
+            start_server(FakeGitHubApi(owners, USER_LOGIN, config).create_app())
+        )
+        api_url = f"http://127.0.0.1:{servers[-1].server_port}"
+    app_url = args.app_url
+    if app_url is None:
+        # pylint: disable=import-outside-toplevel
+        from GitHubHealth import app
+
+        servers.append(start_server(app))
+        app_url = f"http://127.0.0.1:{servers[-1].server_port}"
+    print(f"{args.clients} clients on {app_url} with API {api_url}")
+    records = []
+    start = time.time()
+    threads = [
+        threading.Thread(
+            target=run_client,
+            args=(
+                LoadClient(app_url, api_url, f"load-{i}", records),
+                orgs,
+                args.repos,
+                start + args.duration,
+                args.seed + i,
+            ),
+        )
+        for i in range(args.clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    report = get_report(records, time.time() - start)
+    print_report(report)
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=2)
+    for server in servers:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
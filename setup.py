@@ -53,6 +53,10 @@ setuptools.setup(
             "gunicorn>=20.1.0",
             "anybadge>=1.8.0",
         ],
+        "cli": [
+            "pyyaml>=5.4",
+            "pyarrow>=6.0.0",
+        ],
         "test": [
             "pytest>=6.2.5",
             "subx>=2020.42.0",
@@ -63,4 +67,5 @@ setuptools.setup(
     packages=setuptools.find_packages(),
     package_data={"": ["../data/pylint.svg", "templates/*", "static/css/*"]},
     include_package_data=True,
+    entry_points={"console_scripts": ["ghh-scan=GitHubHealth.cli:main"]},
 )
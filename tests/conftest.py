@@ -2,8 +2,10 @@
 Config for tests.
 """
 
+from datetime import datetime, timedelta
 import logging
 import os
+import time
 
 import pytest
 
@@ -12,12 +14,137 @@ from GitHubHealth import (
     GitHubHealth,
     ACCESS_TOKEN_VAR_NAME,
 )
+from GitHubHealth.fetch import RepoFetcher
 from GitHubHealth.main import get_connection
+from GitHubHealth.requested_object import RequestedObject
 
 logger = logging.getLogger(__name__)
 logger.setLevel("INFO")
 
 
+# pylint: disable=too-few-public-methods
+class FakeNamedObject:
+    """
+    Stand in for PyGitHub objects that only need attributes.
+    """
+
+    def __init__(self, **kwargs):
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+
+class FakeCount:
+    """
+    Stand in for PaginatedList when only totalCount is used.
+    """
+
+    def __init__(self, total_count):
+        self.totalCount = total_count  # pylint: disable=invalid-name
+
+
+class FakePaginatedList:
+    """
+    Stand in for PaginatedList counting the pages requested.
+    """
+
+    def __init__(self, items, per_page=30):
+        self.items = items
+        self.pages = []
+        self.total = None
+        self._PaginatedList__requester = FakeNamedObject(per_page=per_page)
+
+    @property
+    def totalCount(self):  # pylint: disable=invalid-name
+        """
+        Simulated total request, kept unless 0 like PaginatedList does.
+        """
+        if not self.total:
+            self.pages.append("total")
+            self.total = len(self.items)
+        return self.total
+
+    def get_page(self, page):
+        """
+        Simulated page request.
+        """
+        self.pages.append(page)
+        per_page = self._PaginatedList__requester.per_page
+        return self.items[page * per_page : (page + 1) * per_page]
+
+
+class FakeRepo:
+    """
+    Stand in for a PyGitHub Repository with no network access.
+    latency (seconds) is slept on each simulated request.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self, name, n_branches=2, issues=0, pull_requests=0, latency=0.0, owner="me"
+    ):
+        self.name = name
+        self.full_name = f"{owner}/{name}"
+        self.owner = FakeNamedObject(login=owner)
+        self.html_url = f"https://github.com/{owner}/{name}"
+        self.private = False
+        self.pushed_at = datetime(2022, 1, 1)
+        self.updated_at = datetime(2022, 1, 1)
+        self.latency = latency
+        self.requests = 0
+        self.issues = issues
+        self.pull_requests = pull_requests
+        self.branches = [
+            FakeNamedObject(
+                name=f"branch_{i}",
+                protected=i == 0,
+                commit=FakeNamedObject(
+                    commit=FakeNamedObject(
+                        author=FakeNamedObject(
+                            date=datetime.now() - timedelta(days=10 * i)
+                        )
+                    ),
+                    committer=FakeNamedObject(login=owner),
+                    html_url=f"{self.html_url}/commit/{i:040d}",
+                    sha=f"{i:040d}",
+                    last_modified="Tue, 04 Jan 2022 10:00:00 GMT",
+                ),
+            )
+            for i in range(n_branches)
+        ]
+
+    def get_branches(self):
+        """
+        Simulated branches request.
+        """
+        time.sleep(self.latency)
+        self.requests += 1
+        return self.branches
+
+    def get_issues(self):
+        """
+        Simulated issues request.
+        """
+        time.sleep(self.latency)
+        self.requests += 1
+        return FakeCount(self.issues)
+
+    def get_pulls(self):
+        """
+        Simulated pull requests request.
+        """
+        time.sleep(self.latency)
+        self.requests += 1
+        return FakeCount(self.pull_requests)
+
+    def get_languages(self):
+        """
+        Simulated languages request.
+        """
+        time.sleep(self.latency)
+        self.requests += 1
+        return {"Python": 100, "HTML": 10}
+
+
 @pytest.fixture(name="app")
 def fixture_app():
     """
@@ -35,6 +162,73 @@ def fixture_ghh():
     return ghh
 
 
+class FakeOwner:
+    """
+    Stand in for a PyGitHub NamedUser or Organization owning repos.
+    """
+
+    def __init__(self, repos, login="me"):
+        self.login = login
+        self.repos = repos
+
+    def get_repos(self):
+        """
+        Simulated repos request.
+        """
+        return list(self.repos)
+
+
+class FakeGitHubHealth:
+    """
+    Stand in for a logged in GitHubHealth object whose requested object is owner.
+    """
+
+    def __init__(self, owner, latency=0.0):
+        self.owner = owner
+        self.latency = latency
+        self.user = FakeNamedObject(
+            name=owner.login, avatar_url="", url=f"https://github.com/{owner.login}"
+        )
+        self.requested_object = None
+        self.requested_repos = None
+        self.requested_df = None
+        self.requested_table = None
+        self.repo_html = None
+        self.plots = None
+        self.plot_data = None
+
+    def get_object(self, resource_name):
+        """
+        Simulated user request.
+        """
+        time.sleep(self.latency)
+        requested_object = RequestedObject(
+            None, f"https://github.com/{resource_name}", RepoFetcher()
+        )
+        setattr(requested_object, "obj", self.owner)
+        setattr(requested_object, "name", resource_name)
+        return requested_object
+
+    get_requested_object = GitHubHealth.get_requested_object
+
+    get_requested_repos = GitHubHealth.get_requested_repos
+    get_requested_df = GitHubHealth.get_requested_df
+    get_requested_table = GitHubHealth.get_requested_table
+    render_requested_html_table = GitHubHealth.render_requested_html_table
+    get_plots = GitHubHealth.get_plots
+
+
+@pytest.fixture(name="fake_repos")
+def fixture_fake_repos():
+    """
+    Offline repos with a range of branches, issues and pull requests.
+    """
+    return [
+        FakeRepo(f"repo_{i}", n_branches=i + 1, issues=i % 2, pull_requests=i % 3)
+        for i in range(8)
+    ]
+
+
 @pytest.fixture(name="ghh_2_search_results")
 def fixture_ghh_2_search_results(ghh):
     """
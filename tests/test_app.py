@@ -2,11 +2,45 @@
 Test functions for app object.
 """
 
+import json
+import re
+import threading
+import time
 import unittest
 
 import flask
+from github.GithubException import RateLimitExceededException
+import numpy as np
 
-from conftest import app
+from GitHubHealth.app import main as app_main
+from GitHubHealth.app.jobs import JobRunner
+from GitHubHealth.fetch import RepoFetcher
+from GitHubHealth.requested_object import RequestedRepo
+
+from conftest import (
+    app,
+    FakeGitHubHealth,
+    FakeOwner,
+    FakeRepo,
+)
+
+
+def set_session(client):
+    """
+    Log client in with fake credentials.
+    """
+    with client.session_transaction() as this_session:
+        this_session["login_user"] = "me"
+        this_session["gat"] = "token"
+        this_session["hostname"] = "github.com"
+        this_session["timeout"] = 2
+
+
+def get_session_key():
+    """
+    Job owner key of the set_session credentials.
+    """
+    return app_main.get_ghh_key("me", "token", "github.com")
 
 
 # pylint: disable=redefined-outer-name
@@ -34,3 +68,233 @@ class MyAppTestCase(unittest.TestCase):
         """
         ret_val = self.app.get("/")
         assert ret_val.data[:15] == b"<!DOCTYPE html>"
+
+
+def test_ghh_cache(monkeypatch):
+    """
+    ghh objects are reused for the same credentials and dropped on logout.
+    """
+    created = []
+
+    def fake_ghh(**kwargs):
+        created.append(kwargs)
+        return kwargs
+
+    monkeypatch.setattr(app_main, "GitHubHealth", fake_ghh)
+    app_main.GHH_CACHE.clear()
+    first = app_main.get_ghh("me", "token", "github.com", 2)
+    assert app_main.get_ghh("me", "token", "github.com", 2) is first
+    app_main.get_ghh("me", "other-token", "github.com", 2)
+    assert len(created) == 2
+    with app.test_client() as client:
+        with client.session_transaction() as this_session:
+            this_session["login_user"] = "me"
+            this_session["gat"] = "token"
+            this_session["hostname"] = "github.com"
+        client.get("/logout")
+    assert len(app_main.GHH_CACHE) == 1
+    app_main.get_ghh("me", "token", "github.com", 2)
+    assert len(created) == 3
+
+
+def test_status_job(monkeypatch, tmp_path, fake_repos):
+    """
+    Status page returns at once and the scan result is served when the job is done.
+    """
+    ghh = FakeGitHubHealth(FakeOwner(fake_repos), latency=0.5)
+    monkeypatch.setattr(app_main, "get_ghh", lambda *args: ghh)
+    monkeypatch.setattr(app_main, "SNAPSHOT_DIR", str(tmp_path))
+    monkeypatch.setattr(app_main, "JOB_RUNNER", JobRunner(max_workers=2))
+    app_main.SNAPSHOT_STORES.clear()
+    with app.test_client() as client:
+        with client.session_transaction() as this_session:
+            this_session["login_user"] = "me"
+            this_session["gat"] = "token"
+            this_session["hostname"] = "github.com"
+            this_session["timeout"] = 2
+        start = time.time()
+        ret_val = client.get("/status/me")
+        assert time.time() - start < 0.5
+        assert b"loadingimage.gif" in ret_val.data
+        assert b'showLastKnown(\n                    "/history/me"' in ret_val.data
+        assert client.get("/history/me").get_json()["latest"] == []
+        job_id = re.search(r"/job/([0-9a-f]{32})", ret_val.data.decode()).group(1)
+        assert job_id in client.get("/status/me").data.decode()
+        assert client.get("/job/unknown").status_code == 404
+        progress = client.get(f"/job/{job_id}").get_json()
+        while progress["status"] not in ["done", "error"]:
+            time.sleep(0.05)
+            progress = client.get(f"/job/{job_id}").get_json()
+        assert progress["status"] == "done"
+        events = client.get(f"/job/{job_id}/stream").data.decode().split("\n\n")
+        assert sum(x.startswith("event: row") for x in events) == len(fake_repos)
+        assert events[-2].startswith("event: done")
+        ret_val = client.get(progress["result_url"])
+        assert b"requested-obj-metadata" in ret_val.data
+        page = client.get(
+            f"/job/{job_id}/table?start=0&count=3&sort=branch count&order=desc"
+        ).get_json()
+        assert page["total"] == len(fake_repos)
+        assert len(page["rows"]) == 3
+        assert "repo_7" in page["rows"][0][0][0]
+        assert client.get(f"/job/{job_id}/table?sort=nope").status_code == 400
+        history = client.get("/history/me").get_json()
+        assert len(history["latest"]) == len(fake_repos)
+        assert {x["repo"] for x in history["latest"]} == {x.name for x in fake_repos}
+        assert [x["repos"] for x in history["trend"]] == [len(fake_repos)]
+    with app.test_client() as client:
+        assert client.get(f"/job/{job_id}").status_code == 404
+
+
+def test_status_jobs_of_one_login_run_together(monkeypatch, tmp_path, fake_repos):
+    """
+    Status scans of one login do not wait for each other or change the shared ghh.
+    """
+    ghh = FakeGitHubHealth(FakeOwner(fake_repos), latency=0.5)
+    runner = JobRunner(max_workers=2)
+    monkeypatch.setattr(app_main, "SNAPSHOT_DIR", str(tmp_path))
+    app_main.SNAPSHOT_STORES.clear()
+    store = app_main.get_snapshot_store("me", "github.com")
+    start = time.time()
+    jobs = [
+        runner.submit(
+            "me", name, app_main.STATUS_STEPS, app_main.run_status_job, ghh, name, store
+        )
+        for name in ["first", "second"]
+    ]
+    while not all(job.done for job in jobs):
+        time.sleep(0.05)
+    assert time.time() - start < 0.95
+    assert [job.status for job in jobs] == ["done", "done"]
+    assert [job.result["requested_object"].name for job in jobs] == ["first", "second"]
+    assert ghh.requested_object is None
+
+
+def test_snapshot_stores(monkeypatch, tmp_path):
+    """
+    Snapshot stores keep SNAPSHOT_MAX snapshots and are closed when evicted.
+    """
+    monkeypatch.setattr(app_main, "SNAPSHOT_DIR", str(tmp_path))
+    app_main.SNAPSHOT_STORES.clear()
+    store = app_main.get_snapshot_store("me", "github.com")
+    assert app_main.get_snapshot_store("me", "github.com") is store
+    assert store.max_snapshots == app_main.SNAPSHOT_MAX
+    assert store.con is not None
+    app_main.SNAPSHOT_STORES.clear()
+    assert store.con is None
+
+
+def test_repo_table(monkeypatch):
+    """
+    Branch table of a repo is served a page at a time and kept between requests.
+    """
+    repo = FakeRepo("big", n_branches=250)
+    ghh = FakeGitHubHealth(FakeOwner([repo]))
+    fetched = []
+
+    def get_repo(repo_owner, repo_name):
+        fetched.append((repo_owner, repo_name))
+        return RequestedRepo(repo, repo.html_url, RepoFetcher())
+
+    setattr(ghh, "get_repo", get_repo)
+    monkeypatch.setattr(app_main, "get_ghh", lambda *args: ghh)
+    app_main.REPO_TABLES.clear()
+    with app.test_client() as client:
+        with client.session_transaction() as this_session:
+            this_session["login_user"] = "me"
+            this_session["gat"] = "token"
+            this_session["hostname"] = "github.com"
+            this_session["timeout"] = 2
+        page = client.get("/repo_status/me/big/table?start=200").get_json()
+        assert page["total"] == 250
+        assert len(page["rows"]) == 50
+        page = client.get(
+            "/repo_status/me/big/table?search=branch_24&count=5"
+        ).get_json()
+        assert page["filtered"] == 11
+        assert len(page["rows"]) == 5
+    assert fetched == [("me", "big")]
+
+
+def test_job_stream_live(monkeypatch):
+    """
+    Rows are streamed while the job is still running.
+    """
+    runner = JobRunner(max_workers=1)
+    release = threading.Event()
+
+    def run(job):
+        job.set_step("details")
+        job.add_row({"repo": "first", "score": np.float64(0.5), "issues": np.nan})
+        release.wait(5)
+        job.add_row({"repo": "second", "score": 1.0, "issues": 1})
+        return {}
+
+    job = runner.submit("owner", "name", ["details"], run)
+    monkeypatch.setattr(app_main, "STREAM_HEARTBEAT", 0.05)
+    events = app_main.iter_job_events(job, "/result")
+    first = next(events)
+    while not first.startswith("event: row"):
+        first = next(events)
+    assert json.loads(first.split("data: ")[1]) == {
+        "repo": "first",
+        "score": 0.5,
+        "issues": None,
+    }
+    assert not job.done
+    release.set()
+    rest = list(events)
+    assert rest[-1].startswith("event: done")
+    assert '"second"' in "".join(rest)
+
+
+def test_status_job_rate_limited(monkeypatch):
+    """
+    Job stopped by a rate limit keeps its rows and its page offers a retry.
+    """
+    runner = JobRunner(max_workers=1)
+
+    def run(job):
+        job.set_step("details")
+        job.add_row({"repo": "first", "score": 0.5})
+        raise RateLimitExceededException(
+            403, {"message": "API rate limit exceeded"}, {"retry-after": "42"}
+        )
+
+    job = runner.submit(get_session_key(), "me", ["details"], run)
+    while not job.done:
+        time.sleep(0.05)
+    assert job.status == "rate_limited"
+    assert job.get_progress()["retry_after"] == 42
+    monkeypatch.setattr(app_main, "JOB_RUNNER", runner)
+    ghh = FakeGitHubHealth(FakeOwner([]))
+    monkeypatch.setattr(app_main, "get_ghh", lambda *args: ghh)
+    with app.test_client() as client:
+        set_session(client)
+        page = client.get(f"/job/{job.job_id}/result").data.decode()
+        assert "retry in about 42s" in page
+        assert "the 1 repos fetched so far" in page
+        assert '"repo": "first"' in page
+
+
+def test_rate_limited_page(monkeypatch):
+    """
+    Rate limited page views keep the session and say when to retry.
+    """
+
+    def get_repo(*_):
+        raise RateLimitExceededException(
+            403, {"message": "API rate limit exceeded"}, {"retry-after": "30"}
+        )
+
+    ghh = FakeGitHubHealth(FakeOwner([]))
+    setattr(ghh, "get_repo", get_repo)
+    monkeypatch.setattr(app_main, "get_ghh", lambda *args: ghh)
+    with app.test_client() as client:
+        set_session(client)
+        ret_val = client.get("/repo_status/me/big")
+        assert ret_val.status_code == 429
+        assert ret_val.headers["Retry-After"] == "30"
+        assert b"retry in about 30s" in ret_val.data
+        with client.session_transaction() as this_session:
+            assert this_session["gat"] == "token"
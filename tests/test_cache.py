@@ -0,0 +1,74 @@
+"""
+Test in process TTL cache.
+"""
+
+import time
+
+import pytest
+
+from GitHubHealth.cache import TTLCache
+
+
+def test_lru_eviction():
+    """
+    Least recently used entry is evicted above maxsize.
+    """
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert len(cache) == 2
+
+
+def test_ttl_expiry():
+    """
+    Entries expire after ttl.
+    """
+    cache = TTLCache(maxsize=2, ttl=0.05)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_pop_and_clear():
+    """
+    Entries can be invalidated.
+    """
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.pop("a") == 1
+    assert cache.pop("a") is None
+    cache.clear()
+    assert len(cache) == 0
+    with pytest.raises(ValueError):
+        TTLCache(maxsize=0)
+
+
+def test_on_evict():
+    """
+    on_evict is called for entries dropped by size, expiry, replacement and clear.
+    """
+    evicted = []
+    cache = TTLCache(maxsize=2, on_evict=lambda key, value: evicted.append(key))
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    cache.set("c", 4)
+    cache.set("c", 4)
+    assert cache.pop("b") == 2
+    cache.clear()
+    assert evicted == ["a", "c", "c"]
+    evicted.clear()
+    cache = TTLCache(
+        maxsize=2, ttl=0.05, on_evict=lambda key, value: evicted.append(key)
+    )
+    cache.set("a", 1)
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert evicted == ["a"]
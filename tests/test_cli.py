@@ -0,0 +1,153 @@
+"""
+Test batch scans from the command line.
+"""
+
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from GitHubHealth import cli
+from GitHubHealth.fetch import RepoFetcher
+from GitHubHealth.requested_object import RequestedObject
+from GitHubHealth.utils import (
+    REPOS_DF_DTYPES,
+    get_repos_builder,
+)
+
+from conftest import (
+    FakeOwner,
+    FakeRepo,
+)
+
+
+class FakeScanner:
+    """
+    Stand in for the GitHubHealth object of a scan, owners not in owners are missing.
+    """
+
+    def __init__(self, owners):
+        self.owners = owners
+        self.fetcher = RepoFetcher(max_workers=2)
+        self.scanned = []
+
+    def get_object(self, resource_name):
+        """
+        Simulated user request.
+        """
+        self.scanned.append(resource_name)
+        requested_object = RequestedObject(
+            None, f"https://github.com/{resource_name}", self.fetcher
+        )
+        setattr(requested_object, "obj", self.owners.get(resource_name))
+        return requested_object
+
+
+@pytest.fixture(name="scanner")
+def fixture_scanner(monkeypatch):
+    """
+    Scanner of two offline owners, used by every cli.main call.
+    """
+    scanner = FakeScanner(
+        {
+            f"org_{i}": FakeOwner(
+                [FakeRepo(f"repo_{i}_{j}", n_branches=j + 1) for j in range(3)],
+                login=f"org_{i}",
+            )
+            for i in range(2)
+        }
+    )
+    monkeypatch.setattr(cli, "get_ghh", lambda args, hostname: scanner)
+    return scanner
+
+
+@pytest.mark.parametrize("output_format", ["csv", "jsonl"])
+def test_scan(scanner, tmp_path, output_format):
+    """
+    Repos and branches of all owners are written per owner and combined.
+    """
+    argv = ["org_0", "org_1", "-o", str(tmp_path), "--format", output_format]
+    assert cli.main(argv + ["--branches"]) == 0
+    assert sorted(scanner.scanned) == ["org_0", "org_1"]
+    repo_df = cli.read_df(tmp_path / f"repos.{output_format}", output_format)
+    assert len(repo_df) == 6
+    assert sorted(repo_df["owner"].unique()) == ["org_0", "org_1"]
+    branch_df = cli.read_df(tmp_path / f"branches.{output_format}", output_format)
+    assert len(branch_df) == 2 * (1 + 2 + 3)
+    assert set(branch_df["repo"]) == set(repo_df["repo"])
+    # branches come from the requests made for the repo details, not a second pass
+    for owner in scanner.owners.values():
+        assert [repo.requests for repo in owner.repos] == [4, 4, 4]
+    assert os.path.exists(cli.get_owner_path(tmp_path, "org_0", "repos", output_format))
+
+
+def test_resume(scanner, tmp_path):
+    """
+    Failed owners are recorded and retried on resume, finished owners are skipped.
+    """
+    owners_file = tmp_path / "owners.yaml"
+    owners_file.write_text("owners:\n  - org_0\n  - missing\n", encoding="utf-8")
+    argv = ["-f", str(owners_file), "-o", str(tmp_path), "--format", "csv"]
+    assert cli.main(argv) == 1
+    with open(tmp_path / cli.MANIFEST_NAME, "r", encoding="utf-8") as manifest_file:
+        owners = json.load(manifest_file)["owners"]
+    assert owners["org_0"]["status"] == "done"
+    assert owners["missing"]["status"] == "error"
+    scanner.scanned = []
+    assert cli.main(argv + ["org_1", "--resume"]) == 1
+    assert sorted(scanner.scanned) == ["missing", "org_1"]
+    assert len(pd.read_csv(tmp_path / "repos.csv")) == 6
+    with pytest.raises(SystemExit):
+        cli.main(argv + ["--resume", "--branches"])
+
+
+def test_no_owners(tmp_path):
+    """
+    Owners are required.
+    """
+    with pytest.raises(SystemExit):
+        cli.main(["-o", str(tmp_path), "--format", "csv"])
+
+
+@pytest.mark.parametrize("output_format", ["csv", "jsonl"])
+def test_read_df_dtypes(tmp_path, output_format):
+    """
+    Repo dtypes survive a write and read, including missing counts.
+    """
+    repo_df = get_repos_builder(
+        {
+            "repo": f"repo_{i}",
+            "repo_url": f"https://github.com/me/repo_{i}",
+            "private": False,
+            "branch count": 1,
+            "min branch age (days)": 1.0,
+            "max branch age (days)": 1.0,
+            "issues": None if i == 0 else i,
+            "pull requests": i,
+            "primary language": "Python",
+            "score": 10.0,
+        }
+        for i in range(2)
+    ).to_df()
+    path = tmp_path / f"repos.{output_format}"
+    cli.write_df(repo_df, path, output_format)
+    read_df = cli.read_df(path, output_format, cli.FRAME_DTYPES["repos"])
+    assert read_df.dtypes[list(REPOS_DF_DTYPES)].equals(
+        repo_df.dtypes[list(REPOS_DF_DTYPES)]
+    )
+    assert read_df["issues"].isna().tolist() == [True, False]
+
+
+def test_owner_path():
+    """
+    Owner files stay in the owners dir whatever the owner is called.
+    """
+    assert cli.get_owner_path("out", "org_0", "repos", "csv") == os.path.join(
+        "out", cli.OWNERS_DIR_NAME, "org_0.repos.csv"
+    )
+    for owner in ["../../etc/x", "a/b", "..", ""]:
+        path = cli.get_owner_path("out", owner, "repos", "csv")
+        assert os.path.dirname(path) == os.path.join("out", cli.OWNERS_DIR_NAME)
+        assert ".." not in os.path.basename(path)
+    assert cli.get_owner_slug("a/b") != cli.get_owner_slug("a_b")
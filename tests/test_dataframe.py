@@ -6,10 +6,14 @@ from GitHubHealth.utils import (
     BRANCH_DF_COLUMNS,
     REPOS_DF_COLUMNS,
     SEARCH_DF_COLUMNS,
+    FrameBuilder,
     get_branch_df,
+    get_repo_details,
 )
 from GitHubHealth.requested_object import SearchResults
 
+from conftest import FakeRepo
+
 
 def test_repo_df_columns(ghh):
     """
@@ -58,3 +62,47 @@ def test_search_df_columns(ghh):
     assert len(SEARCH_DF_COLUMNS) == len(search_results.table_df.columns)
     for column in SEARCH_DF_COLUMNS:
         assert column in search_results.table_df.columns
+
+
+def test_frame_builder():
+    """
+    Records are accumulated and typed once.
+    """
+    builder = FrameBuilder(["a", "b"], {"a": "int64"})
+    builder.append({"a": 1, "b": "x"})
+    builder.extend([{"a": 2, "b": "y"}, {"a": 3, "b": "z"}])
+    assert len(builder) == 3
+    this_df = builder.to_df()
+    assert list(this_df.columns) == ["a", "b"]
+    assert str(this_df["a"].dtype) == "int64"
+    assert len(FrameBuilder(["a"]).to_df()) == 0
+
+
+def test_offline_branch_df():
+    """
+    Branch df built from records has expected columns and types.
+    """
+    branch_df = get_branch_df(FakeRepo("test", n_branches=3))
+    assert list(branch_df.columns) == BRANCH_DF_COLUMNS
+    assert len(branch_df) == 3
+    assert branch_df["protected"].dtype == bool
+    assert list(get_branch_df(FakeRepo("empty", n_branches=0)).columns) == (
+        BRANCH_DF_COLUMNS
+    )
+
+
+def test_offline_repo_details():
+    """
+    Repo details are consistent across output types.
+    """
+    repo = FakeRepo("test", n_branches=3, issues=2)
+    record = get_repo_details(repo, output="record")
+    repo_dict = get_repo_details(repo, output="dict")
+    repo_df = get_repo_details(repo, output="df")
+    assert list(repo_df.columns) == REPOS_DF_COLUMNS
+    assert record["branch count"] == 3
+    assert record["max branch age (days)"] > record["min branch age (days)"]
+    assert repo_dict["issues"] == [2]
+    assert repo_df.loc[0, "score"] == record["score"]
+    empty_record = get_repo_details(FakeRepo("empty", n_branches=0), output="record")
+    assert empty_record["branch count"] == 0
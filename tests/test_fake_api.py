@@ -0,0 +1,132 @@
+"""
+Test the local GitHub API stand in.
+"""
+
+import pytest
+
+from GitHubHealth import GitHubHealth
+from GitHubHealth.fake_api import (
+    FAKE_API_PREFIX,
+    FakeApiConfig,
+    FakeGitHubApi,
+    get_owners,
+    parse_errors,
+    parse_latency,
+    start_server,
+)
+from GitHubHealth.fetch import RepoFetcher
+from GitHubHealth.requested_object import (
+    get_base_url,
+    get_public_url,
+)
+from GitHubHealth.synthetic import SyntheticOwner
+
+HEADERS = {"Authorization": "token test"}
+
+
+def get_client(config=None):
+    """
+    Test client of a stand in with user me and org acme.
+    """
+    owners = get_owners(["me", "acme:org"], repos=12, branches=2)
+    return FakeGitHubApi(owners, config=config).create_app().test_client()
+
+
+def test_pages():
+    """
+    Lists are paginated with GitHub Link headers, rate limit headers and ETags.
+    """
+    client = get_client()
+    response = client.get(
+        f"{FAKE_API_PREFIX}/users/acme/repos?per_page=5", headers=HEADERS
+    )
+    assert response.status_code == 200
+    assert [x["name"] for x in response.json] == [f"repo-{i}" for i in range(5)]
+    assert 'per_page=5&page=3>; rel="last"' in response.headers["Link"]
+    assert response.headers["X-RateLimit-Remaining"] == "4999"
+    response = client.get(
+        f"{FAKE_API_PREFIX}/users/acme/repos?per_page=5",
+        headers={**HEADERS, "If-None-Match": response.headers["ETag"]},
+    )
+    assert response.status_code == 304
+    assert response.headers["X-RateLimit-Remaining"] == "4999"
+    response = client.get(
+        f"{FAKE_API_PREFIX}/search/users?q=acme+type:org", headers=HEADERS
+    )
+    assert response.json["total_count"] == 1
+    assert response.headers["X-RateLimit-Resource"] == "search"
+    assert (
+        client.get(f"{FAKE_API_PREFIX}/users/nobody", headers=HEADERS).status_code
+        == 404
+    )
+
+
+def test_injected_errors():
+    """
+    Injected errors and spent quotas are answered as GitHub would.
+    """
+    client = get_client(
+        FakeApiConfig(
+            errors=parse_errors(["branches=secondary:1", "languages=server:1"]),
+            rate_limits={"core": 3},
+        )
+    )
+    response = client.get(
+        f"{FAKE_API_PREFIX}/repos/me/repo-0/branches", headers=HEADERS
+    )
+    assert response.status_code == 403
+    assert "secondary rate limit" in response.json["message"]
+    assert response.headers["Retry-After"] == "1"
+    response = client.get(
+        f"{FAKE_API_PREFIX}/repos/me/repo-0/languages", headers=HEADERS
+    )
+    assert response.status_code == 502
+    for _ in range(3):
+        response = client.get(f"{FAKE_API_PREFIX}/repos/me/repo-0", headers=HEADERS)
+    assert response.status_code == 200
+    response = client.get(f"{FAKE_API_PREFIX}/repos/me/repo-0", headers=HEADERS)
+    assert response.status_code == 403
+    assert response.headers["X-RateLimit-Remaining"] == "0"
+    response = client.get(
+        f"{FAKE_API_PREFIX}/repos/me/repo-0", headers={"Authorization": "token other"}
+    )
+    assert response.status_code == 200
+    with pytest.raises(ValueError):
+        FakeApiConfig(errors={"branches": {"flaky": 0.1}})
+    with pytest.raises(ValueError):
+        FakeApiConfig(latency=parse_latency(["nowhere=0.1"]))
+    assert parse_latency(["0.5", "search=2"]) == {"*": 0.5, "search": 2.0}
+
+
+def test_hostname_url():
+    """
+    hostname may be a url with scheme.
+    """
+    assert get_base_url(None) == "https://api.github.com"
+    assert get_base_url("github.com") == "https://api.github.com"
+    assert get_base_url("git.example.com") == "https://git.example.com/api/v3"
+    assert get_base_url("http://localhost:5001/") == "http://localhost:5001/api/v3"
+    assert get_public_url("http://localhost:5001") == "http://localhost:5001/"
+
+
+def test_ghh_fake_api():
+    """
+    GitHubHealth reads the same repo df from the stand in as from the owner data.
+    """
+    owners = get_owners(["me", "acme:org"], repos=12, branches=3)
+    server = start_server(FakeGitHubApi(owners).create_app())
+    url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        ghh = GitHubHealth(hostname=url, gat="test", timeout=5)
+        assert ghh.username == "me"
+        requested_object = ghh.get_object("acme")
+        requested_object.get_repo_df()
+        repo_df = requested_object.repo_df
+        assert repo_df["repo_url"].str.startswith(f"{url}/acme/").all()
+        offline_df = RepoFetcher().get_repo_df(SyntheticOwner(owners[1]).get_repos())
+        assert repo_df.drop("repo_url", axis=1).equals(
+            offline_df.drop("repo_url", axis=1)
+        )
+        assert ghh.get_object("nobody").obj is None
+    finally:
+        server.shutdown()
@@ -0,0 +1,84 @@
+"""
+Test concurrent fetching of repo details.
+"""
+
+import threading
+import time
+
+import pytest
+from github.Requester import HTTPSRequestsConnectionClass
+
+from GitHubHealth.fetch import RepoFetcher
+from GitHubHealth.transport import thread_safe_connection_class
+
+from conftest import FakeRepo
+
+
+def test_concurrent_matches_serial(fake_repos):
+    """
+    Concurrent and serial fetching produce the same repo df.
+    """
+    serial_df = RepoFetcher(max_workers=1).get_repo_df(fake_repos)
+    concurrent_df = RepoFetcher(max_workers=4).get_repo_df(fake_repos)
+    assert len(serial_df) == len(fake_repos)
+    assert serial_df.equals(concurrent_df)
+    assert list(serial_df["repo"]) == sorted(repo.name for repo in fake_repos)
+
+
+def test_concurrent_overlaps_latency():
+    """
+    Latency of repo requests is overlapped across workers.
+    """
+    repos = [FakeRepo(f"repo_{i}", latency=0.05) for i in range(8)]
+    start = time.perf_counter()
+    RepoFetcher(max_workers=8).get_repo_df(repos)
+    elapsed = time.perf_counter() - start
+    # 4 requests per repo, serially this would take 8 * 4 * 0.05 = 1.6s
+    assert elapsed < 0.8
+
+
+def test_records_streamed(fake_repos):
+    """
+    Records are passed to the callback as soon as each repo is fetched.
+    """
+    repos = [FakeRepo("slow", latency=0.2)] + fake_repos
+    streamed = []
+    repo_df = RepoFetcher(max_workers=4).get_repo_df(repos, callback=streamed.append)
+    assert sorted(x["repo"] for x in streamed) == sorted(repo_df["repo"])
+    assert streamed[-1]["repo"] == "slow"
+    serial = list(RepoFetcher(max_workers=1).iter_repo_records(fake_repos))
+    assert [x["repo"] for x in serial] == [repo.name for repo in fake_repos]
+
+
+def test_invalid_workers():
+    """
+    At least one worker is needed.
+    """
+    with pytest.raises(ValueError):
+        RepoFetcher(max_workers=0)
+
+
+class FakeSession:
+    """
+    Record urls requested through the connection.
+    """
+
+    def get(self, url, **kwargs):
+        """
+        Return a requests-like response echoing the url.
+        """
+        _ = kwargs
+        return type("Response", (), {"status_code": 200, "headers": {}, "text": url})
+
+
+def test_thread_safe_connection():
+    """
+    Pending requests from different threads do not overwrite each other.
+    """
+    cnx = thread_safe_connection_class(HTTPSRequestsConnectionClass)("api.github.com")
+    cnx.session = FakeSession()
+    cnx.request("GET", "/main", None, {})
+    other = threading.Thread(target=cnx.request, args=("GET", "/other", None, {}))
+    other.start()
+    other.join()
+    assert cnx.getresponse().read().endswith("/main")
@@ -0,0 +1,188 @@
+"""
+Test GraphQL fetch backend against a local stand-in for the GraphQL endpoint.
+"""
+
+import pytest
+from github.GithubException import (
+    GithubException,
+    UnknownObjectException,
+)
+
+from GitHubHealth.fetch import RepoFetcher
+from GitHubHealth.graphql_backend import (
+    GraphQLClient,
+    GraphQLFetcher,
+    get_graphql_url,
+)
+from GitHubHealth.utils import BRANCH_DF_COLUMNS
+
+from conftest import FakeRepo
+
+
+def get_ref_node(branch):
+    """
+    Format FakeRepo branch as GraphQL ref node.
+    """
+    commit = branch.commit
+    return {
+        "name": branch.name,
+        "branchProtectionRule": {"id": "rule"} if branch.protected else None,
+        "target": {
+            "oid": commit.sha,
+            "url": commit.html_url,
+            "committedDate": commit.commit.author.date.isoformat() + "Z",
+            "author": {"date": commit.commit.author.date.isoformat() + "Z"},
+            "committer": {"user": {"login": commit.committer.login}},
+        },
+    }
+
+
+class FakeResponse:
+    """
+    requests-like response.
+    """
+
+    def __init__(self, output, status_code=200):
+        self.output = output
+        self.status_code = status_code
+        self.headers = {}
+
+    def json(self):
+        """
+        Response body.
+        """
+        return self.output
+
+
+class FakeGraphQLSession:
+    """
+    Answer GraphQL queries from FakeRepo objects, serving refs page_size at a time.
+    """
+
+    def __init__(self, repos, page_size=2):
+        self.repos = {repo.name: repo for repo in repos}
+        self.page_size = page_size
+        self.queries = 0
+
+    def get_refs(self, repo, cursor=None):
+        """
+        One page of refs starting after cursor.
+        """
+        start = 0 if cursor is None else int(cursor)
+        end = start + self.page_size
+        return {
+            "pageInfo": {
+                "hasNextPage": end < len(repo.branches),
+                "endCursor": str(end),
+            },
+            "nodes": [get_ref_node(x) for x in repo.branches[start:end]],
+        }
+
+    def post(self, url, json, headers, timeout):
+        """
+        Serve repos batch or branches page query.
+        """
+        _ = url, headers, timeout
+        self.queries += 1
+        variables = json["variables"]
+        if "cursor" in variables:
+            repo = self.repos[variables["name"]]
+            refs = self.get_refs(repo, variables["cursor"])
+            return FakeResponse({"data": {"repository": {"refs": refs}}})
+        data = {}
+        errors = []
+        i = 0
+        while f"name{i}" in variables:
+            repo = self.repos.get(variables[f"name{i}"])
+            if repo is None:
+                # GitHub resolves the alias of a missing repo to null with an error
+                data[f"r{i}"] = None
+                errors.append({"type": "NOT_FOUND", "path": [f"r{i}"], "message": "x"})
+                i += 1
+                continue
+            data[f"r{i}"] = {
+                "name": repo.name,
+                "url": repo.html_url,
+                "isPrivate": repo.private,
+                # REST issues count includes pull requests, GraphQL does not
+                "issues": {"totalCount": repo.issues - repo.pull_requests},
+                "pullRequests": {"totalCount": repo.pull_requests},
+                "languages": {"nodes": [{"name": "Python"}]},
+                "refs": self.get_refs(repo),
+            }
+            i += 1
+        if errors:
+            return FakeResponse({"data": data, "errors": errors})
+        return FakeResponse({"data": data})
+
+
+def test_graphql_url():
+    """
+    GraphQL endpoint is derived from REST base url.
+    """
+    assert get_graphql_url("https://api.github.com") == "https://api.github.com/graphql"
+    assert get_graphql_url("https://ghe.co/api/v3") == "https://ghe.co/api/graphql"
+
+
+def test_graphql_matches_rest():
+    """
+    GraphQL backend feeds the same repo df as REST in far fewer requests.
+    """
+    fake_repos = [
+        FakeRepo(f"repo_{i}", n_branches=i, issues=i, pull_requests=i // 2)
+        for i in range(8)
+    ]
+    session = FakeGraphQLSession(fake_repos)
+    client = GraphQLClient("https://api.github.com", "token", session=session)
+    branches = {}
+    graphql_df = GraphQLFetcher(client, repos_per_query=5).get_repo_df(
+        fake_repos, branch_callback=branches.__setitem__
+    )
+    rest_df = RepoFetcher(max_workers=1).get_repo_df(fake_repos)
+    assert graphql_df.equals(rest_df)
+    assert {x: len(y) for x, y in branches.items()} == {
+        x.name: len(x.branches) for x in fake_repos
+    }
+    # 2 batches plus follow up pages for repos with more than 2 branches
+    assert session.queries == 2 + sum(
+        max(len(x.branches) - 1, 0) // 2 for x in fake_repos
+    )
+
+
+def test_graphql_branch_df(fake_repos):
+    """
+    Branch df from GraphQL has all branches and expected columns.
+    """
+    session = FakeGraphQLSession(fake_repos)
+    client = GraphQLClient("https://api.github.com", "token", session=session)
+    branch_df = GraphQLFetcher(client).get_branch_df(fake_repos[-1])
+    assert list(branch_df.columns) == BRANCH_DF_COLUMNS
+    assert len(branch_df) == len(fake_repos[-1].branches)
+
+
+def test_graphql_errors():
+    """
+    GraphQL errors are raised as GithubException.
+    """
+    session = type(
+        "ErrorSession",
+        (),
+        {"post": lambda *args, **kwargs: FakeResponse({"errors": [{"message": "x"}]})},
+    )()
+    client = GraphQLClient("https://api.github.com", "token", session=session)
+    with pytest.raises(GithubException):
+        client.query("query { viewer { login } }")
+
+
+def test_graphql_missing_repo(fake_repos):
+    """
+    A repo resolving to null only drops that repo from its batch.
+    """
+    session = FakeGraphQLSession(fake_repos)
+    client = GraphQLClient("https://api.github.com", "token", session=session)
+    fetcher = GraphQLFetcher(client, repos_per_query=20)
+    missing = FakeRepo("deleted")
+    repo_df = fetcher.get_repo_df(fake_repos[:3] + [missing] + fake_repos[3:])
+    assert list(repo_df["repo"]) == sorted(x.name for x in fake_repos)
+    with pytest.raises(UnknownObjectException):
+        fetcher.get_branch_df(missing)
@@ -0,0 +1,92 @@
+"""
+Test vectorized health scoring.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from GitHubHealth.fetch import RepoFetcher
+from GitHubHealth.health import (
+    DEFAULT_HEALTH_CONFIG,
+    DEFAULT_HEALTH_POLICY,
+    HealthPolicy,
+    HealthRule,
+)
+from GitHubHealth.utils import get_health
+
+
+def test_matches_record_scores(fake_repos):
+    """
+    Vectorized scores equal the scores of each record.
+    """
+    repo_df = RepoFetcher().get_repo_df(fake_repos)
+    scores = DEFAULT_HEALTH_POLICY.score(repo_df)
+    assert np.allclose(scores, repo_df["score"])
+    assert DEFAULT_HEALTH_POLICY.score_summary(repo_df) == pytest.approx(
+        get_health(repo_df.drop(columns="score").to_dict(orient="list"))
+    )
+
+
+def test_missing_values():
+    """
+    Missing values never match a rule.
+    """
+    repo_df = pd.DataFrame(
+        {
+            "branch count": [0, 5],
+            "min branch age (days)": [np.nan, 100.0],
+            "issues": pd.array([pd.NA, 1], dtype="Int64"),
+            "pull requests": pd.array([0, 1], dtype="Int64"),
+        }
+    )
+    assert list(DEFAULT_HEALTH_POLICY.score(repo_df)) == [10.0, 0.0]
+
+
+def test_config_policy(fake_repos):
+    """
+    Policies come from config dicts and rescore without refetching.
+    """
+    assert HealthPolicy.from_dict(DEFAULT_HEALTH_CONFIG).to_dict() == (
+        DEFAULT_HEALTH_CONFIG
+    )
+    with pytest.raises(ValueError):
+        HealthRule("issues", "~", 1)
+    policy = HealthPolicy.from_dict(
+        {
+            "max_score": 5,
+            "rules": [
+                {"column": "branch count", "operator": ">", "threshold": 4, "weight": 1}
+            ],
+        }
+    )
+    fetcher = RepoFetcher(policy=policy)
+    repo_df = fetcher.get_repo_df(fake_repos)
+    assert list(repo_df["score"]) == [5.0] * 4 + [4.0] * 4
+    requests = sum(repo.requests for repo in fake_repos)
+    rescored_df = DEFAULT_HEALTH_POLICY.rescore(repo_df)
+    assert sum(repo.requests for repo in fake_repos) == requests
+    assert rescored_df.drop(columns="score").equals(repo_df.drop(columns="score"))
+    assert rescored_df["score"].max() <= 10.0
+
+
+def test_rescore_speed():
+    """
+    Many repos are rescored in one pass.
+    """
+    size = 50000
+    rng = np.random.default_rng(0)
+    repo_df = pd.DataFrame(
+        {
+            "branch count": rng.integers(0, 10, size),
+            "min branch age (days)": rng.uniform(0, 200, size),
+            "issues": rng.integers(0, 3, size),
+            "pull requests": rng.integers(0, 3, size),
+        }
+    )
+    start = time.perf_counter()
+    scores = DEFAULT_HEALTH_POLICY.score(repo_df)
+    assert time.perf_counter() - start < 0.5
+    assert len(scores) == size
@@ -0,0 +1,140 @@
+"""
+Test ETag aware response caching.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import stat
+import threading
+
+import pytest
+import requests
+
+from GitHubHealth.http_cache import (
+    CACHE_DIR_MODE,
+    CACHE_FILE_MODE,
+    DiskResponseCache,
+    MemoryResponseCache,
+)
+from GitHubHealth.transport import GitHubAdapter
+
+
+def get_entry(body):
+    """
+    Cache entry with given body.
+    """
+    return {"etag": '"abc"', "last_modified": None, "headers": {}, "body": body}
+
+
+class ETagHandler(BaseHTTPRequestHandler):
+    """
+    Serve a fixed body with an ETag, replying 304 when it matches.
+    """
+
+    hits = []
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        Record request and reply.
+        """
+        self.hits.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("ETag", '"v1"')
+            self.send_header("X-RateLimit-Remaining", "4999")
+            self.end_headers()
+            return
+        body = b'{"login": "me"}'
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-RateLimit-Remaining", "5000")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        """
+        Keep test output quiet.
+        """
+
+
+@pytest.fixture(name="etag_server")
+def fixture_etag_server():
+    """
+    Local server that supports conditional requests.
+    """
+    ETagHandler.hits = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ETagHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_memory_cache_lru():
+    """
+    Least recently used entry is evicted above size cap.
+    """
+    cache = MemoryResponseCache(max_size=20)
+    cache.set("a", get_entry(b"x" * 8))
+    cache.set("b", get_entry(b"x" * 8))
+    assert cache.get("a") is not None
+    cache.set("c", get_entry(b"x" * 8))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert len(cache) == 2
+
+
+def test_disk_cache_persists(tmp_path):
+    """
+    Entries survive a new cache object and are evicted by LRU.
+    """
+    cache = DiskResponseCache(str(tmp_path), max_size=20)
+    cache.set("a", get_entry(b"x" * 8))
+    cache.set("b", get_entry(b"x" * 8))
+    assert cache.get("a")["body"] == b"x" * 8
+    cache.set("c", get_entry(b"x" * 8))
+    reopened = DiskResponseCache(str(tmp_path), max_size=20)
+    assert reopened.get("b") is None
+    assert reopened.get("a")["etag"] == '"abc"'
+    assert len(reopened) == 2
+
+
+@pytest.mark.skipif(os.name == "nt", reason="posix permissions")
+def test_disk_cache_private(tmp_path):
+    """
+    Cache dir and file are only readable by their owner, also if they existed.
+    """
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir(mode=0o755)
+    (cache_dir / "responses.sqlite").touch(mode=0o644)
+    cache = DiskResponseCache(str(cache_dir))
+    cache.set("a", get_entry(b"x"))
+    assert stat.S_IMODE(os.stat(cache_dir).st_mode) == CACHE_DIR_MODE
+    assert stat.S_IMODE(os.stat(cache.path).st_mode) == CACHE_FILE_MODE
+
+
+def test_caching_adapter(etag_server):
+    """
+    Second request revalidates with If-None-Match and is served from cache.
+    """
+    session = requests.Session()
+    session.mount("http://", GitHubAdapter(cache=MemoryResponseCache()))
+    first = session.get(f"{etag_server}/user")
+    second = session.get(f"{etag_server}/user")
+    assert ETagHandler.hits == [None, '"v1"']
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert second.headers["X-RateLimit-Remaining"] == "4999"
+
+
+def test_cache_keyed_by_token(etag_server):
+    """
+    Responses cached for one token are not served to another.
+    """
+    session = requests.Session()
+    session.mount("http://", GitHubAdapter(cache=MemoryResponseCache()))
+    for token in ["a", "a", "b"]:
+        session.get(f"{etag_server}/user", headers={"Authorization": f"token {token}"})
+    assert ETagHandler.hits == [None, '"v1"', None]
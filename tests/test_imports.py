@@ -0,0 +1,88 @@
+"""
+Test that importing the library does not load the app or plotting dependencies.
+"""
+
+import json
+import subprocess
+import sys
+
+LAZY_MODULES = [
+    "altair",
+    "flask",
+    "flask_bootstrap",
+    "flask_wtf",
+    "jinja2",
+    "pkg_resources",
+    "wtforms",
+    "GitHubHealth.app.main",
+    "GitHubHealth.plots",
+]
+
+
+def get_loaded_modules(code):
+    """
+    LAZY_MODULES loaded after running code in a fresh interpreter.
+    """
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"{code}\nimport json, sys\n"
+            f"print(json.dumps([x for x in {LAZY_MODULES} if x in sys.modules]))",
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_import_is_lazy():
+    """
+    Importing GitHubHealth and its core classes loads none of LAZY_MODULES.
+    """
+    assert not get_loaded_modules(
+        "import GitHubHealth\nfrom GitHubHealth import GitHubHealth, utils"
+    )
+
+
+def test_lazy_attributes():
+    """
+    app and plotting helpers load when first used.
+    """
+    loaded = get_loaded_modules(
+        "from GitHubHealth import app\n"
+        "from GitHubHealth.utils import get_ghh_plot\n"
+        "assert type(app).__name__ == 'Flask'\n"
+        "import GitHubHealth\n"
+        "assert GitHubHealth.app is app"
+    )
+    assert "flask" in loaded
+    assert "altair" in loaded
+
+
+def test_app_after_submodule_import():
+    """
+    app is the flask app even after an app submodule bound the package name.
+    """
+    loaded = get_loaded_modules(
+        "import GitHubHealth.app.main\n"
+        "from GitHubHealth import app\n"
+        "assert type(app).__name__ == 'Flask', type(app)\n"
+        "import GitHubHealth.app.forms\n"
+        "assert GitHubHealth.app is app"
+    )
+    assert "flask" in loaded
+
+
+def test_app_after_forms_import():
+    """
+    Importing a submodule that does not load the app leaves app lazy but correct.
+    """
+    loaded = get_loaded_modules(
+        "import GitHubHealth.app.forms\n"
+        "assert 'GitHubHealth.app.main' not in __import__('sys').modules\n"
+        "from GitHubHealth import app\n"
+        "assert type(app).__name__ == 'Flask', type(app)"
+    )
+    assert "GitHubHealth.app.main" in loaded
@@ -4,7 +4,15 @@ Test metadata for requested object.
 
 import pytest
 
-from GitHubHealth.requested_object import Metadata
+from GitHubHealth.requested_object import (
+    Metadata,
+    RequestedObject,
+)
+
+from conftest import (
+    FakeNamedObject,
+    FakePaginatedList,
+)
 
 
 def test_create_class_object(ghh):
@@ -61,3 +69,74 @@ def test_change_metadata_limit(ghh):
     metadata.set_input_limits(2, 10)
     assert metadata.input_from == 2
     assert metadata.input_to == 10
+
+
+def test_metadata_pages():
+    """
+    Only the pages covering the requested rows are requested.
+    """
+    repos = FakePaginatedList(
+        [
+            FakeNamedObject(
+                name=f"repo_{i}",
+                owner=FakeNamedObject(login="me"),
+                html_url=f"https://github.com/me/repo_{i}",
+            )
+            for i in range(100)
+        ]
+    )
+    orgs = FakePaginatedList([FakeNamedObject(login=f"org_{i}") for i in range(5)])
+    teams = FakePaginatedList(
+        [
+            FakeNamedObject(
+                name="team", slug="team", organization=FakeNamedObject(login="org_0")
+            )
+        ]
+    )
+    user = FakeNamedObject(
+        get_repos=lambda: repos, get_orgs=lambda: orgs, get_teams=lambda: teams
+    )
+    metadata = Metadata(RequestedObject(user, "https://github.com/me"))
+    metadata.set_input_limits(55, 65)
+    metadata.get_metadata()
+    assert list(metadata.metadata_df["name"]) == [f"repo_{i}" for i in range(54, 65)]
+    assert repos.pages == ["total", 1, 2]
+    assert orgs.pages == ["total"]
+    assert metadata.total == 106
+    metadata.set_input_limits(98, 106)
+    metadata.get_metadata()
+    assert repos.pages == ["total", 1, 2, 3]
+    assert list(metadata.metadata_df["resource"]) == ["repo"] * 3 + ["org"] * 5 + [
+        "team"
+    ]
+    assert metadata.metadata_df["url"].iloc[-1] == (
+        "https://github.com/orgs/org_0/teams/team"
+    )
+    assert metadata.metadata_df["owner"].iloc[3] == "org_0"
+
+
+def test_metadata_per_request():
+    """
+    Metadata of one object paged separately shares totals but not slices.
+    """
+    repos = FakePaginatedList(
+        [
+            FakeNamedObject(
+                name=f"repo_{i}",
+                owner=FakeNamedObject(login="me"),
+                html_url=f"https://github.com/me/repo_{i}",
+            )
+            for i in range(40)
+        ]
+    )
+    requested_object = RequestedObject(
+        FakeNamedObject(get_repos=lambda: repos), "https://github.com/me"
+    )
+    first = Metadata(requested_object)
+    second = Metadata(requested_object)
+    second.set_input_limits(31, 40)
+    first.get_metadata()
+    second.get_metadata()
+    assert list(first.metadata_df["name"]) == [f"repo_{i}" for i in range(10)]
+    assert list(second.metadata_df["name"]) == [f"repo_{i}" for i in range(30, 40)]
+    assert repos.pages == ["total", 0, 1]
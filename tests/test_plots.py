@@ -2,9 +2,29 @@
 create html with plots.  useful for testing formatting etc.
 """
 
+import json
 import os
 
 from jinja2 import Environment, FileSystemLoader
+import numpy as np
+
+from GitHubHealth.fetch import RepoFetcher
+from GitHubHealth.requested_object import (
+    REPO_PLOT_VARS,
+    RequestedObject,
+)
+from GitHubHealth import plots
+from GitHubHealth.plots import (
+    get_bin_df,
+    get_ghh_plot,
+    get_plot_specs,
+)
+from GitHubHealth.utils import (
+    PLOT_BINS,
+    PLOT_DATA_NAME,
+    PLOT_TOP_N,
+    get_repos_builder,
+)
 
 DUMMY_PLOTS_HTML = "plots.html"
 
@@ -23,3 +43,106 @@ def test_dummy_plots(ghh):
     with open(DUMMY_PLOTS_HTML, "w", encoding="utf-8") as html_out:
         html_out.write(output_from_parsed_template)
     assert os.path.exists(DUMMY_PLOTS_HTML)
+
+
+def test_shared_plot_data(fake_repos):
+    """
+    Plot specs carry no data of their own and reference the one shared dataset.
+    """
+    requested_object = RequestedObject(None, "https://github.com/me", RepoFetcher())
+    setattr(requested_object, "repo_df", RepoFetcher().get_repo_df(fake_repos))
+    requested_object.get_plots()
+    plot_data = json.loads(requested_object.plot_data)
+    assert len(plot_data) == len(fake_repos)
+    assert set(plot_data[0]) == {"repo"} | set(REPO_PLOT_VARS)
+    for plot in requested_object.plots:
+        spec = json.loads(plot)
+        assert "datasets" not in spec
+        assert spec["data"] == {"name": PLOT_DATA_NAME}
+        assert spec["encoding"]["x"] == {"field": "repo", "type": "nominal"}
+        assert spec["encoding"]["y"]["type"] == "quantitative"
+
+
+def test_plot_cache(monkeypatch, fake_repos):
+    """
+    Unchanged data is served from the plot cache, changed data builds new specs.
+    """
+    built = []
+
+    def get_plot(plot_df, var, x="repo"):
+        built.append(var)
+        return get_ghh_plot(plot_df, var, x=x)
+
+    monkeypatch.setattr(plots, "get_ghh_plot", get_plot)
+    plots.PLOT_CACHE.clear()
+    repo_df = RepoFetcher().get_repo_df(fake_repos)
+    specs, plot_data = get_plot_specs(repo_df, "repo", REPO_PLOT_VARS)
+    assert len(built) == len(REPO_PLOT_VARS)
+    assert get_plot_specs(repo_df.copy(), "repo", REPO_PLOT_VARS) == (specs, plot_data)
+    assert len(built) == len(REPO_PLOT_VARS)
+    repo_df.loc[0, "issues"] = 5
+    _, new_plot_data = get_plot_specs(repo_df, "repo", REPO_PLOT_VARS)
+    assert len(built) == 2 * len(REPO_PLOT_VARS)
+    assert new_plot_data != plot_data
+
+
+def get_large_repo_df(n_repos):
+    """
+    repo_df of n_repos synthetic repos.
+    """
+    return get_repos_builder(
+        {
+            "repo": f"repo_{i}",
+            "repo_url": f"https://github.com/me/repo_{i}",
+            "private": False,
+            "branch count": i % 50,
+            "min branch age (days)": np.nan if i % 10 == 0 else float(i % 400),
+            "max branch age (days)": float(i % 900),
+            "issues": i % 4,
+            "pull requests": i % 3,
+            "primary language": "Python",
+            "score": 5.0,
+        }
+        for i in range(n_repos)
+    ).to_df()
+
+
+def test_aggregated_plots():
+    """
+    Above max_rows plots have a bounded number of bars whatever the number of repos.
+    """
+    sizes = []
+    for n_repos in [500, 5000]:
+        repo_df = get_large_repo_df(n_repos)
+        specs, plot_data = get_plot_specs(repo_df, "repo", REPO_PLOT_VARS, max_rows=100)
+        assert plot_data == "[]"
+        for plot in specs:
+            spec = json.loads(plot)
+            dataset = spec["datasets"][spec["data"]["name"]]
+            assert len(dataset) <= max(PLOT_TOP_N + 1, PLOT_BINS + 1)
+        sizes.append(sum(len(plot) for plot in specs))
+    assert sizes[1] < 1.2 * sizes[0]
+    top = json.loads(specs[0])
+    top_data = top["datasets"][top["data"]["name"]]
+    assert top_data[0]["branch count"] == 49
+    assert top_data[-1]["repo"] == f"other ({5000 - PLOT_TOP_N}, mean)"
+    _, plot_data = get_plot_specs(repo_df.head(100), "repo", REPO_PLOT_VARS)
+    assert len(json.loads(plot_data)) == 100
+
+
+def test_bin_df():
+    """
+    Bins are whole numbers and missing values get their own bin.
+    """
+    bin_df = get_bin_df(get_large_repo_df(40), "issues")
+    assert bin_df["issues"].tolist() == ["0", "1", "2", "3"]
+    assert bin_df["count"].tolist() == [10, 10, 10, 10]
+    bin_df = get_bin_df(get_large_repo_df(1000), "min branch age (days)", bins=4)
+    assert bin_df["min branch age (days)"].tolist() == [
+        "1-100",
+        "101-200",
+        "201-300",
+        "301-400",
+        "missing",
+    ]
+    assert bin_df["count"].sum() == 1000
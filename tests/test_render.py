@@ -0,0 +1,193 @@
+"""
+Test html rendering of repo, branch and metadata tables.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from GitHubHealth.render import (
+    TABLE_MAX_PAGE_SIZE,
+    render_html_table,
+)
+from GitHubHealth.utils import (
+    get_branch_builder,
+    get_repo_table,
+    get_repos_builder,
+    render_metadata_html_table,
+    render_repo_html_table,
+    render_single_repo_html_table,
+)
+
+
+def get_cell(html, table_id, row, col):
+    """
+    Class and contents of one table cell.
+    """
+    match = re.search(
+        f'<td id="T_{table_id}_row{row}_col{col}" class="([^"]*)" >(.*?)</td>', html
+    )
+    return match.group(1), match.group(2)
+
+
+def test_repo_table():
+    """
+    Repo table keeps Styler ids, formatting and red/bold cells.
+    """
+    repo_df = get_repos_builder(
+        [
+            {
+                "repo": "a",
+                "repo_url": "https://github.com/me/a",
+                "private": False,
+                "branch count": 5,
+                "min branch age (days)": 10.4,
+                "max branch age (days)": np.nan,
+                "issues": 2,
+                "pull requests": 0,
+                "primary language": None,
+                "score": 7.5,
+            },
+        ]
+    ).to_df()
+    html = render_repo_html_table(repo_df, table_id="repo-metadata")
+    assert '<table id="T_repo-metadata">' in html
+    assert 'class="col_heading level0 col0" >repo</th>' in html
+    assert "repo_url" not in html
+    assert get_cell(html, "repo-metadata", 0, 0) == (
+        "data row0 col0",
+        "<a target='_blank' href='https://github.com/me/a'>a</a>",
+    )
+    assert get_cell(html, "repo-metadata", 0, 1) == (
+        "data row0 col1 cell-bold",
+        "False",
+    )
+    assert get_cell(html, "repo-metadata", 0, 2) == ("data row0 col2 cell-red", "5")
+    assert get_cell(html, "repo-metadata", 0, 3) == ("data row0 col3", "10")
+    assert get_cell(html, "repo-metadata", 0, 4) == ("data row0 col4", "missing")
+    assert get_cell(html, "repo-metadata", 0, 7) == ("data row0 col7", "missing")
+    assert get_cell(html, "repo-metadata", 0, 8) == ("data row0 col8", "7.50")
+
+
+def test_repo_table_missing_counts():
+    """
+    Missing issue and pull request counts render as missing.
+    """
+    repo_df = get_repos_builder(
+        [
+            {
+                "repo": "a",
+                "repo_url": "https://github.com/me/a",
+                "private": False,
+                "branch count": 1,
+                "min branch age (days)": 1.0,
+                "max branch age (days)": 1.0,
+                "issues": None,
+                "pull requests": None,
+                "primary language": "Python",
+                "score": 7.5,
+            },
+        ]
+    ).to_df()
+    html = render_repo_html_table(repo_df, table_id="repo-metadata")
+    assert get_cell(html, "repo-metadata", 0, 5)[1] == "missing"
+    assert get_cell(html, "repo-metadata", 0, 6)[1] == "missing"
+
+
+def test_branch_table():
+    """
+    Branch, sha and committer link to their GitHub pages.
+    """
+    branch_df = get_branch_builder(
+        [
+            {
+                "branch": "main",
+                "url": "https://github.com/me/a/commit/abc",
+                "sha": "abc",
+                "last modified": "today",
+                "age (days)": 1,
+                "protected": True,
+                "committer": "you",
+            }
+        ]
+    ).to_df()
+    html = render_single_repo_html_table(branch_df, table_id="branches")
+    assert get_cell(html, "branches", 0, 0)[1] == (
+        "<a target='_blank' href='https://github.com/me/a/tree/main'>main</a>"
+    )
+    assert get_cell(html, "branches", 0, 1)[1] == (
+        "<a target='_blank' href='https://github.com/me/a/commit/abc'>abc</a>"
+    )
+    assert get_cell(html, "branches", 0, 5)[1] == (
+        "<a target='_blank' href='https://github.com/you'>you</a>"
+    )
+
+
+def test_metadata_table():
+    """
+    Owner links to the parent of url, empty tables still have headings.
+    """
+    metadata_df = pd.DataFrame(
+        {
+            "owner": ["me"],
+            "name": ["a"],
+            "url": ["https://github.com/me/a"],
+            "health": ["health"],
+        }
+    )
+    html = render_metadata_html_table(metadata_df, table_id="user-metadata")
+    assert get_cell(html, "user-metadata", 0, 0)[1] == (
+        "<a target='_blank' href='https://github.com/me'>me</a>"
+    )
+    assert get_cell(html, "user-metadata", 0, 2) == ("data row0 col2", "health")
+    empty_html = render_metadata_html_table(metadata_df.iloc[:0], table_id="empty")
+    assert 'class="col_heading level0 col3" >health</th>' in empty_html
+    assert "<td" not in empty_html
+
+
+def test_float_defaults():
+    """
+    Floats use Styler default precision, a random id is used without table_id.
+    """
+    html = render_html_table(pd.DataFrame({"x": [1.5, np.nan]}))
+    table_id = re.search('<table id="T_([^"]+)">', html).group(1)
+    assert get_cell(html, table_id, 0, 0)[1] == "1.500000"
+    assert get_cell(html, table_id, 1, 0)[1] == "nan"
+
+
+def test_table_pages():
+    """
+    Pages are sorted on raw values, filtered by search and keep cell classes.
+    """
+    repo_df = get_repos_builder(
+        {
+            "repo": f"repo_{i}",
+            "repo_url": f"https://github.com/me/repo_{i}",
+            "private": i % 2 == 0,
+            "branch count": i,
+            "min branch age (days)": np.nan if i == 3 else float(i * 10),
+            "max branch age (days)": float(i * 20),
+            "issues": 0,
+            "pull requests": 0,
+            "primary language": "Python",
+            "score": 10.0,
+        }
+        for i in range(12)
+    ).to_df()
+    table = get_repo_table(repo_df)
+    page = table.get_page(start=0, count=5)
+    assert page["total"] == page["filtered"] == 12
+    assert len(page["rows"]) == 5
+    assert page["columns"][0] == "repo"
+    assert page["rows"][1][1] == ["False", "cell-bold"]
+    page = table.get_page(start=0, count=2, sort="repo", ascending=False)
+    assert "repo_9" in page["rows"][0][0][0]
+    page = table.get_page(start=10, count=5, sort="min branch age (days)")
+    assert [row[3] for row in page["rows"]] == [["110", "cell-red"], ["missing", ""]]
+    page = table.get_page(count=20, search="REPO_1")
+    assert page["filtered"] == 3
+    assert table.get_page(count=TABLE_MAX_PAGE_SIZE + 1)["filtered"] == 12
+    with pytest.raises(ValueError):
+        table.get_page(sort="unknown")
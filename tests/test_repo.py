@@ -2,6 +2,18 @@
 Test getting repo functions.
 """
 
+from datetime import datetime
+
+import pandas as pd
+
+from GitHubHealth.fetch import RepoFetcher
+from GitHubHealth.requested_object import RequestedObject
+
+from conftest import (
+    FakeOwner,
+    FakeRepo,
+)
+
 
 # pylint: disable=invalid-sequence-index
 def test_get_repos(ghh):
@@ -47,3 +59,84 @@ def test_results_limit(ghh):
     ghh.user.metadata.set_input_limits(input_from=1, input_to=10)
     ghh.user.metadata.get_metadata()
     assert len(ghh.user.metadata.metadata_df) <= 10
+
+
+def test_incremental_repo_df(fake_repos):
+    """
+    Only repos pushed since the last snapshot are refetched.
+    """
+    requested_object = RequestedObject(FakeOwner(fake_repos), "n/a")
+    requested_object.get_repo_df()
+    full_df = requested_object.repo_df.copy()
+    assert all(repo.requests == 4 for repo in fake_repos)
+    requested_object.get_repo_df(incremental=True)
+    assert requested_object.repo_df.equals(full_df)
+    assert all(repo.requests == 4 for repo in fake_repos)
+    fake_repos[1].pushed_at = datetime(2022, 2, 1)
+    fake_repos[1].issues = 5
+    deleted = fake_repos.pop(2)
+    requested_object.get_repo_df(incremental=True)
+    assert fake_repos[1].requests == 8
+    assert sum(repo.requests for repo in fake_repos) == 4 * len(fake_repos) + 4
+    repo_df = requested_object.repo_df.set_index("repo")
+    assert repo_df.loc[fake_repos[1].name, "issues"] == 5
+    assert deleted.name not in repo_df.index
+    assert len(repo_df) == len(fake_repos)
+
+
+def test_incremental_ignore(fake_repos):
+    """
+    Ignored repos stay out of repo_df on full and incremental fetches.
+    """
+    ignored = fake_repos[0].name
+    requested_object = RequestedObject(FakeOwner(fake_repos), "n/a")
+    requested_object.get_repos(ignore=[ignored])
+    requested_object.get_repo_df()
+    assert ignored not in requested_object.repo_df["repo"].tolist()
+    assert len(requested_object.repo_df) == len(fake_repos) - 1
+    fake_repos[0].pushed_at = datetime(2022, 2, 1)
+    requested_object.get_repo_df(incremental=True)
+    assert ignored not in requested_object.repo_df["repo"].tolist()
+    assert fake_repos[0].requests == 0
+    requested_object = RequestedObject(FakeOwner(fake_repos), "n/a")
+    requested_object.get_repo_df(ignore=[ignored])
+    requested_object.get_repo_df(incremental=True)
+    assert ignored not in requested_object.repo_df["repo"].tolist()
+
+
+class LazyOwner(FakeOwner):
+    """
+    Owner whose repos are generated on demand, counting how many were read.
+    """
+
+    def __init__(self, n_repos):
+        super().__init__([])
+        self.n_repos = n_repos
+        self.read = 0
+
+    def get_repos(self):
+        """
+        Simulated paginated repos request.
+        """
+        for i in range(self.n_repos):
+            self.read += 1
+            yield FakeRepo(f"repo_{i:03d}", n_branches=1)
+
+
+def test_iter_repo_details():
+    """
+    Repos are read lazily and details can be batched into DataFrames.
+    """
+    owner = LazyOwner(50)
+    requested_object = RequestedObject(owner, "n/a", RepoFetcher(max_workers=2))
+    records = requested_object.iter_repo_details(ignore=["repo_000"])
+    first = next(records)
+    assert first["repo"] != "repo_000"
+    assert owner.read <= 10
+    records.close()
+    owner = LazyOwner(50)
+    requested_object = RequestedObject(owner, "n/a", RepoFetcher(max_workers=2))
+    repo_dfs = list(requested_object.iter_repo_dfs(chunk_size=20))
+    assert [len(x) for x in repo_dfs] == [20, 20, 10]
+    assert sorted(pd.concat(repo_dfs)["repo"]) == [f"repo_{i:03d}" for i in range(50)]
+    assert requested_object.repos == []
@@ -0,0 +1,199 @@
+"""
+Test rate limit aware scheduling.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import time
+
+import pytest
+import requests
+
+from GitHubHealth.scheduler import (
+    SECONDARY_LIMIT_WAIT,
+    RateLimitScheduler,
+    get_resource,
+    get_retry_after,
+)
+from GitHubHealth.transport import GitHubAdapter
+
+
+class FakeResponse:  # pylint: disable=too-few-public-methods
+    """
+    Response with given status and headers.
+    """
+
+    def __init__(self, status_code=200, headers=None, text=""):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = text
+
+
+class LimitHandler(BaseHTTPRequestHandler):
+    """
+    Reject the first request with a secondary rate limit, then succeed.
+    """
+
+    hits = []
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        Record request and reply.
+        """
+        self.hits.append(self.path)
+        if len(self.hits) == 1:
+            self.send_response(403)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = b'{"login": "me"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        """
+        Keep test output quiet.
+        """
+
+
+@pytest.fixture(name="limit_server")
+def fixture_limit_server():
+    """
+    Local server that applies a secondary rate limit once.
+    """
+    LimitHandler.hits = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LimitHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_get_resource():
+    """
+    Requests are grouped by the rate limit they count against.
+    """
+    assert get_resource("https://api.github.com/user/repos") == "core"
+    assert get_resource("https://api.github.com/search/repositories?q=x") == "search"
+    assert get_resource("https://api.github.com/graphql") == "graphql"
+
+
+def test_secondary_limit_pauses():
+    """
+    Retry-After pauses the resource and halves concurrency.
+    """
+    scheduler = RateLimitScheduler(max_concurrency=8)
+    state = scheduler.get_state("core")
+    retry = scheduler.update(
+        state, FakeResponse(403, {"Retry-After": "30"}, "secondary rate limit")
+    )
+    assert retry
+    assert scheduler.concurrency == 4
+    assert 25 < state.get_delay(time.time()) <= 30
+
+
+def test_pacing():
+    """
+    Requests are paced once the remaining quota is low.
+    """
+    scheduler = RateLimitScheduler(reserve=10, pace_below=100)
+    state = scheduler.get_state("core")
+    reset = int(time.time()) + 100
+    scheduler.update(
+        state,
+        FakeResponse(
+            200, {"X-RateLimit-Remaining": "1000", "X-RateLimit-Reset": str(reset)}
+        ),
+    )
+    assert state.rate is None
+    scheduler.update(
+        state,
+        FakeResponse(
+            200, {"X-RateLimit-Remaining": "60", "X-RateLimit-Reset": str(reset)}
+        ),
+    )
+    assert state.rate == pytest.approx(0.5, rel=0.1)
+    assert state.get_delay(time.time()) > 0
+
+
+def test_concurrency_recovers():
+    """
+    Concurrency grows back after successful responses.
+    """
+    scheduler = RateLimitScheduler(max_concurrency=4)
+    state = scheduler.get_state("core")
+    scheduler.update(state, FakeResponse(429, {"Retry-After": "0"}))
+    assert scheduler.concurrency == 2
+    for _ in range(10):
+        scheduler.update(state, FakeResponse(200))
+    assert scheduler.concurrency == 4
+
+
+def test_long_pause_not_retried():
+    """
+    Pauses longer than max_wait fail instead of retrying.
+    """
+    scheduler = RateLimitScheduler(max_wait=10)
+    state = scheduler.get_state("core")
+    retry = scheduler.update(state, FakeResponse(403, {"Retry-After": "60"}))
+    assert not retry
+
+
+def test_adapter_retries(limit_server):
+    """
+    Rate limited request is retried after the pause.
+    """
+    session = requests.Session()
+    session.mount("http://", GitHubAdapter(scheduler=RateLimitScheduler()))
+    response = session.get(f"{limit_server}/user")
+    assert response.status_code == 200
+    assert response.json() == {"login": "me"}
+    assert len(LimitHandler.hits) == 2
+
+
+def test_search_paced_not_blocked():
+    """
+    Small search quota is paced over the minute instead of blocked by the reserve.
+    """
+    scheduler = RateLimitScheduler()
+    state = scheduler.get_state("search")
+    reset = int(time.time()) + 60
+    scheduler.update(
+        state,
+        FakeResponse(
+            200,
+            {
+                "X-RateLimit-Limit": "30",
+                "X-RateLimit-Remaining": "29",
+                "X-RateLimit-Reset": str(reset),
+            },
+        ),
+    )
+    assert scheduler.get_reserve(state) == 3
+    assert state.rate == pytest.approx(26 / 60, rel=0.1)
+    assert 0 < state.get_delay(time.time()) < 5
+    scheduler.update(
+        state,
+        FakeResponse(
+            200,
+            {
+                "X-RateLimit-Limit": "5000",
+                "X-RateLimit-Remaining": "100",
+                "X-RateLimit-Reset": str(reset),
+            },
+        ),
+    )
+    assert scheduler.get_reserve(state) == 50
+
+
+def test_get_retry_after():
+    """
+    Retry-After wins over the reset time, header names match in any case.
+    """
+    assert get_retry_after({"retry-after": "7", "x-ratelimit-reset": "200"}, 100) == 7
+    assert get_retry_after({"X-RateLimit-Reset": "200"}, 100) == 100
+    assert get_retry_after(None) == SECONDARY_LIMIT_WAIT
@@ -0,0 +1,137 @@
+"""
+Test reuse of search result pages.
+"""
+
+import time
+
+from github.NamedUser import NamedUser
+from github.Repository import Repository
+
+from GitHubHealth.cache import TTLCache
+from GitHubHealth.requested_object import SearchResults
+
+from conftest import (
+    FakeNamedObject,
+    FakePaginatedList,
+)
+
+
+def get_fake_ghh(n_users, n_repos, latency=0.0):
+    """
+    ghh stand in whose searches return offline results and count search requests.
+    latency (seconds) is slept on each search.
+    """
+    users = [
+        NamedUser(None, {}, {"login": f"user_{i}", "html_url": "n/a"}, completed=True)
+        for i in range(n_users)
+    ]
+    repos = [
+        Repository(
+            None,
+            {},
+            {"name": f"repo_{i}", "owner": {"login": "me"}, "html_url": "n/a"},
+            completed=True,
+        )
+        for i in range(n_repos)
+    ]
+    searches = []
+
+    def search_users(query):
+        time.sleep(latency)
+        searches.append(("users", query))
+        if query.endswith("type:org"):
+            return FakePaginatedList(users[:3])
+        return FakePaginatedList(users)
+
+    def search_repositories(query):
+        time.sleep(latency)
+        searches.append(("repos", query))
+        return FakePaginatedList(repos)
+
+    return FakeNamedObject(
+        con=FakeNamedObject(
+            search_users=search_users, search_repositories=search_repositories
+        ),
+        search_cache=TTLCache(maxsize=4, ttl=60),
+        searches=searches,
+    )
+
+
+def run_search(ghh, input_from, input_to, **kwargs):
+    """
+    Search and get output the way GitHubHealth.search does.
+    """
+    search_results = SearchResults(
+        ghh, "query", input_from=input_from, input_to=input_to, **kwargs
+    )
+    search_results.search()
+    search_results.get_output_results()
+    return search_results
+
+
+def test_search_pages_reused():
+    """
+    Repeating and paging a search only requests pages not fetched yet.
+    """
+    ghh = get_fake_ghh(40, 40)
+    first = run_search(ghh, 1, 10, users=True, repos=True)
+    assert list(first.table_df["name"]) == [f"user_{i}" for i in range(10)]
+    assert len(ghh.searches) == 2
+    assert first.user_results.pages == ["total", 0]
+    second = run_search(ghh, 25, 35, users=True, repos=True)
+    assert len(ghh.searches) == 2
+    assert second.user_results is first.user_results
+    assert first.user_results.pages == ["total", 0, 1]
+    third = run_search(ghh, 38, 45, users=True, repos=True)
+    assert list(third.table_df["resource"]) == ["user"] * 3 + ["repo"] * 5
+    assert first.user_results.pages == ["total", 0, 1]
+    assert first.repo_results.pages == ["total", 0]
+    back = run_search(ghh, 1, 10, users=True, repos=True)
+    assert back.table_df.equals(first.table_df)
+    assert first.user_results.pages == ["total", 0, 1]
+    run_search(ghh, 1, 10, users=True, repos=True, ignore="user_1")
+    assert len(ghh.searches) == 4
+    run_search(ghh, 1, 10, users=True)
+    assert len(ghh.searches) == 5
+
+
+def test_search_orgs_concurrent():
+    """
+    Users, orgs and repos are searched concurrently and merged in order.
+    """
+    ghh = get_fake_ghh(5, 5, latency=0.2)
+    start = time.perf_counter()
+    search_results = run_search(ghh, 4, 10, users=True, orgs=True, repos=True)
+    assert time.perf_counter() - start < 0.5
+    assert sorted(ghh.searches) == [
+        ("repos", "query"),
+        ("users", "query type:org"),
+        ("users", "query type:user"),
+    ]
+    assert search_results.total == 13
+    assert (
+        list(search_results.table_df["resource"])
+        == ["user"] * 2 + ["org"] * 3 + ["repo"] * 2
+    )
+    assert list(search_results.table_df["name"]) == [
+        "user_3",
+        "user_4",
+        "user_0",
+        "user_1",
+        "user_2",
+        "repo_0",
+        "repo_1",
+    ]
+
+
+def test_search_empty_total_kept():
+    """
+    A total of 0 is requested once, not again on each use or cache hit.
+    """
+    ghh = get_fake_ghh(0, 40)
+    first = run_search(ghh, 1, 10, users=True, repos=True)
+    run_search(ghh, 11, 20, users=True, repos=True)
+    assert first.totals == {"user": 0, "org": 0, "repo": 40}
+    assert first.user_results.pages == ["total"]
+    assert first.repo_results.pages == ["total", 0]
+    assert len(ghh.searches) == 2
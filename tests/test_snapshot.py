@@ -0,0 +1,93 @@
+"""
+Test historical snapshot store.
+"""
+
+from datetime import datetime
+
+from GitHubHealth.fetch import RepoFetcher
+from GitHubHealth.snapshot import SnapshotStore
+from GitHubHealth.utils import (
+    BRANCH_DF_COLUMNS,
+    get_branch_df,
+)
+
+
+def test_repo_snapshots(tmp_path, fake_repos):
+    """
+    Repo snapshots are appended and queried by owner, repo and time.
+    """
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite"))
+    assert store.get_latest_repo_df("me") is None
+    repo_df = RepoFetcher(max_workers=1).get_repo_df(fake_repos)
+    store.append_repo_df("me", repo_df, datetime(2022, 1, 1))
+    fake_repos[0].issues = 10
+    newer_df = RepoFetcher(max_workers=1).get_repo_df(fake_repos)
+    store.append_repo_df("me", newer_df, datetime(2022, 1, 2))
+    store.append_repo_df("other", repo_df, datetime(2022, 1, 3))
+    assert len(store.get_repo_history("me")) == 2 * len(fake_repos)
+    assert len(store.get_repo_history(start=datetime(2022, 1, 2))) == 2 * len(
+        fake_repos
+    )
+    repo_history = store.get_repo_history("me", repo=fake_repos[0].name)
+    assert list(repo_history["issues"]) == [0, 10]
+    assert store.get_latest_snapshot_time("me") == "2022-01-02T00:00:00"
+    assert store.get_latest_repo_df("me").equals(newer_df)
+    trend_df = store.get_trend("me")
+    assert list(trend_df["repos"]) == [len(fake_repos), len(fake_repos)]
+
+
+def test_branch_snapshots(tmp_path, fake_repos):
+    """
+    Branch snapshots are appended and queried by repo.
+    """
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite"))
+    for repo in fake_repos:
+        store.append_branch_df("me", repo.name, get_branch_df(repo))
+    branch_history = store.get_branch_history("me", repo=fake_repos[-1].name)
+    assert len(branch_history) == len(fake_repos[-1].branches)
+    assert list(branch_history.columns[4:]) == BRANCH_DF_COLUMNS
+    assert branch_history["protected"].sum() == 1
+
+
+def test_snapshot_ids(tmp_path, fake_repos):
+    """
+    Latest snapshot is the last appended even within the same second.
+    """
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite"))
+    repo_df = RepoFetcher(max_workers=1).get_repo_df(fake_repos)
+    first_id = store.append_repo_df("me", repo_df, datetime(2022, 1, 1))
+    second_id = store.append_repo_df("me", repo_df.iloc[:2], datetime(2022, 1, 1))
+    assert second_id > first_id
+    assert store.get_latest_snapshot("me") == (second_id, "2022-01-01T00:00:00")
+    assert len(store.get_latest_repo_df("me")) == 2
+    assert list(store.get_trend("me")["repos"]) == [len(fake_repos), 2]
+
+
+def test_snapshot_retention(tmp_path, fake_repos):
+    """
+    Only the newest max_snapshots snapshots of each owner and repo are kept.
+    """
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite"), max_snapshots=2)
+    repo_df = RepoFetcher(max_workers=1).get_repo_df(fake_repos)
+    for day in range(1, 5):
+        store.append_repo_df("me", repo_df, datetime(2022, 1, day))
+        store.append_branch_df("me", "a", get_branch_df(fake_repos[0]))
+    store.append_repo_df("other", repo_df)
+    assert list(store.get_trend("me")["snapshot_time"]) == [
+        "2022-01-03T00:00:00",
+        "2022-01-04T00:00:00",
+    ]
+    assert len(store.get_trend("other")) == 1
+    assert store.get_branch_history("me", "a")["snapshot_id"].nunique() == 2
+
+
+def test_snapshot_close(tmp_path, fake_repos):
+    """
+    A closed store reopens its connection when used again.
+    """
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite"))
+    repo_df = RepoFetcher(max_workers=1).get_repo_df(fake_repos)
+    store.append_repo_df("me", repo_df)
+    store.close()
+    assert store.con is None
+    assert store.get_latest_repo_df("me").equals(repo_df)
@@ -0,0 +1,43 @@
+"""
+Test offline synthetic and recorded owners.
+"""
+
+from GitHubHealth.fetch import RepoFetcher
+from GitHubHealth.synthetic import (
+    get_synthetic_data,
+    get_synthetic_owner,
+    load_owner,
+    record_owner,
+)
+from GitHubHealth.utils import get_branch_df
+
+
+def test_synthetic_owner():
+    """
+    Synthetic owners have the requested size and are the same for the same arguments.
+    """
+    owner = get_synthetic_owner(repos=12, branches=3)
+    assert len(owner.get_repos()) == 12
+    repo_df = RepoFetcher(max_workers=2).get_repo_df(owner.get_repos())
+    assert len(repo_df) == 12
+    assert (repo_df["branch count"] == 3).all()
+    assert repo_df.equals(
+        RepoFetcher(max_workers=1).get_repo_df(get_synthetic_owner(12, 3).get_repos())
+    )
+    assert get_synthetic_data(2, 1, seed=1) != get_synthetic_data(2, 1, seed=2)
+
+
+def test_record_replay(tmp_path):
+    """
+    A recorded owner replays to the same repo and branch frames.
+    """
+    owner = get_synthetic_owner(repos=5, branches=4)
+    path = str(tmp_path / "owner.json")
+    assert len(record_owner(owner, path, max_repos=3)["repos"]) == 3
+    replayed = load_owner(path)
+    assert replayed.login == owner.login
+    repo_df = RepoFetcher().get_repo_df(owner.get_repos()[:3])
+    assert RepoFetcher().get_repo_df(replayed.get_repos()).equals(repo_df)
+    assert get_branch_df(replayed.get_repo("repo-1")).equals(
+        get_branch_df(owner.get_repo("repo-1"))
+    )
@@ -0,0 +1,143 @@
+"""
+Test routing requests over a pool of tokens.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import time
+
+import pytest
+import requests
+
+from GitHubHealth.scheduler import RateLimitScheduler
+from GitHubHealth.token_pool import TokenPool
+from GitHubHealth.transport import GitHubAdapter
+
+URL = "https://api.github.com/user/repos"
+
+
+class FakeResponse:  # pylint: disable=too-few-public-methods
+    """
+    Response with given status and headers.
+    """
+
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def get_limit_headers(remaining):
+    """
+    Rate limit headers with given remaining quota.
+    """
+    return {
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(int(time.time()) + 3600),
+    }
+
+
+class QuotaHandler(BaseHTTPRequestHandler):
+    """
+    Reject requests made with the spent token.
+    """
+
+    hits = []
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        Record token and reply.
+        """
+        authorization = self.headers.get("Authorization")
+        self.hits.append(authorization)
+        if authorization == "token spent":
+            self.send_response(403)
+            for name, value in get_limit_headers(0).items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = b'{"login": "me"}'
+        self.send_response(200)
+        for name, value in get_limit_headers(4000).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        """
+        Keep test output quiet.
+        """
+
+
+@pytest.fixture(name="quota_server")
+def fixture_quota_server():
+    """
+    Local server that rejects one token.
+    """
+    QuotaHandler.hits = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), QuotaHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_pool_errors():
+    """
+    Empty pools and unknown policies are rejected.
+    """
+    with pytest.raises(ValueError):
+        TokenPool([])
+    with pytest.raises(ValueError):
+        TokenPool(["a"], policy="random")
+
+
+def test_round_robin():
+    """
+    Tokens are used in turn, skipping spent tokens.
+    """
+    pool = TokenPool(["a", "b", "c"])
+    assert [pool.select(URL) for _ in range(4)] == [0, 1, 2, 0]
+    pool.update(1, URL, FakeResponse(403, get_limit_headers(0)))
+    assert [pool.select(URL) for _ in range(3)] == [2, 0, 2]
+
+
+def test_most_remaining():
+    """
+    Token with the largest quota is used, quotas are kept per resource.
+    """
+    pool = TokenPool(["a", "b"], policy="most-remaining")
+    pool.update(0, URL, FakeResponse(200, get_limit_headers(100)))
+    pool.update(1, URL, FakeResponse(200, get_limit_headers(200)))
+    assert pool.select(URL) == 1
+    pool.update(1, URL, FakeResponse(200, get_limit_headers(50)))
+    assert pool.select(URL) == 0
+    search_url = "https://api.github.com/search/repositories?q=x"
+    pool.update(0, search_url, FakeResponse(200, get_limit_headers(1)))
+    pool.update(1, search_url, FakeResponse(200, get_limit_headers(20)))
+    assert pool.select(search_url) == 1
+    usage_df = pool.get_usage_df()
+    assert usage_df["requests"].sum() == 3
+    assert "a" not in usage_df["token"].tolist()
+
+
+def test_adapter_switches_token(quota_server):
+    """
+    Request rejected for a spent token is retried with the next token.
+    """
+    pool = TokenPool(["spent", "fresh"])
+    session = requests.Session()
+    session.mount(
+        "http://", GitHubAdapter(scheduler=RateLimitScheduler(), token_pool=pool)
+    )
+    response = session.get(
+        f"{quota_server}/user", headers={"Authorization": "token original"}
+    )
+    assert response.status_code == 200
+    assert QuotaHandler.hits == ["token spent", "token fresh"]
+    response = session.get(
+        f"{quota_server}/user", headers={"Authorization": "token original"}
+    )
+    assert QuotaHandler.hits[-1] == "token fresh"